@@ -0,0 +1,62 @@
+"""
+bench_batch.py — 매니저 'tiers' 1회: 설계사별 calculate_agent_performance vs 일괄 계산
+=============================================================
+가장 많은 설계사를 가진 매니저 기준으로
+  scan  : 소속 설계사마다 전체 스캔 calculate_agent_performance (기존)
+  batch : build_prize_batch() 1회 + 설계사별 슬라이스
+를 비교하고, 전 설계사에 대해 결과가 완전히 같은지 확인합니다.
+
+    python bench/bench_batch.py [--file ...]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, CODE_COL, MGR_COL, get_clean_series, load_merged, detect_prize_structure  # noqa: E402
+from prize_engine import build_prize_batch, calculate_agent_performance  # noqa: E402
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    labels = json.load(open('settings.json', encoding='utf-8')).get('prize_labels', {}) \
+        if os.path.exists('settings.json') else {}
+
+    df = load_merged(path, None)
+    ps = detect_prize_structure(tuple(df.columns.tolist()), json.dumps(labels, ensure_ascii=False))
+
+    t0 = time.perf_counter()
+    batch = build_prize_batch(df, ps)
+    t_build = time.perf_counter() - t0
+
+    codes = [c for c in get_clean_series(df, CODE_COL).unique().tolist() if c]
+    for c in codes:
+        assert calculate_agent_performance(c, df, ps) == calculate_agent_performance(c, df, ps, batch=batch), c
+
+    mgr = get_clean_series(df, MGR_COL)
+    top = mgr[mgr != ""].value_counts().index[0]
+    agents = set(get_clean_series(df, CODE_COL)[mgr == top]) - {""}
+
+    t0 = time.perf_counter()
+    for c in agents:
+        calculate_agent_performance(c, df, ps)
+    t_scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for c in agents:
+        calculate_agent_performance(c, df, ps, batch=batch)
+    t_slice = time.perf_counter() - t0
+
+    print(f"file={os.path.basename(path)} rows={len(df):,} batch_build={t_build * 1000:.1f} ms")
+    print(f"manager {top}: {len(agents)} agents  scan {t_scan * 1000:8.1f} ms   batch slices {t_slice * 1000:6.2f} ms")
+    print(f"✅ {len(codes):,}명 결과 동일")
+
+
+if __name__ == '__main__':
+    main()
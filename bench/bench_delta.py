@@ -0,0 +1,95 @@
+"""
+bench_delta.py — 날짜 간 증분 갱신: 전체 재계산 vs 바뀐 설계사 · 매니저만 재계산
+=============================================================
+  full : build_views(df)                 (시상 일괄 계산 · 매니저 인덱스 · 검색 인덱스 전부)
+  delta: update_views(직전 스냅샷, df)   (바뀐 설계사 · 매니저만)
+실제 연속 날짜 쌍과, 최신 파일의 설계사 일부(--ratios)만 실적을 바꾼 합성 쌍에 대해
+갱신 시간과 델타 스냅샷 파일 크기(전체 parquet 대비)를 비교하고, 결과가 전체 계산과 같은지 확인합니다.
+
+    python bench/bench_delta.py [--repeat 3] [--ratios 0.001,0.01,0.05,0.2]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import tempfile
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import (  # noqa: E402
+    DATA_DIR, load_merged, freeze_frame, detect_prize_structure, prize_columns,
+    diff_frames, write_delta, write_snapshot,
+)
+from prize_engine import compact_frame, _BATCH_PARTS, _map_arrays  # noqa: E402
+from prize_store import build_views, update_views  # noqa: E402
+
+
+def _same_views(a, b):
+    def _eq(x, y):
+        assert x.dtype == y.dtype and np.array_equal(x, y)
+    for k in _BATCH_PARTS:
+        _map_arrays(_eq, a['batch'][k], b['batch'][k])
+    assert a['batch']['idx']['pos'] == b['batch']['idx']['pos']
+    assert a['mgr_index'] == b['mgr_index'] and a['search_index'] == b['search_index']
+
+def _median(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, sorted(times)[len(times) // 2]
+
+def _compare(label, old, new, labels_json, repeat, tmp):
+    prev_df = freeze_frame(compact_frame(old)[0])
+    df = freeze_frame(compact_frame(new)[0])
+    prev = dict(build_views(prev_df, labels_json), key='prev', df=prev_df, labels_json=labels_json)
+    full, t_full = _median(lambda: build_views(df, labels_json), repeat)
+    inc, t_inc = _median(lambda: update_views(prev, df, labels_json), repeat)
+    _same_views(full, inc)
+    b = inc['build']
+    d = diff_frames(old, new)
+    size = ""
+    if d is not None:
+        base = write_snapshot(old, os.path.join(tmp, "base.parquet"))
+        full_kb = os.path.getsize(write_snapshot(new, os.path.join(tmp, "full.parquet"))) / 1024
+        delta_kb = os.path.getsize(write_delta(d, os.path.join(tmp, "new.delta.parquet"), base)) / 1024
+        size = f"file {full_kb:7,.0f} → {delta_kb:7,.0f} KB"
+    changed = f"{b['agents']:>6,}명" if b['mode'] == '증분' else "     -"
+    print(f"{label:<26} {b['mode']}  changed {changed}   views {t_full * 1000:7.1f} → {t_inc * 1000:7.1f} ms   {size}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--ratios', default='0.001,0.01,0.05,0.2')
+    args = ap.parse_args(argv)
+    files = sorted(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")))
+    labels = json.load(open('settings.json', encoding='utf-8')).get('prize_labels', {}) \
+        if os.path.exists('settings.json') else {}
+    labels_json = json.dumps(labels, ensure_ascii=False)
+    frames = [(os.path.basename(f)[14:22], load_merged(f, None)) for f in files]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for (d0, old), (d1, new) in zip(frames, frames[1:]):
+            _compare(f"{d0} → {d1}", old, new, labels_json, args.repeat, tmp)
+
+        # 같은 날짜 재배포 흉내: 최신 파일에서 설계사 일부의 실적 컬럼만 바꿈
+        date, base = frames[-1]
+        ps = detect_prize_structure(tuple(base.columns.tolist()), labels_json)
+        perf = [c for c in prize_columns(ps) if c in base.columns and base[c].dtype.kind in 'if']
+        rng = np.random.default_rng(0)
+        for r in (float(x) for x in args.ratios.split(',')):
+            new = base.copy()
+            rows = rng.choice(len(new), max(1, int(len(new) * r)), replace=False)
+            for c in perf[:3]:
+                new.loc[new.index[rows], c] = new[c].iloc[rows] + 10000
+            _compare(f"{date} +{r:.1%} 변경", base, new, labels_json, args.repeat, tmp)
+    print("✅ 증분 결과 = 전체 계산 결과")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_history.py — 설계사 날짜별 추이 조회: 날짜마다 파일 로딩 vs 이력 데이터셋(HistoryStore)
+=============================================================
+  naive : 날짜마다 load_merged → build_prize_batch → 설계사 한 명 결과 (지금 화면이 추이를 만들려면 해야 하는 일)
+  store : HistoryStore(data/history) 한 번 로딩 후 agent_trend(code)
+설계사 --agents 명에 대해 조회 시간을 비교하고, 두 방식의 시상 합계가 같은지 확인합니다.
+data/history 가 없으면 임시 폴더에 만들어서 측정합니다.
+
+    python bench/bench_history.py [--data-dir data] [--agents 20]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, load_merged, detect_prize_structure, dated_files  # noqa: E402
+from prize_engine import build_prize_batch, batch_agent_results  # noqa: E402
+from prize_history import HistoryStore, build_history, history_dates, TOTAL_COL, DATE_COL  # noqa: E402
+
+
+def _naive_trend(sums, code):
+    out = {}
+    for date, sp in sums.items():
+        df = load_merged(sp, None)
+        ps = detect_prize_structure(tuple(df.columns.tolist()), '{}')
+        _, total = batch_agent_results(build_prize_batch(df, ps), code)
+        out[date] = total
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--agents', type=int, default=20)
+    args = ap.parse_args(argv)
+    sums = {d: p for d, p in dated_files(args.data_dir).items() if d != '00000000'}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hist_dir = os.path.join(args.data_dir, "history")
+        if not history_dates(hist_dir):
+            hist_dir = tmp
+            t0 = time.perf_counter()
+            build_history(args.data_dir, hist_dir, log=None)
+            print(f"history build (temp) {time.perf_counter() - t0:.2f}s")
+        t0 = time.perf_counter()
+        hs = HistoryStore(hist_dir)
+        t_load = time.perf_counter() - t0
+        print(f"dates={len(hs.dates)} rows={len(hs.df):,} agents={len(hs.pos):,} "
+              f"store load {t_load * 1000:.1f} ms ({hs.nbytes() / 2 ** 20:.1f}MB)")
+
+        rng = np.random.default_rng(0)
+        codes = rng.choice(np.array(list(hs.pos), dtype=object), min(args.agents, len(hs.pos)), replace=False)
+        t0 = time.perf_counter()
+        trends = [hs.agent_trend(c) for c in codes]
+        t_store = (time.perf_counter() - t0) / len(codes)
+
+        # 파일 방식은 한 명만 측정 (날짜 수만큼 로딩 · 계산)
+        t0 = time.perf_counter()
+        naive = _naive_trend({d: sums[d] for d in hs.dates}, codes[0])
+        t_naive = time.perf_counter() - t0
+        got = dict(zip(trends[0][DATE_COL], trends[0][TOTAL_COL]))
+        assert all(abs(got.get(d, 0.0) - v) < 1e-6 for d, v in naive.items() if d in got)
+
+    print(f"naive per agent {t_naive * 1000:10.1f} ms   store per agent {t_store * 1000:8.3f} ms   "
+          f"(x{t_naive / t_store:,.0f})")
+    print("✅ 시상 합계 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_leaderboard.py — 매니저 팀 순위: 팀원마다 calculate_agent_performance 후 정렬 vs 스냅샷 배열 top-K
+=============================================================
+  naive : 소속 설계사마다 calculate_agent_performance → 합계 · 최소 부족금액 → sorted
+  topk  : build_leaderboard(스냅샷당 1회) 후 manager_leaderboard (argpartition 으로 K 개만 정렬)
+소속 인원이 많은 매니저 --managers 명에 대해 1회 조회 시간을 비교하고, 두 방식의 상위 K 값이 같은지 확인합니다.
+
+    python bench/bench_leaderboard.py [--file ...] [--managers 20] [--k 10]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, load_merged, detect_prize_structure  # noqa: E402
+from prize_engine import (  # noqa: E402
+    build_prize_batch, build_next_tiers, build_manager_index, build_leaderboard, manager_leaderboard,
+    calculate_agent_performance,
+)
+
+
+def _naive(df, ps, batch, agents, k):
+    """예전 방식 — 팀원 전원 결과 dict 를 만들어 정렬"""
+    rows = []
+    for code in agents:
+        _, total = calculate_agent_performance(code, df, ps, batch=batch)
+        rows.append((code, total))
+    return sorted(rows, key=lambda r: -r[1])[:k]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--managers', type=int, default=20)
+    ap.add_argument('--k', type=int, default=10)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    df = load_merged(path, None)
+    ps = detect_prize_structure(tuple(df.columns.tolist()), '{}')
+    batch = build_prize_batch(df, ps)
+    mi = build_manager_index(df, batch)
+
+    t0 = time.perf_counter()
+    lb = build_leaderboard(batch, build_next_tiers(batch))
+    t_build = time.perf_counter() - t0
+    mgrs = sorted(mi['agents'], key=lambda m: -len(mi['agents'][m]))[:args.managers]
+    sizes = [len(mi['agents'][m]) for m in mgrs]
+
+    t_naive = t_topk = 0.0
+    for m in mgrs:
+        t0 = time.perf_counter()
+        ref = _naive(df, ps, batch, mi['agents'][m], args.k)
+        t_naive += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = manager_leaderboard(lb, mi, batch, m, 'prize', args.k)
+        t_topk += time.perf_counter() - t0
+        assert np.allclose([v for _, v in ref], [v for _, _, v, _ in got])
+
+    n = len(mgrs)
+    print(f"file={os.path.basename(path)} agents={batch['n']:,} managers={len(mi['agents']):,} "
+          f"team size {min(sizes)}~{max(sizes)}명 · build_leaderboard {t_build * 1000:.1f} ms (스냅샷당 1회)")
+    print(f"per query: naive {t_naive / n * 1000:8.2f} ms   top-K {t_topk / n * 1000:8.3f} ms   "
+          f"(x{t_naive / t_topk:,.0f})")
+
+    # 큰 팀에서 전체 정렬 vs argpartition (팀 인원 합성)
+    for size in (300, 3000, len(lb['total'])):
+        score = lb['total'][:size]
+        t0 = time.perf_counter()
+        for _ in range(200):
+            np.argsort(-score, kind='stable')[:args.k]
+        t_sort = (time.perf_counter() - t0) / 200
+        t0 = time.perf_counter()
+        for _ in range(200):
+            np.argpartition(-score, args.k - 1)[:args.k]
+        t_part = (time.perf_counter() - t0) / 200
+        print(f"  {size:>6,}명 top-{args.k}: argsort {t_sort * 1e6:8.1f} µs   argpartition {t_part * 1e6:8.1f} µs")
+    print("✅ 상위 K 시상 합계 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+bench_load.py — 텍스트 정제 · _key 생성 벤치마크 (셀 단위 apply vs 컬럼 단위)
+=============================================================
+data/ 의 각 PRIZE_SUM_OUT_*.xlsx 를 한 번 읽은 뒤, 같은 DataFrame 에 대해
+(1) 기존 셀 단위 _clean_excel_text / safe_str apply 와
+(2) prize_core 의 clean_excel_series / safe_str_series 를
+시간 측정하고 결과가 완전히 같은지 확인합니다. (엑셀 파싱 시간은 양쪽 공통이라 따로 표시)
+
+    python bench/bench_load.py [--repeat 3]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import (  # noqa: E402
+    DATA_DIR, CODE_COL, _clean_excel_text, safe_str,
+    clean_excel_series, safe_str_series,
+)
+
+
+def _normalise_legacy(df):
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].apply(lambda v: _clean_excel_text(str(v)) if pd.notna(v) else v)
+    df['_key'] = df[CODE_COL].apply(safe_str)
+    return df
+
+def _normalise_vector(df):
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
+            df[col] = clean_excel_series(df[col])
+    df['_key'] = safe_str_series(df[CODE_COL])
+    return df
+
+def _best(fn, df, repeat):
+    best, out = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+
+    files = sorted(glob.glob(os.path.join(args.data_dir, "PRIZE_SUM_OUT_*.xlsx")))
+    print(f"{'file':<30}{'rows':>8}{'parse':>9}{'legacy':>9}{'vector':>9}{'speedup':>9}")
+    for f in files:
+        t0 = time.perf_counter()
+        raw = pd.read_excel(f, engine='calamine')
+        parse = time.perf_counter() - t0
+        raw.columns = [_clean_excel_text(str(c)) for c in raw.columns]
+        t_old, a = _best(_normalise_legacy, raw, args.repeat)
+        t_new, b = _best(_normalise_vector, raw, args.repeat)
+        pd.testing.assert_frame_equal(a, b)
+        print(f"{os.path.basename(f):<30}{len(raw):>8,}{parse:>8.3f}s{t_old:>8.3f}s{t_new:>8.3f}s"
+              f"{t_old / t_new:>8.1f}x")
+    print("✅ 모든 파일에서 결과 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+bench_lookup.py — 설계사 1명 조회: 전체 스캔 vs 해시 인덱스
+=============================================================
+data/ 에서 가장 큰 PRIZE_SUM_OUT 파일로
+  scan  : df[get_clean_series(df, code) == safe_str(code)]  (기존)
+  index : build_agent_index() 의 dict 조회 + 압축 레코드
+의 조회 시간과 calculate_agent_performance 전체 시간을 비교하고,
+모든 설계사에 대해 두 경로의 결과가 같은지 확인합니다.
+
+    python bench/bench_lookup.py [--samples 500]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import (  # noqa: E402
+    DATA_DIR, CODE_COL, safe_str, get_clean_series, load_merged, detect_prize_structure,
+)
+from prize_engine import build_agent_index, agent_record, calculate_agent_performance  # noqa: E402
+
+
+def _per_call(fn, codes):
+    t0 = time.perf_counter()
+    for c in codes:
+        fn(c)
+    return (time.perf_counter() - t0) / len(codes) * 1e6
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--samples', type=int, default=500)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    labels = json.load(open('settings.json', encoding='utf-8')).get('prize_labels', {}) \
+        if os.path.exists('settings.json') else {}
+
+    df = load_merged(path, None)
+    ps = detect_prize_structure(tuple(df.columns.tolist()), json.dumps(labels, ensure_ascii=False))
+    t0 = time.perf_counter()
+    idx = build_agent_index(df, ps)
+    t_build = time.perf_counter() - t0
+
+    codes = [c for c in get_clean_series(df, CODE_COL).unique().tolist() if c]
+    for c in codes:
+        assert calculate_agent_performance(c, df, ps) == calculate_agent_performance(c, df, ps, idx=idx), c
+    sample = random.Random(0).sample(codes, min(args.samples, len(codes)))
+    ck = get_clean_series(df, CODE_COL)
+
+    scan = _per_call(lambda c: df[ck == safe_str(c)].iloc[0], sample)
+    hit = _per_call(lambda c: agent_record(idx, c), sample)
+    full_scan = _per_call(lambda c: calculate_agent_performance(c, df, ps), sample)
+    full_idx = _per_call(lambda c: calculate_agent_performance(c, df, ps, idx=idx), sample)
+
+    print(f"file={os.path.basename(path)} rows={len(df):,} agents={len(codes):,} "
+          f"prize_cols={len(idx['cols'])} index_build={t_build * 1000:.1f} ms")
+    print(f"lookup                      scan {scan:9.1f} µs   index {hit:7.1f} µs   ({scan / hit:,.0f}x)")
+    print(f"calculate_agent_performance scan {full_scan:9.1f} µs   index {full_idx:7.1f} µs   ({full_scan / full_idx:,.0f}x)")
+    print(f"✅ {len(codes):,}명 결과 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+bench_mmap.py — 워커 프로세스 N개: parquet 스냅샷 vs 메모리 매핑 Arrow 스냅샷
+=============================================================
+같은 병합 데이터를 --scale 배로 늘려 두 형식으로 저장한 뒤, 워커 프로세스 N개가 동시에
+load_merged() + compact_frame() (SnapshotCache 와 같은 경로) 로 로딩하고 모두 쥐고 있는 시점의
+  • 로딩 시간
+  • 프로세스별 private 메모리 (힙 사본)  /  shared 메모리 (OS 페이지 캐시 공유분)
+를 /proc/self/smaps_rollup 으로 비교합니다 (Linux 전용).
+
+    python bench/bench_mmap.py [--file ...] [--workers 4] [--scale 20]
+"""
+
+import os
+import sys
+import glob
+import time
+import tempfile
+import argparse
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, load_merged, write_snapshot  # noqa: E402
+from prize_engine import compact_frame  # noqa: E402
+
+
+def _smaps():
+    out = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            k, _, rest = line.partition(':')
+            if rest.strip().endswith('kB'):
+                out[k] = int(rest.split()[0]) * 1024
+    return {'private': out.get('Private_Clean', 0) + out.get('Private_Dirty', 0),
+            'shared': out.get('Shared_Clean', 0) + out.get('Shared_Dirty', 0)}
+
+def _worker(path, ready, done, q):
+    import pyarrow.ipc, pyarrow.parquet  # noqa: F401  (첫 import 비용은 제외)
+    base = _smaps()
+    t0 = time.perf_counter()
+    df, _ = compact_frame(load_merged(path, None))
+    dt = time.perf_counter() - t0
+    ready.wait()  # 모든 워커가 로딩을 마친 시점에 측정
+    m = _smaps()
+    q.put({'sec': dt, 'rows': len(df),
+           'private': m['private'] - base['private'], 'shared': m['shared'] - base['shared']})
+    done.wait()
+
+def _run(path, workers):
+    ctx = mp.get_context('spawn')
+    ready, done, q = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1), ctx.Queue()
+    ps = [ctx.Process(target=_worker, args=(path, ready, done, q)) for _ in range(workers)]
+    for p in ps: p.start()
+    ready.wait()
+    res = [q.get() for _ in ps]
+    done.wait()
+    for p in ps: p.join()
+    return res
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--workers', type=int, default=4)
+    ap.add_argument('--scale', type=int, default=20)
+    args = ap.parse_args(argv)
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("❌ /proc/self/smaps_rollup 이 없는 환경입니다 (Linux 전용)")
+        return
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+
+    import pandas as pd
+    df = load_merged(path, None)
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        pq_path = write_snapshot(df, os.path.join(tmp, "PRIZE_SUM_OUT_00000000.parquet"), sources=[path])
+        ar_path = write_snapshot(compact_frame(df)[0], os.path.join(tmp, "PRIZE_SUM_OUT_00000000.arrow"),
+                                 sources=[path], compact=True)
+        print(f"file={os.path.basename(path)} rows={len(df):,} (x{args.scale}) workers={args.workers}  "
+              f"parquet {os.path.getsize(pq_path) / 2 ** 20:.1f}MB / arrow {os.path.getsize(ar_path) / 2 ** 20:.1f}MB")
+        for label, p in (("parquet", pq_path), ("arrow", ar_path)):
+            res = _run(p, args.workers)
+            sec = sorted(r['sec'] for r in res)
+            priv = sum(r['private'] for r in res) / len(res) / 2 ** 20
+            shared = sum(r['shared'] for r in res) / len(res) / 2 ** 20
+            print(f"{label:<8} load median {sec[len(sec) // 2] * 1000:8.1f} ms   "
+                  f"per-process private +{priv:7.1f}MB  shared +{shared:7.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
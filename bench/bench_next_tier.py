@@ -0,0 +1,92 @@
+"""
+bench_next_tier.py — 다음 구간 · 부족금액: 클릭마다 계산 vs 스냅샷당 1회 미리 계산
+=============================================================
+  click : 설계사 한 명의 행에서 구간 경계를 순회해 다음 기준 · 부족금액 계산 (시상마다 for 루프)
+  table : build_next_tiers() 로 전 설계사를 한 번에 계산해 두고 next_tiers_at() 로 조회
+전 설계사를 루프로 계산할 때와 일괄 계산 시간, 1명 조회 시간을 비교하고, 주차 시상의 다음 기준 · 부족금액이 두 방식에서 같은지 확인합니다.
+기본 경계 외에 settings "tier_boundaries" 를 바꾼 경우(--bounds)도 비교하고, build_views 가 그 경계를 쓰는지 확인합니다.
+
+    python bench/bench_next_tier.py [--file ...] [--samples 2000] [--bounds 50000,150000,250000,400000,700000]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, load_merged, detect_prize_structure  # noqa: E402
+from prize_engine import TIER_BOUNDS, build_prize_batch, build_next_tiers, next_tiers_at, tier_config  # noqa: E402
+from prize_store import build_views  # noqa: E402
+
+
+def _click(batch, i, bounds=TIER_BOUNDS):
+    """예전 방식 — 주차마다 경계를 순회"""
+    out = {}
+    for w, wk in batch['weeks'].items():
+        if not wk['show'][i]: continue   # 결과 목록에 없는 주차는 다음 구간도 없음
+        perf = float(wk['perf'][i])
+        nxt = next((b for b in bounds if b > perf), None)
+        if nxt is not None:
+            out[f'{w}주차 시상'] = (nxt, nxt - perf)
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--samples', type=int, default=2000)
+    ap.add_argument('--bounds', default='50000,150000,250000,400000,700000')
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    df = load_merged(path, None)
+    ps = detect_prize_structure(tuple(df.columns.tolist()), '{}')
+    batch = build_prize_batch(df, ps)
+
+    t0 = time.perf_counter()
+    nt = build_next_tiers(batch)
+    t_build = time.perf_counter() - t0
+    rows = random.Random(0).sample(range(batch['n']), min(args.samples, batch['n']))
+
+    t0 = time.perf_counter()
+    clicks = [_click(batch, i) for i in rows]
+    t_click = (time.perf_counter() - t0) / len(rows)
+    t0 = time.perf_counter()
+    tables = [next_tiers_at(nt, i) for i in rows]
+    t_table = (time.perf_counter() - t0) / len(rows)
+
+    t0 = time.perf_counter()
+    for i in range(batch['n']):
+        _click(batch, i)
+    t_loop = time.perf_counter() - t0
+
+    for c, t in zip(clicks, tables):
+        for name, (thr, sf) in c.items():
+            assert name in t and np.isclose(t[name]['threshold'], thr) and np.isclose(t[name]['shortfall'], sf)
+            assert t[name]['estimate']   # 주차 추가 시상금은 추정치 — 카드 · 카톡에 '예상' 표시
+    print(f"file={os.path.basename(path)} agents={batch['n']:,} "
+          f"programs={len(nt['programs'])}")
+    print(f"all agents: loop {t_loop * 1000:8.1f} ms   build_next_tiers {t_build * 1000:8.1f} ms")
+    print(f"per agent: click {t_click * 1e6:8.1f} µs   table {t_table * 1e6:8.1f} µs")
+    print("✅ 다음 기준 · 부족금액 동일")
+
+    # 기본값이 아닌 구간 경계 — 일괄 계산 · 스냅샷(build_views) 모두 설정한 경계를 따라야 함
+    custom = tuple(float(x) for x in args.bounds.split(','))
+    tiers = tier_config({'구간': custom})
+    nt_c = build_next_tiers(batch, tiers['구간'])
+    views = build_views(df, '{}', json.dumps(tiers, ensure_ascii=False))
+    assert views['next_tier']['bounds'] == tiers['구간']
+    assert np.array_equal(views['next_tier']['threshold'], nt_c['threshold'], equal_nan=True)
+    for i in rows:
+        t = next_tiers_at(nt_c, i)
+        for name, (thr, sf) in _click(batch, i, tiers['구간']).items():
+            assert name in t and np.isclose(t[name]['threshold'], thr) and np.isclose(t[name]['shortfall'], sf)
+    print(f"✅ 구간 경계 {'/'.join(f'{b:,.0f}' for b in tiers['구간'])} — build_views 다음 기준 · 부족금액 동일")
+
+
+if __name__ == '__main__':
+    main()
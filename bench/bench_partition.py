@@ -0,0 +1,63 @@
+"""
+bench_partition.py — manage.py 매니저 로그인: 매 조회 전체 복사 + str.contains vs 매니저별 파티션 dict 조회
+=============================================================
+  contains : df.copy() → 매니저 열 clean_special_chars → str.contains(코드) (예전 manage.py, '12' 가 '123' 에도 걸림)
+  partition: partition_by_manager() 를 병합 때 한 번, 로그인은 manager_frame() 정확 일치 조회
+매니저 --managers 명에 대해 1회 조회 시간을 비교하고, 부분 문자열 때문에 남의 행이 섞인 매니저 수를 셉니다.
+
+    python bench/bench_partition.py [--file ...] [--col 지원매니저코드] [--managers 200]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, read_prize_file  # noqa: E402
+from manage_core import clean_special_chars, partition_by_manager, manager_frame  # noqa: E402
+
+
+def _contains(df, col, code):
+    """예전 manage.py 로그인 로직 그대로"""
+    df = df.copy()
+    df[col] = df[col].apply(clean_special_chars)
+    return df[df[col].astype(str).str.contains(code, na=False)]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--col', default='지원매니저코드')
+    ap.add_argument('--managers', type=int, default=200)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    df = read_prize_file(path)
+
+    t0 = time.perf_counter()
+    parts = partition_by_manager(df, args.col)
+    t_build = time.perf_counter() - t0
+    codes = list(parts['spans'])[:args.managers]
+
+    t_old = t_new = 0.0
+    leaked = 0
+    for code in codes:
+        t0 = time.perf_counter()
+        ref = _contains(df, args.col, code)
+        t_old += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = manager_frame(parts, code)
+        t_new += time.perf_counter() - t0
+        assert got.index.isin(ref.index).all()
+        leaked += len(ref) > len(got)
+
+    n = len(codes)
+    print(f"file={os.path.basename(path)} rows={len(df):,} managers={len(parts['spans']):,} "
+          f"· partition_by_manager {t_build * 1000:.1f} ms (병합당 1회)")
+    print(f"per login: contains {t_old / n * 1000:8.2f} ms   partition {t_new / n * 1e6:8.1f} µs   "
+          f"(x{t_old / t_new:,.0f})")
+    print(f"✅ 정확 일치 행은 모두 포함 · 부분 문자열로 다른 매니저 행이 섞이던 코드 {leaked}/{n}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+bench_read.py — 엑셀 읽기: 전체 컬럼 pd.read_excel vs 헤더 기반 컬럼 선택 스트리밍
+=============================================================
+  full : read_prize_file(path)                      (모든 컬럼)
+  proj : read_prize_file(path, usecols=read_columns) (화면 + 시상 패턴 컬럼만)
+파일별 읽기 시간(중앙값)과 파이썬 힙 최대 사용량(tracemalloc)을 비교하고,
+선택된 컬럼의 값·타입이 전체 읽기와 같은지 확인합니다.
+
+    python bench/bench_read.py [--repeat 3] [files ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, read_prize_file, read_columns  # noqa: E402
+
+
+def _measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    df = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, sorted(times)[len(times) // 2], peak
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('files', nargs='*')
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+    files = args.files or sorted(glob.glob(os.path.join(DATA_DIR, "PRIZE_*_OUT_*.xlsx")))
+
+    for f in files:
+        full, t_full, m_full = _measure(lambda: read_prize_file(f), args.repeat)
+        proj, t_proj, m_proj = _measure(lambda: read_prize_file(f, usecols=read_columns), args.repeat)
+        pd.testing.assert_frame_equal(full[proj.columns.tolist()], proj)
+        print(f"{os.path.basename(f):<36} cols {full.shape[1]:>3} → {proj.shape[1]:>3}   "
+              f"time {t_full * 1000:7.0f} → {t_proj * 1000:7.0f} ms   "
+              f"peak {m_full / 2 ** 20:6.1f} → {m_proj / 2 ** 20:6.1f} MB")
+    print("✅ 선택 컬럼 값·타입 동일")
+
+
+if __name__ == '__main__':
+    main()
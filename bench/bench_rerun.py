@@ -0,0 +1,61 @@
+"""
+bench_rerun.py — 👥 매니저 관리 화면 rerun 1회 비용 (정규화 코드 재계산 vs 사전 계산)
+=============================================================
+st.cache_data 는 rerun 마다 캐시된 DataFrame 을 역직렬화한 사본을 돌려줍니다.
+이를 pickle 왕복으로 흉내 낸 뒤, 매니저 화면이 매번 호출하는
+get_clean_series(지원매니저코드 / 대리점설계사조직코드) 비용을 비교합니다.
+
+    before : _ck_* 없이 캐시 → rerun 마다 apply(safe_str) 로 재생성
+    after  : load_merged() 가 _ck_* 를 캐시 데이터에 포함 → 조회만
+
+    python bench/bench_rerun.py [--file data/PRIZE_SUM_OUT_20260713.xlsx] [--reruns 20]
+"""
+
+import os
+import sys
+import glob
+import time
+import pickle
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, KEY_COLS, safe_str, load_merged  # noqa: E402
+
+
+def _get_clean_series_legacy(df, col_name):
+    ck = f"_ck_{col_name}"
+    if ck not in df.columns:
+        df[ck] = df[col_name].apply(safe_str)
+    return df[ck]
+
+def _rerun(blob, mgr_code):
+    df = pickle.loads(blob)  # st.cache_data 사본
+    t0 = time.perf_counter()
+    mask = _get_clean_series_legacy(df, '지원매니저코드') == mgr_code
+    agents = set(_get_clean_series_legacy(df, '대리점설계사조직코드')[mask])
+    return time.perf_counter() - t0, len(agents)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--reruns', type=int, default=20)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")))
+
+    df = load_merged(path, None)
+    mgr_code = df['_ck_지원매니저코드'].value_counts().index[0]
+    after_blob = pickle.dumps(df)
+    before_blob = pickle.dumps(df.drop(columns=[f"_ck_{c}" for c in KEY_COLS if f"_ck_{c}" in df.columns]))
+
+    for label, blob in (("before", before_blob), ("after", after_blob)):
+        times = []
+        for _ in range(args.reruns):
+            dt, n = _rerun(blob, mgr_code)
+            times.append(dt)
+        times.sort()
+        print(f"{label:<7} rows={len(df):,} agents={n:<4} "
+              f"median={times[len(times) // 2] * 1000:8.2f} ms  max={times[-1] * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
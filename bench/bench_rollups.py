@@ -0,0 +1,72 @@
+"""
+bench_rollups.py — 조직 집계: 설계사마다 결과 dict → 엑셀식 피벗 vs 일괄 배열 groupby(build_rollups)
+=============================================================
+  naive : 설계사마다 calculate_agent_performance → (조직, 시상, 시상금) 행 → pivot_table (본사 수작업 흉내)
+  batch : build_rollups(df, batch) — 스냅샷당 1회, 단위마다 groupby 한 번
+지점조직명 단위 시상금 합계가 두 방식에서 같은지 확인하고, 전체 파생 데이터(build_views) 대비 비용을 봅니다.
+
+    python bench/bench_rollups.py [--file ...] [--repeat 3]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, BRANCH_COL, load_merged, detect_prize_structure, freeze_frame  # noqa: E402
+from prize_engine import (  # noqa: E402
+    build_prize_batch, build_rollups, calculate_agent_performance, compact_frame, _display_text,
+)
+from prize_store import build_views  # noqa: E402
+
+
+def _naive(df, ps, batch):
+    branch = _display_text(df, BRANCH_COL, "")
+    recs = []
+    for code, i in batch['idx']['pos'].items():
+        results, _ = calculate_agent_performance(code, df, ps, batch=batch)
+        recs.extend((branch[i], r['name'], r['prize']) for r in results)
+    long = pd.DataFrame(recs, columns=[BRANCH_COL, '시상', '시상금'])
+    return long.pivot_table(index=BRANCH_COL, columns='시상', values='시상금', aggfunc='sum', fill_value=0.0)
+
+def _median(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, sorted(times)[len(times) // 2]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    df = freeze_frame(compact_frame(load_merged(path, None))[0])
+    ps = detect_prize_structure(tuple(df.columns.tolist()), '{}')
+    batch = build_prize_batch(df, ps)
+
+    pivot, t_naive = _median(lambda: _naive(df, ps, batch), 1)
+    roll, t_roll = _median(lambda: build_rollups(df, batch), args.repeat)
+    _, t_views = _median(lambda: build_views(df, '{}'), args.repeat)
+
+    br = roll[BRANCH_COL].set_index(BRANCH_COL)
+    got = br[[c for c in br.columns if c.endswith(' 시상금')]].sum(axis=1)
+    assert np.allclose(got.reindex(pivot.index).to_numpy(), pivot.sum(axis=1).to_numpy())
+    assert np.allclose(br['시상합계'].reindex(pivot.index).to_numpy(), pivot.sum(axis=1).to_numpy())
+
+    print(f"file={os.path.basename(path)} agents={batch['n']:,}  "
+          + "  ".join(f"{lv} {len(t):,}행×{t.shape[1]}열" for lv, t in roll.items()))
+    print(f"naive pivot {t_naive * 1000:9.1f} ms   build_rollups {t_roll * 1000:7.1f} ms   "
+          f"(x{t_naive / t_roll:,.0f}, build_views 전체 {t_views * 1000:.1f} ms 중)")
+    print("✅ 지점별 시상금 합계 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+bench_rules.py — manage.py 매니저 화면 규칙: 항목마다 eval · 행마다 apply vs 컴파일된 규칙 프로그램
+=============================================================
+  eval : 숫자 필터마다 to_numeric + DataFrame.eval, 목표 구간은 행마다 pd.Series 를 만드는 apply,
+         분류 태그마다 eval (예전 manage.py)
+  rules: compile_rules() 한 번 + run_rules() (참조 컬럼당 숫자 변환 한 번, 벡터 마스크, searchsorted)
+최신 PRIZE_SUM_OUT 의 실적 컬럼으로 필터 2 · 목표 2 · 태그 3 개 설정을 만들고,
+행 수(--rows, 원본을 반복)별로 시간과 결과가 같은지 비교합니다.
+
+    python bench/bench_rules.py [--file ...] [--rows 300,3000,30000]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, read_prize_file  # noqa: E402
+from manage_core import compile_rules, run_rules  # noqa: E402
+
+
+def _eval_rules(my_df, cols, goals, cats):
+    """예전 manage.py 의 매니저 화면 로직 그대로"""
+    display_cols = []
+    for item in cols:
+        display_cols.append(item['col'])
+        if item['type'] == '숫자' and item['condition']:
+            my_df[item['col']] = pd.to_numeric(my_df[item['col']], errors='coerce').fillna(0)
+            my_df = my_df[my_df.eval(f"`{item['col']}` {item['condition']}")]
+    for g_col, tiers in goals.items():
+        my_df[g_col] = pd.to_numeric(my_df[g_col], errors='coerce').fillna(0)
+
+        def calc_shortfall(val):
+            for t in tiers:
+                if val < t:
+                    return pd.Series([f"{t:,.0f} 목표", t - val])
+            return pd.Series(["최고 구간 달성", 0])
+
+        my_df[[f'{g_col}_다음목표', f'{g_col}_부족금액']] = my_df[g_col].apply(calc_shortfall)
+        display_cols.extend([f'{g_col}_다음목표', f'{g_col}_부족금액'])
+    my_df['맞춤분류'] = ""
+    for cat in cats:
+        my_df[cat['col']] = pd.to_numeric(my_df[cat['col']], errors='coerce').fillna(0)
+        mask = my_df.eval(f"`{cat['col']}` {cat['condition']}")
+        my_df.loc[mask, '맞춤분류'] += f"[{cat['name']}] "
+    display_cols.insert(0, '맞춤분류')
+    return my_df[list(dict.fromkeys(display_cols))]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--rows', default='300,3000,30000')
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    base = read_prize_file(path)
+    perf = [c for c in base.columns if str(c).startswith('실적_') and base[c].notna().any()][:2]
+    cols = [{'col': '대리점설계사명', 'type': '텍스트', 'condition': ''}] + \
+           [{'col': c, 'type': '숫자', 'condition': '>= 0'} for c in perf]
+    goals = {c: [100000.0, 200000.0, 300000.0, 500000.0] for c in perf}
+    cats = [{'col': perf[0], 'condition': '>= 300000', 'name': 'VIP'},
+            {'col': perf[-1], 'condition': '< 100000', 'name': '근접'},
+            {'col': perf[0], 'condition': '== 0', 'name': '미가동'}]
+    print(f"file={os.path.basename(path)} cols={perf}")
+
+    for n in (int(x) for x in args.rows.split(',')):
+        df = pd.concat([base] * (n // len(base) + 1), ignore_index=True).iloc[:n]
+        t0 = time.perf_counter()
+        ref = _eval_rules(df.copy(), cols, goals, cats)
+        t_eval = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        out, disp, _ = run_rules(compile_rules(cols, goals, cats), df)
+        got = out[disp]
+        t_rules = time.perf_counter() - t0
+        assert list(ref.columns) == list(got.columns) and ref.index.equals(got.index)
+        for c in ref.columns:
+            a, b = ref[c].to_numpy(), got[c].to_numpy()
+            assert (a.astype(str) == b.astype(str)).all() or np.allclose(a.astype(float), b.astype(float)), c
+        print(f"{n:>7,}행   eval {t_eval * 1000:9.1f} ms   rules {t_rules * 1000:7.1f} ms   (x{t_eval / t_rules:,.0f})")
+    print("✅ 필터 · 목표 · 태그 결과 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+bench_scale.py — 설계사 수에 따른 시상 파이프라인 규모 테스트 (합성 데이터 · 단계별 시간 · 처리량 · 최대 RSS)
+=============================================================
+bench/synth.py 로 규모별 SUM · BRIDGE 를 만든 뒤, 규모마다 새 프로세스에서 아래 단계를 차례로 잽니다
+(프로세스를 나눠야 규모별 최대 RSS 가 섞이지 않음).
+  load_merged            : SUM · BRIDGE 읽기 + _key 병합 (예전 이름 load_and_merge)
+  detect_prize_structure : 컬럼 이름으로 시상 구조 감지
+  build_prize_batch      : 전 설계사 일괄 시상 계산 (앱이 스냅샷마다 1회)
+  agent (batch)          : calculate_agent_performance 1명 — 일괄 계산 슬라이스 (앱의 조회 경로)
+  agent (scan)           : calculate_agent_performance 1명 — 인덱스 없이 전체 스캔 (규모에 비례하는 경로 참고용)
+  manager tiers          : build_manager_index — 전 매니저 구간 폴더 · 명단 (settings 기본 구간)
+  build_views            : 스냅샷 1개의 파생 데이터 전체 (시상 · 다음 구간 · 매니저 · 검색 · 순위 · 조직 집계)
+  render_ui_cards        : 설계사 1명 카드 HTML + 카톡 문구 (prize.py 함수를 st 스텁으로 실행, 브라우저 렌더링 제외)
+처리량은 전체 단계는 설계사(명)/초 (구조 감지는 열/초), 1명 단계는 호출(회)/초입니다. RSS 는 단계 직후 상주 메모리, peak 는 프로세스 최대치입니다.
+
+    python bench/bench_scale.py [--sizes 10000,100000,1000000] [--format parquet|xlsx] [--calls 1000]
+"""
+
+import os
+import gc
+import sys
+import ast
+import json
+import time
+import types
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from prize_core import load_merged, detect_prize_structure  # noqa: E402
+from prize_engine import (  # noqa: E402
+    build_prize_batch, build_manager_index, build_next_tiers, calculate_agent_performance, next_tiers_at,
+    tier_config,
+)
+from prize_store import build_views, process_rss  # noqa: E402
+from synth import write_synthetic  # noqa: E402
+
+UI_FUNCS = ('copy_btn_component', 'man_won', 'next_tier_html', 'next_tier_share', 'share_text', 'render_ui_cards')
+
+
+def _prize_ui():
+    """prize.py 의 카드 · 공유 문구 함수만 꺼내 st 스텁과 함께 실행 (앱 본문은 실행하지 않음) → (네임스페이스, 출력 목록)"""
+    tree = ast.parse(open(os.path.join(ROOT, 'prize.py'), encoding='utf-8').read())
+    fns = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name in UI_FUNCS]
+    out = []
+    sink = lambda s, **kw: out.append(s)
+    ns = {'st': types.SimpleNamespace(markdown=sink), 'components': types.SimpleNamespace(html=sink), 'json': json}
+    exec(compile(ast.Module(body=fns, type_ignores=[]), 'prize.py', 'exec'), ns)
+    return ns, out
+
+def _peak_rss():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def _child(sum_path, br_path, calls):
+    """규모 1개 측정 — 결과는 JSON 한 줄로 출력"""
+    recs = []
+
+    def stage(name, fn, count=None, unit='명', per_call=False):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn()
+        recs.append({'stage': name, 'sec': time.perf_counter() - t0, 'count': count, 'unit': unit,
+                     'per_call': per_call, 'rss': process_rss()})
+        return out
+
+    df = stage('load_merged', lambda: load_merged(sum_path, br_path))
+    ps = stage('detect_prize_structure', lambda: detect_prize_structure(tuple(df.columns.tolist()), '{}'),
+               count=df.shape[1], unit='열')
+    batch = stage('build_prize_batch', lambda: build_prize_batch(df, ps))
+    codes = list(batch['idx']['pos'])
+    pick = [codes[i] for i in np.random.default_rng(0).integers(len(codes), size=calls)]
+    stage('agent (batch)', lambda: [calculate_agent_performance(c, df, ps, batch=batch) for c in pick],
+          count=calls, unit='회', per_call=True)
+    scan = pick[:max(1, min(20, calls))]
+    stage('agent (scan)', lambda: [calculate_agent_performance(c, df, ps) for c in scan],
+          count=len(scan), unit='회', per_call=True)
+    stage('manager tiers', lambda: build_manager_index(df, batch, tier_config()))
+    stage('build_views', lambda: build_views(df, '{}', json.dumps(tier_config(), ensure_ascii=False)))
+
+    ui, out = _prize_ui()
+    nt = build_next_tiers(batch)
+    rows = [batch['idx']['pos'][c] for c in pick]
+
+    def render():
+        for c, r in zip(pick, rows):
+            results, total = calculate_agent_performance(c, df, ps, batch=batch)
+            ui['render_ui_cards'](f"[지사] {c}", results, total, '2026.07.12', show_share=True,
+                                  next_tiers=next_tiers_at(nt, r))
+        out.clear()
+    stage('render_ui_cards', render, count=calls, unit='회', per_call=True)
+    n = len(df)
+    for r in recs:
+        r['count'] = r['count'] or n   # 전체 단계는 설계사 수 기준
+    print(json.dumps({'n': n, 'cols': df.shape[1], 'stages': recs, 'peak': _peak_rss()}))
+
+def _fmt_rate(r):
+    rate = r['count'] / r['sec'] if r['sec'] > 0 else float('inf')
+    t = f"{r['sec'] / r['count'] * 1e6:9.1f} µs/회" if r['per_call'] else f"{r['sec'] * 1000:9.1f} ms   "
+    return t, f"{rate:>13,.0f} {r['unit']}/s"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='10000,100000,1000000')
+    ap.add_argument('--format', choices=('parquet', 'xlsx'), default='parquet')
+    ap.add_argument('--calls', type=int, default=1000)
+    ap.add_argument('--child', nargs=2, default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.child:
+        return _child(args.child[0], args.child[1], args.calls)
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        tmp = tempfile.mkdtemp(prefix=f"synth{size}_")
+        try:
+            t0 = time.perf_counter()
+            sp, bp = write_synthetic(tmp, size, args.format)
+            t_gen = time.perf_counter() - t0
+            mb = (os.path.getsize(sp) + os.path.getsize(bp)) / 2 ** 20
+            res = subprocess.run([sys.executable, os.path.abspath(__file__), '--calls', str(args.calls),
+                                  '--child', sp, bp], capture_output=True, text=True)
+            if res.returncode != 0:
+                print(f"\n■ 설계사 {size:,}명 — 실패 (exit {res.returncode})\n{res.stderr.strip()[-2000:]}")
+                continue
+            rep = json.loads(res.stdout.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        print(f"\n■ 설계사 {rep['n']:,}명 · {rep['cols']}열 · {args.format} {mb:,.1f} MB (생성 {t_gen:.1f} s) · "
+              f"peak RSS {rep['peak'] / 2 ** 20:,.0f} MB")
+        for r in rep['stages']:
+            t, rate = _fmt_rate(r)
+            rss = f"{r['rss'] / 2 ** 20:8,.0f} MB" if r['rss'] else "       ?"
+            print(f"  {r['stage']:<24}{t}  {rate}   RSS {rss}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+bench_sessions.py — 동시 세션 N개: st.cache_data 사본 vs 공유 스냅샷(SnapshotCache)
+=============================================================
+  before : st.cache_data 처럼 rerun 마다 pickle 을 역직렬화한 세션별 사본
+  after  : SnapshotCache.get() 이 돌려주는 프로세스 공유 ReadOnlyFrame (사본 없음)
+
+세션마다 스레드 하나로 rerun 을 반복하면서, 모든 세션이 데이터를 쥐고 있는 시점의
+rerun 당 데이터 획득 시간과 메모리(고유 DataFrame 수 × 크기, 프로세스 RSS 증가분)를 비교합니다.
+공유 데이터 변경 시도가 ReadOnlyFrameError 로 막히는지도 확인합니다.
+
+    python bench/bench_sessions.py [--file ...] [--sessions 8] [--reruns 10]
+"""
+
+import os
+import sys
+import gc
+import glob
+import json
+import time
+import pickle
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, CODE_COL, ReadOnlyFrameError, load_merged  # noqa: E402
+from prize_store import SnapshotCache, process_rss  # noqa: E402
+
+
+def _run_sessions(n_sessions, reruns, fetch):
+    """세션 n 개가 동시에 rerun — 마지막 rerun 의 데이터는 모두 끝날 때까지 쥐고 있음"""
+    held = [None] * n_sessions
+    times = []
+    lock = threading.Lock()
+    start = threading.Barrier(n_sessions)
+
+    def session(k):
+        start.wait()
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            df = fetch()
+            dt = time.perf_counter() - t0
+            df[CODE_COL].iat[0]  # 화면이 하는 조회 흉내
+            held[k] = df
+            with lock:
+                times.append(dt)
+
+    rss0 = process_rss()
+    ths = [threading.Thread(target=session, args=(k,)) for k in range(n_sessions)]
+    for th in ths: th.start()
+    for th in ths: th.join()
+    rss1 = process_rss()
+    uniq = {id(d): d for d in held}
+    nbytes = sum(int(d.memory_usage(index=True, deep=True).sum()) for d in uniq.values())
+    times.sort()
+    return {'median_ms': times[len(times) // 2] * 1000, 'max_ms': times[-1] * 1000,
+            'frames': len(uniq), 'held_mb': nbytes / 2 ** 20,
+            'rss_mb': (rss1 - rss0) / 2 ** 20 if rss0 and rss1 else float('nan')}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--sessions', type=int, default=8)
+    ap.add_argument('--reruns', type=int, default=10)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    labels = json.load(open('settings.json', encoding='utf-8')).get('prize_labels', {}) \
+        if os.path.exists('settings.json') else {}
+    labels_json = json.dumps(labels, ensure_ascii=False)
+
+    df = load_merged(path, None)
+    cache = SnapshotCache(loader=lambda sp, bp: df.copy())
+    shared = cache.get(path, None, labels_json)['df']
+
+    # 공유 데이터 변경 시도는 모두 차단되어야 함
+    for name, mutate in (("컬럼 추가", lambda: shared.__setitem__('_x', 1)),
+                         ("값 대입", lambda: shared.iat.__setitem__((0, 0), 0)),
+                         ("inplace", lambda: shared.fillna(0, inplace=True))):
+        try:
+            mutate()
+            raise AssertionError(f"{name} 이(가) 차단되지 않음")
+        except ReadOnlyFrameError:
+            pass
+
+    blob = pickle.dumps(df)
+    print(f"file={os.path.basename(path)} rows={len(df):,} sessions={args.sessions} reruns={args.reruns} "
+          f"pickle={len(blob) / 2 ** 20:.1f}MB")
+
+    gc.collect()
+    after = _run_sessions(args.sessions, args.reruns, lambda: cache.get(path, None, labels_json)['df'])
+    gc.collect()
+    before = _run_sessions(args.sessions, args.reruns, lambda: pickle.loads(blob))
+    for label, r in (("before", before), ("after", after)):
+        print(f"{label:<7} per-rerun median {r['median_ms']:8.3f} ms  max {r['max_ms']:8.3f} ms   "
+              f"frames={r['frames']:<3} held {r['held_mb']:7.1f}MB   RSS +{r['rss_mb']:6.1f}MB")
+    assert after['frames'] == 1
+    print("✅ 공유 스냅샷 1개 · 변경 시도 차단")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_tiers.py — 매니저 구간 폴더: 구간 × 결과 루프 vs 경계 일괄 분류(searchsorted)
+=============================================================
+  loop : 구간마다 결과를 거꾸로 돌며 np.where, 구간마다 명단 DataFrame 정렬 (예전 build_manager_index)
+  sort : tier_hits() 로 카테고리당 분류 한 번, 정수 키 정렬 한 번으로 전 카테고리 명단 생성
+카테고리 · 구간 경계는 settings.json "tier_boundaries" (없으면 기본값) 를 씁니다.
+두 방식의 전 매니저 인원수 · 명단이 같은지 확인하고, 구간 경계를 늘렸을 때 시간도 비교합니다.
+
+    python bench/bench_tiers.py [--file ...] [--repeat 3]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, CODE_COL, MGR_COL, load_merged, detect_prize_structure, get_clean_series  # noqa: E402
+from prize_engine import (  # noqa: E402
+    build_prize_batch, build_manager_index, category_values, tier_config, tier_ranges,
+    _display_text, _split_sorted,
+)
+
+
+def _loop_index(df, batch, tiers):
+    """예전 방식 — 구간마다 결과를 순회해 첫 값, 구간마다 정렬"""
+    mgr, code = get_clean_series(df, MGR_COL), get_clean_series(df, CODE_COL)
+    pos = batch['idx']['pos']
+    pairs = pd.DataFrame({'m': mgr.to_numpy(), 'a': code.to_numpy()})
+    pairs = pairs[pairs['a'] != ""].drop_duplicates().sort_values('m', kind='stable')
+    prow = pairs['a'].map(pos).to_numpy()
+    an = _display_text(df, '대리점설계사명', "이름없음")
+    ag = _display_text(df, '대리점지사명', "")
+    counts, members = {}, {}
+    for cat, bounds in tiers.items():
+        srcs = category_values(batch, cat)
+        counts[cat], members[cat] = {}, {}
+        for t, (mn, mx) in tier_ranges(bounds).items():
+            first = np.full(batch['n'], np.nan)
+            for show, val in reversed(srcs):
+                first = np.where(show & (val >= mn) & (val < mx), val, first)
+            v = first[prow]
+            hit = ~np.isnan(v)
+            sub = pd.DataFrame({'m': pairs['m'].to_numpy()[hit], 'a': pairs['a'].to_numpy()[hit],
+                                'name': an[prow[hit]], 'agency': ag[prow[hit]], 'val': v[hit]})
+            sub = sub.sort_values(['m', 'agency', 'name', 'a'], kind='stable')
+            recs = list(zip(sub['a'].tolist(), sub['name'].tolist(), sub['agency'].tolist(), sub['val'].tolist()))
+            for m, grp in _split_sorted(sub['m'].to_numpy(), recs):
+                counts[cat].setdefault(m, {})[t] = len(grp)
+                members[cat].setdefault(m, {})[t] = grp
+    return counts, members
+
+def _median(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, sorted(times)[len(times) // 2]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    settings = json.load(open('settings.json', encoding='utf-8')) if os.path.exists('settings.json') else {}
+    df = load_merged(path, None)
+    ps = detect_prize_structure(tuple(df.columns.tolist()), json.dumps(settings.get('prize_labels', {})))
+    batch = build_prize_batch(df, ps)
+    print(f"file={os.path.basename(path)} agents={batch['n']:,}")
+
+    fine = tuple(range(50000, 1000001, 50000))
+    for label, tiers in (("settings", tier_config(settings.get('tier_boundaries'))),
+                         ("5만 단위 20구간", tier_config({c: fine for c in tier_config()}))):
+        (counts, members), t_loop = _median(lambda: _loop_index(df, batch, tiers), args.repeat)
+        mi, t_sort = _median(lambda: build_manager_index(df, batch, tiers), args.repeat)
+        assert mi['counts'] == counts and mi['members'] == members
+        n_tiers = sum(len(b) for b in tiers.values())
+        print(f"{label:<16} folders {n_tiers:>3}   loop {t_loop * 1000:8.1f} ms   "
+              f"sort {t_sort * 1000:8.1f} ms   (x{t_loop / t_sort:.1f})")
+    print("✅ 인원수 · 명단 동일")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_upload.py — manage.py 업로드 파싱: pandas 기본 읽기 vs parse_upload (인코딩 판별 + pyarrow CSV · calamine)
+=============================================================
+  pandas : pd.read_csv(encoding=정답 인코딩, C 엔진) / pd.read_excel(기본 openpyxl) — 예전 manage.py 는 재실행마다 이 작업
+           (xlsx 값 비교는 _x0035_ 이스케이프를 푸는 pandas calamine 리더 기준)
+  upload : parse_upload() — UTF-8 / CP949 를 먼저 판별, pyarrow CSV 블록 스트리밍 (CP949 는 블록마다 UTF-8 변환), xlsx 는 calamine 스트리밍
+최신 PRIZE_SUM_OUT 을 --rows 행으로 늘려 CP949 · UTF-8 CSV 를 만들고, 두 방식의 결과가 같은지와 시간을 비교합니다.
+
+    python bench/bench_upload.py [--file ...] [--rows 200000]
+"""
+
+import os
+import io
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import DATA_DIR, read_prize_file  # noqa: E402
+from manage_core import parse_upload, content_hash  # noqa: E402
+
+
+def _same(a, b):
+    assert list(a.columns) == list(b.columns) and len(a) == len(b)
+    for c in a.columns:
+        x, y = a[c], b[c]
+        if pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+            assert np.allclose(x.to_numpy(float), y.to_numpy(float), equal_nan=True), c
+        else:
+            assert (x.astype(str).where(x.notna(), '') == y.astype(str).where(y.notna(), '')).all(), c
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--file', default=None)
+    ap.add_argument('--rows', type=int, default=200000)
+    args = ap.parse_args(argv)
+    path = args.file or max(glob.glob(os.path.join(DATA_DIR, "PRIZE_SUM_OUT_*.xlsx")), key=os.path.getsize)
+    base = read_prize_file(path)
+    big = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).iloc[:args.rows]
+    text = big.to_csv(index=False)
+
+    for enc in ('cp949', 'utf-8'):
+        data = text.encode(enc, errors='replace')
+        ref, t_pd = _timed(lambda: pd.read_csv(io.BytesIO(data), encoding=enc, low_memory=False))
+        (got, det), t_up = _timed(lambda: parse_upload('MC_LIST_OUT.csv', data))
+        _, t_hash = _timed(lambda: content_hash(data))
+        assert det == enc, det
+        _same(ref, got)
+        print(f"csv {enc:<6} {len(data) / 2 ** 20:7.1f} MB {len(got):>9,}행   pandas {t_pd:6.2f} s   "
+              f"upload {t_up:6.2f} s   (x{t_pd / t_up:.1f}, 내용 해시 {t_hash * 1000:.0f} ms)")
+
+    data = open(path, 'rb').read()
+    _, t_pd = _timed(lambda: pd.read_excel(io.BytesIO(data)))
+    (got, _), t_up = _timed(lambda: parse_upload(os.path.basename(path), data))
+    # openpyxl 은 _x0035_ 같은 이스케이프를 남기므로 값 비교는 pandas calamine 리더와
+    ref = pd.read_excel(io.BytesIO(data), engine='calamine')
+    ref.columns = got.columns
+    _same(ref, got)
+    print(f"xlsx        {len(data) / 2 ** 20:7.1f} MB {len(got):>9,}행   pandas {t_pd:6.2f} s   "
+          f"upload {t_up:6.2f} s   (x{t_pd / t_up:.1f})")
+    print("✅ 인코딩 판별 · 파싱 결과 동일")
+
+
+if __name__ == '__main__':
+    main()
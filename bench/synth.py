@@ -0,0 +1,168 @@
+"""
+synth.py — 합성 PRIZE_SUM_OUT / PRIZE_6_BRIDGE_OUT 생성기 (규모 테스트용)
+=============================================================
+detect_prize_structure 가 찾는 컬럼 이름을 그대로 만듭니다.
+  SUM   : 조직 · 설계사 · 지원매니저 컬럼, 실적_{w}주차, 추가13회예정금_{w}주대상[_상품|_유퍼|_상품추가] ↔ 추가13회예정금_{w}주[_...],
+          연속주차(추가13회예정금_{a}_{b}주대상), 월 누계(추가13회예정금_월대상 · 추가13회예정금계)
+  BRIDGE: 브릿지 · 연속가동 (전월/당월 실적, 목표, 부족금액, 시상금), 주차연속가동 (3·4주 실적 · 구간 · 목표 · 시상금)
+값 분포는 실제 파일과 비슷하게 (주차 실적 약 55% 무실적, 팀당 약 16명, BRIDGE 는 설계사 약 60% 만) 맞췄고,
+seed 가 같으면 항상 같은 데이터입니다. 엑셀은 1,048,575행까지만 쓸 수 있고 openpyxl 이라 100만 행은 매우 느립니다.
+
+    python bench/synth.py --agents 100000 [--weeks 4] [--month 7] [--date 20260713] [--format parquet] [--out /tmp/synth]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prize_core import CODE_COL, MGR_COL, NAME_COL, BRANCH_COL  # noqa: E402
+
+# (대상 컬럼 접미사, 시상 컬럼 접미사) — detect_prize_structure 의 smap 과 같은 짝
+SUB_PRODUCTS = (('상품', '상품'), ('유퍼', '유퍼간편'), ('상품추가', '상품추가'))
+# 주차 시상 구간 (실적 이상 → 기본 시상금)
+WEEK_TIERS = ((500000, 1500000), (300000, 1000000), (200000, 500000), (100000, 300000))
+CONSEC_TIERS = (100000, 200000, 300000, 500000)
+XLSX_MAX_ROWS = 1048575
+
+_FAMILY = list("김이박최정강조윤장임한오서신권황안송류홍")
+_GIVEN = list("민서지현수영준우진하은도윤예아성경희재원")
+
+
+def _names(rng, n):
+    f, a, b = rng.integers(len(_FAMILY), size=n), rng.integers(len(_GIVEN), size=n), rng.integers(len(_GIVEN), size=n)
+    lut = np.array([x + y + z for x in _FAMILY for y in _GIVEN for z in _GIVEN], dtype=object)
+    return lut[(f * len(_GIVEN) + a) * len(_GIVEN) + b]
+
+def _perf(rng, n, active=0.45, scale=60000):
+    # 무실적 다수 + 로그정규 실적 (원 단위, 10원 절삭)
+    v = rng.lognormal(np.log(scale), 1.0, size=n) * (rng.random(n) < active)
+    return (np.minimum(v, 3000000) // 10 * 10).astype(np.int64)
+
+def _tier_prize(perf):
+    out = np.zeros(len(perf), dtype=np.int64)
+    for low, prize in reversed(WEEK_TIERS):
+        out[perf >= low] = prize
+    return out
+
+def _bridge_block(rng, n, prefix, month, rate):
+    # 브릿지 · 연속가동 공통: 전월/당월 실적, 당월 목표, 부족금액, 시상금
+    pm, cm = month - 1, month
+    prev, curr = _perf(rng, n, 0.8, 150000), _perf(rng, n, 0.7, 150000)
+    target = np.maximum(prev, 100000)
+    shortfall = np.maximum(target - curr, 0)
+    return {f'{prefix}실적_{pm}월': prev, f'{prefix}실적_{cm}월': curr,
+            f'{prefix}실적목표_{cm}월': target, f'{prefix}부족금액_{cm}월': shortfall,
+            f'{prefix}시상금': np.where(shortfall == 0, (np.minimum(curr, 1000000) * rate).astype(np.int64) // 1000 * 1000, 0)}
+
+def synth_frames(n_agents, weeks=4, month=7, seed=0, team=16, bridge_share=0.6):
+    """설계사 n_agents 명의 (SUM DataFrame, BRIDGE DataFrame)"""
+    rng = np.random.default_rng(seed)
+    n = int(n_agents)
+    n_mgr = max(1, n // team)
+    n_branch = max(1, n_mgr // 10)
+    n_agency = max(1, n // 4)
+
+    mgr = rng.integers(n_mgr, size=n)
+    branch = mgr % n_branch                      # 매니저는 한 지점 소속
+    agency = rng.integers(n_agency, size=n)
+    mgr_code = (300000000 + mgr).astype(np.float64)
+    mgr_code[rng.random(n) < 0.01] = np.nan      # 지원매니저 미지정
+    mgr_names = _names(rng, n_mgr)
+    codes = 500000000 + rng.permutation(n).astype(np.int64)
+
+    cols = {
+        '지역단조직명': np.array([f"GA{b % 12 + 1}본부" for b in range(n_branch)], dtype=object)[branch],
+        BRANCH_COL: np.array([f"GA{b % 12 + 1}-{b}지점" for b in range(n_branch)], dtype=object)[branch],
+        '대리점지사조직코드': (700000000 + agency).astype(np.int64),
+        '대리점지사명': np.array([f"주식회사{a:06d}에셋" for a in range(n_agency)], dtype=object)[agency],
+        CODE_COL: codes,
+        NAME_COL: _names(rng, n),
+        MGR_COL: mgr_code,
+        '지원매니저명': mgr_names[mgr],
+    }
+    perf = {w: _perf(rng, n) for w in range(1, weeks + 1)}
+    for w in perf:
+        cols[f'실적_{w}주차'] = perf[w]
+    cols['실적계'] = np.sum(list(perf.values()), axis=0)
+
+    month_prize = np.zeros(n, dtype=np.int64)
+    for w in range(1, weeks + 1):
+        elig = rng.choice(np.array([0, 500, 1000]), size=n, p=[0.11, 0.8, 0.09])
+        prize = np.where(elig > 0, _tier_prize(perf[w]), 0)
+        cols[f'추가13회예정금_{w}주대상'], cols[f'추가13회예정금_{w}주'] = elig, prize
+        month_prize += prize
+        for sfx, psfx in SUB_PRODUCTS:
+            sel = rng.random(n) < 0.9
+            sp = np.where(sel & (perf[w] >= 100000), rng.choice(np.array([200000, 500000, 1000000]), size=n), 0)
+            cols[f'추가13회예정금_{w}주대상_{sfx}'] = np.where(sel, 200, 0)
+            cols[f'추가13회예정금_{w}주_{psfx}'] = sp
+            month_prize += sp
+        if w >= 2:
+            # 연속주차 (w-1 · w 주 모두 가동)
+            both = (perf[w - 1] > 0) & (perf[w] > 0)
+            cols[f'추가13회예정금_{w - 1}_{w}주대상'] = np.where(both, 300, 0)
+            cols[f'추가13회예정금_{w - 1}_{w}주'] = np.where(both, 200000, 0)
+            month_prize += cols[f'추가13회예정금_{w - 1}_{w}주']
+    cols['추가13회예정금_월대상'] = np.where(rng.random(n) < 0.01, 200, 0)
+    cols['추가13회예정금계'] = month_prize
+    df_sum = pd.DataFrame(cols)
+
+    # BRIDGE — 일부 설계사만 (병합하면 나머지는 NaN)
+    take = np.flatnonzero(rng.random(n) < bridge_share)
+    m = len(take)
+    br = {CODE_COL: codes[take], f'브릿지대상_{month - 1}_{month}월': rng.choice(np.array([300, 600]), size=m)}
+    br.update(_bridge_block(rng, m, '브릿지', month, 0.5))
+    br[f'연속가동대상_{month - 1}_{month}월'] = rng.choice(np.array([0, 300]), size=m)
+    br.update(_bridge_block(rng, m, '연속가동', month, 0.3))
+    p3 = np.sum([perf[w][take] for w in range(max(1, weeks - 2), weeks + 1)], axis=0)
+    p4 = p3 + (perf[weeks - 3][take] if weeks >= 4 else 0)
+    bounds = np.array(CONSEC_TIERS)
+    t3 = np.r_[0, bounds][np.searchsorted(bounds, p3, side='right')]
+    t4 = np.r_[0, bounds][np.searchsorted(bounds, p4, side='right')]
+    nxt = np.r_[bounds, bounds[-1]][np.searchsorted(bounds, p3, side='right')]
+    br.update({'주차연속가동대상': (rng.random(m) < 0.5).astype(np.int64),
+               '주차연속가동_3주실적': p3, '주차연속가동_4주실적': p4,
+               '주차연속가동_3주구간': t3, '주차연속가동_4주구간': t4,
+               '주차연속가동_실적목표': nxt, '주차연속가동_실적부족액': np.maximum(nxt - p3, 0),
+               '추가13회예정금_주차연속가동': t3 // 2})
+    return df_sum, pd.DataFrame(br)
+
+def write_synthetic(out_dir, n_agents, fmt='parquet', date='20260713', **kw):
+    """합성 SUM · BRIDGE 를 out_dir 에 앱과 같은 파일명으로 저장 → (sum_path, bridge_path)"""
+    if fmt == 'xlsx' and n_agents > XLSX_MAX_ROWS:
+        raise ValueError(f"엑셀은 {XLSX_MAX_ROWS:,}행까지만 쓸 수 있습니다 (--format parquet 사용)")
+    os.makedirs(out_dir, exist_ok=True)
+    df_sum, df_br = synth_frames(n_agents, **kw)
+    paths = (os.path.join(out_dir, f"PRIZE_SUM_OUT_{date}.{fmt}"), os.path.join(out_dir, f"PRIZE_6_BRIDGE_OUT_{date}.{fmt}"))
+    for df, path in zip((df_sum, df_br), paths):
+        if fmt == 'xlsx':
+            df.to_excel(path, index=False)
+        else:
+            df.to_parquet(path, index=False)
+    return paths
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--agents', type=int, default=100000)
+    ap.add_argument('--weeks', type=int, default=4)
+    ap.add_argument('--month', type=int, default=7)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--date', default='20260713')
+    ap.add_argument('--format', choices=('parquet', 'xlsx'), default='parquet')
+    ap.add_argument('--out', default=os.path.join('/tmp', 'synth'))
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    paths = write_synthetic(args.out, args.agents, args.format, args.date,
+                            weeks=args.weeks, month=args.month, seed=args.seed)
+    for p in paths:
+        print(f"{p}  {os.path.getsize(p) / 2 ** 20:,.1f} MB")
+    print(f"설계사 {args.agents:,}명 생성 {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
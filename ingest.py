@@ -0,0 +1,145 @@
+"""
+ingest.py — 주간 시상 엑셀 → 병합 스냅샷(parquet) 변환
+=============================================================
+• PRIZE_SUM_OUT_YYYYMMDD.xlsx (+ PRIZE_6_BRIDGE_OUT) 를 한 번만 읽어
+  텍스트 정제 · _key 생성 · SUM⟷BRIDGE 병합까지 끝낸 결과를 저장
+• 결과: data/PRIZE_SUM_OUT_YYYYMMDD.parquet (zstd 압축)
+  → prize.py 의 find_latest_files() 가 xlsx 보다 우선 사용
+• --format arrow: 압축 표현(compact_frame)을 무압축 Arrow IPC(.arrow)로 저장
+  → 메모리 매핑으로 열려 워커 프로세스 여러 개가 같은 페이지를 공유 (parquet 보다 우선)
+• --delta: 직전 날짜 스냅샷 대비 바뀐 행·컬럼만 PRIZE_SUM_OUT_YYYYMMDD.delta.parquet 로 저장
+  → 로딩 때 기준 스냅샷에 적용 (연쇄 길이 DELTA_MAX_CHAIN 을 넘거나 기준이 없으면 전체 스냅샷)
+• --history: 모든 날짜를 설계사별 요약으로 data/history/date=YYYYMMDD/ 에 저장 (날짜별 추이 조회용)
+
+사용법:
+    python ingest.py                  # 최신 날짜만
+    python ingest.py --all            # data/ 의 모든 날짜
+    python ingest.py --date 20260713  # 특정 날짜
+    python ingest.py --force          # 이미 최신이어도 다시 생성
+    python ingest.py --format arrow   # 멀티 프로세스 배포용 .arrow 스냅샷
+    python ingest.py --delta          # 직전 스냅샷 대비 변경분만 (.delta.parquet)
+    python ingest.py --history        # 날짜별 이력 데이터셋 갱신 (새 날짜 · 바뀐 날짜만)
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import pandas as pd
+
+from prize_core import (
+    DATA_DIR, load_merged, write_snapshot, snapshot_path,
+    list_source_dates, source_pair, file_date,
+    diff_frames, apply_delta, write_delta, delta_path, delta_chain, is_delta_name,
+)
+from prize_engine import compact_frame
+from prize_history import build_history
+
+# 델타 → 델타 → … 연쇄가 이보다 길어지면 전체 스냅샷을 새로 만듦 (로딩 시간 상한)
+DELTA_MAX_CHAIN = 6
+
+
+def _is_fresh(out, sources):
+    if not os.path.exists(out): return False
+    mt = os.path.getmtime(out)
+    return all(os.path.getmtime(s) <= mt for s in sources if s)
+
+def ingest_date(date, data_dir=DATA_DIR, force=False, fmt='parquet'):
+    sp, bp = source_pair(date, data_dir)
+    if not sp:
+        print(f"❌ {date}: PRIZE_SUM_OUT_{date}.xlsx 없음")
+        return None
+    out = snapshot_path(date, data_dir, fmt)
+    if not force and _is_fresh(out, [sp, bp]):
+        print(f"⏭️  {date}: 최신 스냅샷 존재 ({os.path.basename(out)})")
+        return out
+    t0 = time.perf_counter()
+    df = load_merged(sp, bp)
+    if fmt == 'arrow':
+        # 앱이 쓰는 컬럼·타입 그대로 저장해야 로딩 후 변환(=복사) 없이 매핑된 버퍼를 사용
+        df, _ = compact_frame(df)
+    write_snapshot(df, out, sources=[sp, bp], compact=fmt == 'arrow')
+    dt = time.perf_counter() - t0
+    kb = os.path.getsize(out) / 1024
+    print(f"✅ {date}: {len(df):,}행 × {len(df.columns)}열 → {os.path.basename(out)} "
+          f"({kb:,.0f} KB, {dt:.2f}s, BRIDGE: {os.path.basename(bp) if bp else '없음'})")
+    return out
+
+def _previous_snapshot(date, data_dir):
+    """date 보다 이전 날짜 중 가장 최근 parquet 스냅샷 (같은 날짜면 전체 스냅샷 우선)"""
+    snaps = [f for f in glob.glob(os.path.join(data_dir, "PRIZE_SUM_OUT_*.parquet")) if file_date(f) < date]
+    if not snaps: return None
+    return min(snaps, key=lambda f: (-int(file_date(f)), is_delta_name(f)))
+
+def ingest_delta(date, data_dir=DATA_DIR, force=False):
+    sp, bp = source_pair(date, data_dir)
+    if not sp:
+        print(f"❌ {date}: PRIZE_SUM_OUT_{date}.xlsx 없음")
+        return None
+    out = delta_path(date, data_dir)
+    if not force and _is_fresh(out, [sp, bp]):
+        print(f"⏭️  {date}: 최신 델타 존재 ({os.path.basename(out)})")
+        return out
+    base = _previous_snapshot(date, data_dir)
+    if base is None or len(delta_chain(base)) > DELTA_MAX_CHAIN:
+        print(f"ℹ️  {date}: 기준 스냅샷 {'없음' if base is None else '연쇄가 김'} → 전체 스냅샷")
+        return ingest_date(date, data_dir, force)
+    t0 = time.perf_counter()
+    old, new = load_merged(base, None), load_merged(sp, bp)
+    delta = diff_frames(old, new)
+    try:
+        if delta is None:
+            raise AssertionError("키 중복")
+        # 적용 결과가 전체 병합과 같아야만 델타로 저장
+        pd.testing.assert_frame_equal(apply_delta(old, delta), new)
+    except AssertionError as e:
+        print(f"ℹ️  {date}: 델타 불가 ({str(e).splitlines()[0]}) → 전체 스냅샷")
+        return ingest_date(date, data_dir, True)
+    write_delta(delta, out, base, sources=[sp, bp])
+    st_ = delta['stats']
+    print(f"✅ {date}: {st_['rows']:,}행 × {st_['cols']}열 중 {st_['patch_rows']:,}행 저장 "
+          f"(변경 {st_['changed']:,} · 추가 {st_['added']:,} · 삭제 {st_['removed']:,}, 컬럼 {st_['update_cols']}개 갱신) "
+          f"→ {os.path.basename(out)} ({os.path.getsize(out) / 1024:,.0f} KB, 기준 {os.path.basename(base)}, "
+          f"{time.perf_counter() - t0:.2f}s)")
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="시상 엑셀 → 병합 스냅샷(parquet / arrow) 변환")
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--date', action='append', help="YYYYMMDD (여러 번 지정 가능)")
+    ap.add_argument('--all', action='store_true', help="모든 날짜 처리")
+    ap.add_argument('--force', action='store_true', help="기존 스냅샷 무시하고 재생성")
+    ap.add_argument('--format', choices=('parquet', 'arrow', 'both'), default='parquet',
+                    help="parquet: 압축(저장소 push 용) / arrow: 메모리 매핑(멀티 프로세스 배포용)")
+    ap.add_argument('--delta', action='store_true', help="직전 날짜 스냅샷 대비 변경분만 저장 (parquet)")
+    ap.add_argument('--history', action='store_true', help="모든 날짜 이력 데이터셋(data/history) 갱신")
+    args = ap.parse_args(argv)
+
+    if args.history:
+        done = build_history(args.data_dir, force=args.force)
+        if not done:
+            print("⏭️  이력 데이터셋이 최신입니다.")
+        return 0
+
+    dates = list_source_dates(args.data_dir)
+    if not dates:
+        print(f"❌ {args.data_dir}/ 에 PRIZE_SUM_OUT_*.xlsx 파일이 없습니다.")
+        return 1
+    if args.date:
+        targets = args.date
+    elif args.all:
+        targets = dates
+    else:
+        targets = dates[-1:]
+    if args.delta:
+        failed = [d for d in targets if ingest_delta(d, args.data_dir, args.force) is None]
+        return 1 if failed else 0
+    fmts = ('parquet', 'arrow') if args.format == 'both' else (args.format,)
+    failed = [(d, f) for d in targets for f in fmts if ingest_date(d, args.data_dir, args.force, f) is None]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
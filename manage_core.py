@@ -0,0 +1,407 @@
+"""
+manage_core.py — 지원매니저별 실적 관리(manage.py) 계산 모듈 (Streamlit 비의존)
+=============================================================
+• compile_rules: 관리자 설정(표시 항목 · 숫자 필터 · 목표 구간 · 분류 태그)을 한 번 검증해 규칙 프로그램으로 변환
+• run_rules: 참조 컬럼을 한 번씩만 숫자로 변환하고 필터 · 태그를 벡터 마스크로, 목표 부족금액은 정렬된 구간 searchsorted 로 계산
+• partition_by_manager: 병합 데이터를 정규화한 매니저 코드순으로 한 번 정렬해 두고 로그인은 dict 정확 일치 조회 + 연속 구간 슬라이스
+• 공유 저장소: 관리자의 병합 결과(버전별 Arrow IPC 스냅샷)와 설정(JSON)을 data/manage 에 저장 —
+  모든 세션 · 워커 프로세스가 같은 데이터를 읽기 전용으로 공유 (세션마다 업로드 · 병합 불필요)
+• 업로드 파싱: 인코딩(UTF-8 / CP949) 선판별 → pyarrow CSV 블록 스트리밍 (CP949 는 블록마다 UTF-8 변환), xlsx 는 calamine 스트리밍
+"""
+
+import io
+import os
+import re
+import json
+import codecs
+import hashlib
+import operator
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from prize_core import DATA_DIR, write_snapshot, read_snapshot, freeze_frame, read_xlsx_columns
+
+MANAGE_DIR = os.path.join(DATA_DIR, "manage")
+CONFIG_NAME = "manage_config.json"
+# 병합 스냅샷 보관 개수 — 새 버전을 쓰는 동안 이전 버전을 읽는 프로세스가 있어도 안전하도록 직전 것까지 유지
+KEEP_VERSIONS = 2
+DEFAULT_CONFIG = {'version': 0, 'snapshot': "", 'saved_at': "", 'rows': 0,
+                  'manager_col': "", 'admin_cols': [], 'admin_goals': {}, 'admin_categories': []}
+# 업로드 CSV 를 스트리밍 파싱(· UTF-8 변환)하는 블록 크기 · 인코딩 판별에 쓰는 앞부분 크기
+UPLOAD_BLOCK = 4 << 20
+ENCODING_SAMPLE = 1 << 20
+# 관리자 비밀번호는 prize.py 와 같은 settings.json 의 admin_password (없으면 같은 기본값)
+SETTINGS_FILE = "settings.json"
+DEFAULT_ADMIN_PASSWORD = "wolf7998"
+
+# 조건식: "> 0", ">= 100,000", "> 0 and < 500000" (and/& · or/| 로 연결, 왼쪽부터 차례로 결합)
+_OPS = {'>=': operator.ge, '<=': operator.le, '==': operator.eq, '=': operator.eq,
+        '!=': operator.ne, '>': operator.gt, '<': operator.lt}
+_TERM_RE = re.compile(r'\s*(>=|<=|==|!=|=|>|<)\s*(-?[\d,]*\.?\d+)\s*')
+_JOIN_RE = re.compile(r'\s*(and|or|&&?|\|\|?)\s*', re.IGNORECASE)
+TAG_COL = '맞춤분류'
+
+
+# ═══════════════════════════════════════════════════════
+# 0. 코드 정제
+# ═══════════════════════════════════════════════════════
+def clean_special_chars(val):
+    """엑셀 변환 시 발생하는 _x0033_ 같은 특수문자를 제거하는 함수"""
+    if pd.isna(val):
+        return val
+    val_str = str(val)
+    # _x0000_ 형태의 문자열 제거
+    cleaned = re.sub(r'_x[0-9a-fA-F]{4}_', '', val_str)
+    return cleaned.strip()
+
+def normalize_code(val):
+    """매니저 코드 비교용 정규화 — 특수문자 제거 + 숫자로 읽힌 코드의 '.0' 제거 (결측은 '')"""
+    if pd.isna(val):
+        return ""
+    if isinstance(val, (float, np.floating)) and float(val).is_integer():
+        val = int(val)
+    s = clean_special_chars(val)
+    return s[:-2] if s.endswith('.0') and s[:-2].isdigit() else s
+
+def normalize_codes(s):
+    """normalize_code 의 열 버전 — 고유값마다 한 번만 정제"""
+    codes, uniq = pd.factorize(s, use_na_sentinel=True)
+    lut = np.array([normalize_code(u) for u in uniq] + [""], dtype=object)
+    return lut[codes]
+
+
+# ═══════════════════════════════════════════════════════
+# 1. 규칙 컴파일
+# ═══════════════════════════════════════════════════════
+def parse_condition(cond):
+    """조건식 → [(결합, 연산자, 값), ...] (첫 항의 결합은 None). 해석할 수 없으면 ValueError"""
+    s, pos, terms, join = str(cond or ''), 0, [], None
+    while True:
+        m = _TERM_RE.match(s, pos)
+        if not m:
+            raise ValueError(f"조건을 해석할 수 없습니다: '{s.strip()}' (예: > 0, >= 100000, > 0 and < 500000)")
+        terms.append((join, m.group(1), float(m.group(2).replace(',', ''))))
+        pos = m.end()
+        if pos >= len(s):
+            return terms
+        j = _JOIN_RE.match(s, pos)
+        if not j or j.end() == pos:
+            raise ValueError(f"조건을 해석할 수 없습니다: '{s.strip()}' (연결은 and / or)")
+        join = 'or' if j.group(1).lower() in ('or', '|', '||') else 'and'
+        pos = j.end()
+
+def eval_condition(terms, values):
+    """parse_condition 결과를 float 배열에 적용한 bool 마스크"""
+    mask = None
+    for join, op, v in terms:
+        m = _OPS[op](values, v)
+        mask = m if mask is None else (mask | m if join == 'or' else mask & m)
+    return mask
+
+def compile_rules(admin_cols=(), admin_goals=None, admin_categories=()):
+    """관리자 설정 → 규칙 프로그램 dict. 잘못된 규칙은 빼고 errors 에 (대상, 메시지) 로 기록"""
+    prog = {'display': [], 'filters': [], 'goals': [], 'tags': [], 'numeric': [], 'errors': []}
+    numeric = {}
+    for item in admin_cols or ():
+        prog['display'].append(item['col'])
+        if item.get('type') == '숫자' and item.get('condition'):
+            try:
+                prog['filters'].append((item['col'], parse_condition(item['condition'])))
+                numeric[item['col']] = True
+            except ValueError as e:
+                prog['errors'].append((f"필터 {item['col']}", str(e)))
+    for col, tiers in (admin_goals or {}).items():
+        t = np.unique(np.asarray([float(x) for x in tiers], dtype=np.float64))
+        if len(t) == 0:
+            prog['errors'].append((f"목표 {col}", "구간이 비어 있습니다"))
+            continue
+        prog['goals'].append((col, t))
+        numeric[col] = True
+    for cat in admin_categories or ():
+        try:
+            prog['tags'].append((cat['col'], parse_condition(cat['condition']), cat['name']))
+            numeric[cat['col']] = True
+        except ValueError as e:
+            prog['errors'].append((f"분류 {cat.get('name') or cat['col']}", str(e)))
+    prog['numeric'] = list(numeric)
+    return prog
+
+
+# ═══════════════════════════════════════════════════════
+# 2. 규칙 실행
+# ═══════════════════════════════════════════════════════
+def _goal_columns(values, tiers):
+    """값마다 처음으로 넘지 못한 구간 → ('N 목표', 부족금액), 모든 구간 이상이면 ('최고 구간 달성', 0)"""
+    i = np.searchsorted(tiers, values, side='right')
+    top = i >= len(tiers)
+    nxt = tiers[np.minimum(i, len(tiers) - 1)]
+    labels = np.array([f"{t:,.0f} 목표" for t in tiers] + ["최고 구간 달성"], dtype=object)
+    return labels[np.where(top, len(tiers), i)], np.where(top, 0.0, nxt - values)
+
+def run_rules(prog, df):
+    """규칙 프로그램을 매니저 데이터에 적용 — (결과 DataFrame, 표시 컬럼, 경고 목록).
+    필터는 모두 AND 로 묶어 한 번에 행을 고르고, 숫자 변환은 참조 컬럼당 한 번"""
+    warnings = [f"{who}: {msg}" for who, msg in prog['errors']]
+    num = {c: pd.to_numeric(df[c], errors='coerce').fillna(0) for c in prog['numeric'] if c in df.columns}
+    out = df.assign(**num) if num else df.copy()
+    vals = {c: s.to_numpy(dtype=np.float64) for c, s in num.items()}
+
+    keep = np.ones(len(out), dtype=bool)
+    for col, terms in prog['filters']:
+        if col not in vals:
+            warnings.append(f"필터 적용 실패 ({col}): 컬럼이 없습니다")
+            continue
+        keep &= eval_condition(terms, vals[col])
+    display = list(prog['display'])
+
+    extra = {}
+    for col, tiers in prog['goals']:
+        if col not in vals:
+            continue
+        extra[f'{col}_다음목표'], extra[f'{col}_부족금액'] = _goal_columns(vals[col], tiers)
+        if f'{col}_다음목표' not in display:
+            display.extend([f'{col}_다음목표', f'{col}_부족금액'])
+    if prog['tags']:
+        tag = np.full(len(out), "", dtype=object)
+        for col, terms, name in prog['tags']:
+            if col in vals:
+                tag = tag + np.where(eval_condition(terms, vals[col]), f"[{name}] ", "")
+        extra[TAG_COL] = tag
+        if TAG_COL not in display:
+            display.insert(0, TAG_COL)
+    if extra:
+        out = out.assign(**extra)
+    return out[keep], list(dict.fromkeys(display)), warnings
+
+
+# ═══════════════════════════════════════════════════════
+# 3. 매니저별 파티션
+# ═══════════════════════════════════════════════════════
+def partition_by_manager(df, manager_col):
+    """병합 데이터 → {'frame': 매니저 코드순으로 재배열한 DataFrame (매니저 열은 정규화 값),
+                      'spans': {정규화 코드: (시작, 끝)}}. 코드가 빈 행은 spans 에서 제외.
+    병합 · 로그인 열 저장 때 한 번 만들고, 로그인은 dict 조회 (부분 문자열 매칭 없음: '12' ≠ '123').
+    로그인 열이 없으면 frame 은 원본 그대로 (spans 비어 있음)"""
+    if df is None:
+        return {'frame': pd.DataFrame(), 'spans': {}}
+    if df.empty or manager_col not in df.columns:
+        return {'frame': df, 'spans': {}}
+    keys = normalize_codes(df[manager_col])
+    order = np.argsort(keys, kind='stable')
+    sk = keys[order]
+    cut = np.flatnonzero(sk[1:] != sk[:-1]) + 1
+    starts, ends = np.r_[0, cut], np.r_[cut, len(sk)]
+    spans = {sk[i]: (int(i), int(j)) for i, j in zip(starts, ends) if sk[i] != ""}
+    return {'frame': df.take(order).assign(**{manager_col: sk}), 'spans': spans}
+
+def manager_frame(partitions, manager_code):
+    """입력한 매니저 코드와 정확히 일치하는 매니저의 행 (연속 구간 슬라이스, 없으면 None)"""
+    span = partitions['spans'].get(normalize_code(manager_code)) if partitions else None
+    return None if span is None else partitions['frame'].iloc[span[0]:span[1]]
+
+
+# ═══════════════════════════════════════════════════════
+# 4. 공유 저장소 (병합 스냅샷 + 설정)
+# ═══════════════════════════════════════════════════════
+def config_path(store_dir=MANAGE_DIR):
+    return os.path.join(store_dir, CONFIG_NAME)
+
+def store_signature(store_dir=MANAGE_DIR):
+    """설정 파일 수정 시각(ns) — 다른 세션 · 프로세스의 저장을 감지하는 캐시 키 (없으면 0)"""
+    try:
+        return os.stat(config_path(store_dir)).st_mtime_ns
+    except OSError:
+        return 0
+
+def admin_password(settings_file=SETTINGS_FILE):
+    """공유 저장소에 쓰기 전 확인할 관리자 비밀번호 (settings.json 이 없거나 깨졌으면 기본값)"""
+    try:
+        with open(settings_file, 'r', encoding='utf-8') as f:
+            return str(json.load(f).get('admin_password', DEFAULT_ADMIN_PASSWORD))
+    except (OSError, ValueError, AttributeError):
+        return DEFAULT_ADMIN_PASSWORD
+
+def load_config(store_dir=MANAGE_DIR):
+    """저장된 관리자 설정 (없거나 깨졌으면 기본값) — 매번 새 dict 이므로 그대로 수정해도 됨"""
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    try:
+        with open(config_path(store_dir), 'r', encoding='utf-8') as f:
+            cfg.update({k: v for k, v in json.load(f).items() if k in cfg})
+    except (OSError, ValueError):
+        pass
+    return cfg
+
+def save_config(cfg, store_dir=MANAGE_DIR):
+    """설정 저장 (임시파일 → rename 으로 원자적 교체)"""
+    os.makedirs(store_dir, exist_ok=True)
+    path = config_path(store_dir)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({k: cfg.get(k, v) for k, v in DEFAULT_CONFIG.items()}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return cfg
+
+def spans_path(snapshot_path):
+    # 스냅샷 옆에 두는 매니저 구간 파일 (merged_vNNNN.arrow → merged_vNNNN.spans.json)
+    return snapshot_path[:-len(".arrow")] + ".spans.json"
+
+def save_dataset(df, cfg, store_dir=MANAGE_DIR):
+    """병합 결과를 새 버전 스냅샷(merged_vNNNN.arrow)으로 저장하고 설정이 그 버전을 가리키게 함.
+    로그인 열(cfg['manager_col'])이 정해져 있으면 partition_by_manager 순서로 정렬해 쓰고 매니저 구간을 옆 파일에 저장 —
+    load_dataset 은 매핑한 프레임을 슬라이스만 함. 스냅샷 · 구간을 다 쓴 뒤에 설정을 바꾸므로 읽는 쪽은 항상 완성된 버전만 봄.
+    오래된 버전은 KEEP_VERSIONS 개만 남김"""
+    os.makedirs(store_dir, exist_ok=True)
+    version = int(cfg.get('version') or 0) + 1
+    name = f"merged_v{version:04d}.arrow"
+    manager_col = cfg.get('manager_col') or ""
+    parts = partition_by_manager(df, manager_col)
+    path = os.path.join(store_dir, name)
+    write_snapshot(parts['frame'], path)
+    tmp = spans_path(path) + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'manager_col': manager_col if parts['spans'] else "", 'spans': parts['spans']}, f, ensure_ascii=False)
+    os.replace(tmp, spans_path(path))
+    cfg.update(version=version, snapshot=name, rows=len(df), saved_at=datetime.now().isoformat(timespec='seconds'))
+    save_config(cfg, store_dir)
+    old = sorted(f for f in os.listdir(store_dir) if f.startswith("merged_v") and f.endswith(".arrow"))
+    for f in old[:-KEEP_VERSIONS]:
+        for p in (os.path.join(store_dir, f), spans_path(os.path.join(store_dir, f))):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+    return cfg
+
+def load_dataset(snapshot, manager_col, store_dir=MANAGE_DIR):
+    """스냅샷 → 읽기 전용 매니저 파티션 (partition_by_manager 형식, 스냅샷이 없으면 빈 frame).
+    저장할 때 같은 로그인 열로 정렬해 둔 스냅샷이면 구간 파일만 읽고 메모리 매핑한 프레임을 그대로 사용 —
+    널 없는 숫자 컬럼은 매핑된 페이지라 여러 프로세스가 같은 OS 페이지 캐시를 공유 (문자열 컬럼은 프로세스마다 변환).
+    로그인 열이 다르거나 구간 파일이 없으면 여기서 다시 정렬 (프로세스마다 사본)"""
+    path = os.path.join(store_dir, snapshot) if snapshot else ""
+    if not path or not os.path.exists(path):
+        return {'frame': freeze_frame(pd.DataFrame()), 'spans': {}}
+    df = read_snapshot(path)
+    try:
+        with open(spans_path(path), 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    if saved.get('manager_col') and saved['manager_col'] == manager_col and manager_col in df.columns:
+        parts = {'frame': df, 'spans': {k: (int(i), int(j)) for k, (i, j) in saved['spans'].items()}}
+    else:
+        parts = partition_by_manager(df, manager_col)
+    parts['frame'] = freeze_frame(parts['frame'])
+    return parts
+
+
+# ═══════════════════════════════════════════════════════
+# 5. 업로드 파싱
+# ═══════════════════════════════════════════════════════
+def content_hash(data):
+    """업로드 내용 해시 (앞 16자리) — 같은 파일은 한 번만 파싱"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def _decode_errors(head, enc, final):
+    return codecs.getincrementaldecoder(enc)(errors='replace').decode(head, final=final).count('\ufffd')
+
+def detect_encoding(data, sample=ENCODING_SAMPLE):
+    """앞부분만 보고 'utf-8-sig' / 'utf-8' / 'cp949' 판별 (기간계 MC_LIST_OUT 은 CP949).
+    UTF-8 로 온전히 풀리면 UTF-8, 아니면 두 인코딩 중 깨지는 글자가 적은 쪽 (같으면 UTF-8)"""
+    if data.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    head = data[:sample]
+    # 샘플 끝에서 잘린 멀티바이트 문자는 세지 않음
+    final = len(data) <= sample
+    bad = _decode_errors(head, 'utf-8', final)
+    return 'utf-8' if bad <= _decode_errors(head, 'cp949', final) else 'cp949'
+
+class _Utf8Stream(io.RawIOBase):
+    """바이트를 block 씩 enc → UTF-8 로 옮겨 주는 읽기 스트림 (깨진 바이트는 U+FFFD). pos · out: 읽은 원본 · 만든 UTF-8 크기"""
+
+    def __init__(self, data, enc, block):
+        self.data, self.block, self.pos, self.out, self.buf = data, block, 0, 0, b''
+        self.dec = codecs.getincrementaldecoder(enc)(errors='replace')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buf and self.pos < len(self.data):
+            end = self.pos + self.block
+            self.buf = self.dec.decode(self.data[self.pos:end], final=end >= len(self.data)).encode('utf-8')
+            self.pos = min(end, len(self.data))
+            self.out += len(self.buf)
+        n = min(len(b), len(self.buf))
+        b[:n], self.buf = self.buf[:n], self.buf[n:]
+        return n
+
+# 블록 사이 타입 충돌 시 넓히는 순서 (pyarrow 전체 추론과 같은 방향: null → 정수 → 실수 → 문자열)
+_WIDEN = {'null': 'int64', 'int64': 'double'}
+
+def read_csv_bytes(data, progress=None, block=UPLOAD_BLOCK):
+    """CSV 업로드 → (DataFrame, 인코딩). 인코딩을 먼저 정하고 pyarrow open_csv 로 block 바이트씩 스트리밍 파싱,
+    progress(비율, 메시지) 는 블록마다 호출. UTF-8 은 변환 없이 바로 읽고, CP949 또는 깨진 바이트가 있으면
+    block 씩 UTF-8 로 옮기며 읽음 (깨진 바이트는 U+FFFD 로 대체).
+    타입은 첫 블록으로 추론하고, 뒤 블록에서 맞지 않는 컬럼이 나오면 그 컬럼만 넓혀(null → 정수 → 실수 → 문자열) 다시 읽음"""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    enc = detect_encoding(data)
+    n, types = len(data), {}
+    transcode = not enc.startswith('utf-8')
+    while True:
+        # 배치 하나 = 파싱한 UTF-8 입력 block 바이트 (읽기는 미리 앞서가므로 스트림 위치 대신 배치 수로 진행률 계산)
+        if transcode:
+            src = _Utf8Stream(data, enc, block)
+            stream, msg = io.BufferedReader(src, block), f"{enc} → UTF-8 변환 · CSV 파싱 중"
+            total = lambda: src.out * n / max(src.pos, 1)   # 변환 후 전체 크기 추정
+        else:
+            stream, msg, total = pa.BufferReader(data), "CSV 파싱 중", lambda: n
+        reader = None
+        try:
+            reader = pacsv.open_csv(stream, read_options=pacsv.ReadOptions(block_size=block),
+                                    convert_options=pacsv.ConvertOptions(column_types=types))
+            # 첫 블록에 깨진 바이트가 있는 컬럼은 binary 로 추론되므로 변환 경로로
+            if not transcode and any(pa.types.is_binary(f.type) for f in reader.schema):
+                transcode = True
+                continue
+            batches = []
+            for b in reader:
+                batches.append(b)
+                if progress: progress(0.9 * min(len(batches) * block / total(), 1.0), msg)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+            break
+        except pa.ArrowInvalid as e:
+            m = re.match(r'In CSV column #(\d+)', str(e))
+            if m is None or reader is None:
+                raise
+            field = reader.schema.field(int(m.group(1)))
+            wider = _WIDEN.get(str(field.type), 'string')
+            if str(field.type) == wider:
+                # 문자열 컬럼에서 깨진 UTF-8 → 변환 경로로 다시
+                if transcode:
+                    raise
+                transcode = True
+                continue
+            types[field.name] = pa.type_for_alias(wider)
+    del batches
+    if progress: progress(0.95, "DataFrame 변환 중")
+    return table.to_pandas(), enc
+
+def read_xlsx_bytes(data, progress=None):
+    """xlsx 업로드 → DataFrame (calamine 행 스트리밍, 실패하면 openpyxl)"""
+    try:
+        df = read_xlsx_columns(io.BytesIO(data), lambda names: names,
+                               progress=(lambda f: progress(0.95 * f, "xlsx 읽는 중")) if progress else None)
+    except Exception:
+        df = pd.read_excel(io.BytesIO(data), engine='openpyxl')
+    return df, 'xlsx'
+
+def parse_upload(name, data, progress=None):
+    """업로드 파일(이름, 바이트) → (DataFrame, 인코딩 또는 'xlsx'). 빈 파일 · 해석 불가는 ValueError"""
+    if not data:
+        raise ValueError(f"'{name}' 파일이 비어 있습니다")
+    df, enc = read_csv_bytes(data, progress) if name.lower().endswith('.csv') else read_xlsx_bytes(data, progress)
+    if progress: progress(1.0, f"{len(df):,}행 × {df.shape[1]}열")
+    return df, enc
@@ -4,54 +4,30 @@ prize_app_v2.py — 메리츠화재 시상 현황 (자동 감지 Ver 2.0)
 • data/ 폴더의 Excel 파일을 자동 감지·병합
 • 컬럼 패턴으로 시상 구조 자동 인식 (config 불필요)
 • 내 실적 조회 / 매니저 관리 / 관리자 상태 확인
+• 매니저 화면 설계사 상세: 날짜별 시상 합계 · 주차 실적 추이 (data/history)
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 import os
 import json
-import re
-import glob
+import pandas as pd
 from datetime import datetime
 import streamlit.components.v1 as components
+from prize_core import _clean_excel_text, safe_str, find_latest_files, data_base_date, file_date
+from prize_engine import (
+    TIER_BOUNDS, TIER_CATEGORIES, tier_config, category_values, manager_tier_ranges,
+    calculate_agent_performance, agent_value, agent_next_tiers, batch_results_at, next_tiers_at,
+    manager_tier_counts, manager_tier_members, search_agent_codes, manager_leaderboard, manager_rows, RANK_KEYS,
+)
+from prize_store import SnapshotCache, snapshot_key, prewarm_latest, process_rss
+from prize_history import HistoryStore, history_signature, DATE_COL, TOTAL_COL
 
 st.set_page_config(page_title="메리츠화재 시상 현황", layout="wide")
 
 DATA_DIR = "data"
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
 SETTINGS_FILE = "settings.json"
 
-# ═══════════════════════════════════════════════════════
-# 0. 유틸리티
-# ═══════════════════════════════════════════════════════
-def _clean_excel_text(s):
-    if not s or not isinstance(s, str): return s
-    return re.sub(r'_x([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), s)
-
-def safe_str(val):
-    if pd.isna(val) or val is None: return ""
-    try:
-        if isinstance(val, (int, float)) and float(val).is_integer(): val = int(float(val))
-    except: pass
-    s = str(val)
-    s = re.sub(r'_[xX]([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), s)
-    s = re.sub(r'\s+', '', s)
-    if s.endswith('.0'): s = s[:-2]
-    return s.upper()
-
-def safe_float(val):
-    if pd.isna(val) or val is None: return 0.0
-    s = str(val).replace(',', '').strip()
-    try: return float(s)
-    except: return 0.0
-
-def get_clean_series(df, col_name):
-    ck = f"_ck_{col_name}"
-    if ck not in df.columns:
-        df[ck] = df[col_name].apply(safe_str)
-    return df[ck]
-
-
 # ═══════════════════════════════════════════════════════
 # 1. 설정
 # ═══════════════════════════════════════════════════════
@@ -61,12 +37,17 @@ DEFAULT_SETTINGS = {
     "prize_labels": {
         "base": "인보험 기본", "상품": "상품 추가",
         "상품추가": "상품 추가2", "유퍼간편": "유퍼스트"
-    }
+    },
+    # 상주 스냅샷 개수 / 메모리 상한(MB) — 넘으면 가장 오래 안 쓴 스냅샷부터 제거
+    "snapshot_cache": {"max_entries": 3, "max_mb": 600},
+    # 매니저 화면 구간 폴더 경계(원) — 카테고리별, 목표 bi 폴더 = b(i-1) 이상 bi 미만 · 맨 위 폴더 = b(k-1) 이상
+    "tier_boundaries": {cat: list(TIER_BOUNDS) for cat in TIER_CATEGORIES}
 }
 
 @st.cache_data(show_spinner=False)
 def load_settings():
-    s = DEFAULT_SETTINGS.copy()
+    # 중첩 dict(prize_labels · snapshot_cache · tier_boundaries)에 파일 값을 합치므로 기본값은 깊은 사본으로
+    s = json.loads(json.dumps(DEFAULT_SETTINGS))
     if os.path.exists(SETTINGS_FILE):
         try:
             with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
@@ -79,267 +60,60 @@ def load_settings():
         except: pass
     return s
 
-
-# ═══════════════════════════════════════════════════════
-# 2. 데이터 로딩
-# ═══════════════════════════════════════════════════════
-def find_latest_files():
-    if not os.path.exists(DATA_DIR):
-        return None, None, None
-    def _latest(pattern_base):
-        # parquet 우선, 같은 날짜에 parquet/xlsx 둘 다 있으면 parquet 사용
-        pq = glob.glob(os.path.join(DATA_DIR, pattern_base + ".parquet"))
-        xl = glob.glob(os.path.join(DATA_DIR, pattern_base + ".xlsx"))
-        files = pq + xl
-        if not files: return None
-        def _d(f):
-            m = re.search(r'(\d{8})', os.path.basename(f))
-            return m.group(1) if m else '00000000'
-        # 가장 최신 날짜 그룹 추출
-        latest_date = max(_d(f) for f in files)
-        same_date = [f for f in files if _d(f) == latest_date]
-        # parquet 우선
-        for f in same_date:
-            if f.lower().endswith('.parquet'):
-                return f
-        return same_date[0]
-    sp = _latest("PRIZE_SUM_OUT_*")
-    bp = _latest("PRIZE_6_BRIDGE_OUT_*")
-    dd = None
-    if sp:
-        m = re.search(r'(\d{8})', os.path.basename(sp))
-        if m:
-            from datetime import timedelta
-            file_date = datetime.strptime(m.group(1), '%Y%m%d')
-            base_date = file_date - timedelta(days=1)
-            dd = base_date.strftime('%Y.%m.%d')
-    return sp, bp, dd
-
-@st.cache_data(show_spinner="데이터를 로딩하고 있습니다...")
-def load_and_merge(sum_path, bridge_path, cache_ver=None):
-    def _read(path):
-        # parquet 우선, xlsx는 calamine -> openpyxl 폴백
-        if path and path.lower().endswith('.parquet'):
-            df = pd.read_parquet(path)
-        else:
-            try:
-                df = pd.read_excel(path, engine='calamine')
-            except Exception:
-                df = pd.read_excel(path, engine='openpyxl')
-        df.columns = [_clean_excel_text(str(c)) if isinstance(c, str) else c for c in df.columns]
-        for col in df.columns:
-            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
-                df[col] = df[col].apply(lambda v: _clean_excel_text(str(v)) if pd.notna(v) else v)
-        return df
-    df_sum = _read(sum_path)
-    mc = '대리점설계사조직코드'
-    df_sum['_key'] = df_sum[mc].apply(safe_str)
-    if bridge_path and os.path.exists(bridge_path):
-        df_br = _read(bridge_path)
-        df_br['_key'] = df_br[mc].apply(safe_str)
-        br_only = [c for c in df_br.columns if c not in df_sum.columns or c == '_key']
-        df = pd.merge(df_sum, df_br[br_only], on='_key', how='left')
-    else:
-        df = df_sum.copy()
-    return df
+def tiers_json(s):
+    # 정규화한 구간 경계 — 바뀌면 스냅샷의 매니저 인덱스만 다시 계산
+    return json.dumps(tier_config(s.get('tier_boundaries')), ensure_ascii=False)
 
 
 # ═══════════════════════════════════════════════════════
-# 3. 시상 구조 자동 감지
-# ═══════════════════════════════════════════════════════
-@st.cache_data(show_spinner=False)
-def detect_prize_structure(cols_tuple, labels_json):
-    cols = set(cols_tuple)
-    labels = json.loads(labels_json)
-    wp = re.compile(r'^추가13회예정금_(\d+)주대상$')
-    sp = re.compile(r'^추가13회예정금_(\d+)주대상_(.+)$')
-    mp = re.compile(r'^추가13회예정금_(\d+)_(\d+)주대상$')  # 연속주차 (예: 1_2주)
-    smap = {'상품': '상품', '상품추가': '상품추가', '유퍼': '유퍼간편'}
-
-    detected = {}
-    for c in sorted(cols):
-        # 기본: 추가13회예정금_{N}주대상
-        m = wp.match(c)
-        if m:
-            w = int(m.group(1))
-            pc = f'추가13회예정금_{w}주'
-            if pc in cols:
-                detected.setdefault(w, []).append({
-                    'label': labels.get('base', '인보험 기본'),
-                    'elig': c, 'prize': pc})
-        # 서브: 추가13회예정금_{N}주대상_상품 등
-        m2 = sp.match(c)
-        if m2:
-            w, sfx = int(m2.group(1)), m2.group(2)
-            ps = smap.get(sfx, sfx)
-            pc = f'추가13회예정금_{w}주_{ps}'
-            if pc in cols:
-                detected.setdefault(w, []).append({
-                    'label': labels.get(ps, labels.get(sfx, sfx)),
-                    'elig': c, 'prize': pc})
-        # 연속주차: 추가13회예정금_{A}_{B}주대상 → B주차 하위항목으로 편입
-        m3 = mp.match(c)
-        if m3:
-            a, b = int(m3.group(1)), int(m3.group(2))
-            pc = f'추가13회예정금_{a}_{b}주'
-            if pc in cols:
-                detected.setdefault(b, []).append({
-                    'label': f"{labels.get('base', '인보험 기본')} ({a}주)",
-                    'elig': c, 'prize': pc})
-
-    weeks = {}
-    for w in sorted(detected.keys()):
-        pf = f'실적_{w}주차'
-        weeks[w] = {'perf': pf if pf in cols else None, 'items': detected[w]}
-
-    cumul = None
-    if '추가13회예정금_월대상' in cols and '추가13회예정금계' in cols:
-        cumul = {'elig': '추가13회예정금_월대상', 'prize': '추가13회예정금계'}
-
-    bridge = None
-    if '브릿지시상금' in cols:
-        bm = sorted(set(int(m.group(1)) for c in cols for m in [re.match(r'^브릿지실적_(\d+)월$', c)] if m))
-        pm, cm = (bm[0] if len(bm) >= 1 else None), (bm[1] if len(bm) >= 2 else None)
-        bridge = {
-            'prev': f'브릿지실적_{pm}월' if pm else None,
-            'curr': f'브릿지실적_{cm}월' if cm else None,
-            'prize': '브릿지시상금',
-            'shortfall': f'브릿지부족금액_{cm}월' if cm and f'브릿지부족금액_{cm}월' in cols else None,
-            'target': f'브릿지실적목표_{cm}월' if cm and f'브릿지실적목표_{cm}월' in cols else None,
-            'lp': f'{pm}월' if pm else '', 'lc': f'{cm}월' if cm else '',
-        }
-
-    consec = None
-    if '연속가동시상금' in cols:
-        cm2 = sorted(set(int(m.group(1)) for c in cols for m in [re.match(r'^연속가동실적_(\d+)월$', c)] if m))
-        pm2, cm2b = (cm2[0] if len(cm2) >= 1 else None), (cm2[1] if len(cm2) >= 2 else None)
-        consec = {
-            'prev': f'연속가동실적_{pm2}월' if pm2 else None,
-            'curr': f'연속가동실적_{cm2b}월' if cm2b else None,
-            'prize': '연속가동시상금',
-            'shortfall': f'연속가동부족금액_{cm2b}월' if cm2b and f'연속가동부족금액_{cm2b}월' in cols else None,
-            'target': f'연속가동실적목표_{cm2b}월' if cm2b and f'연속가동실적목표_{cm2b}월' in cols else None,
-            'lp': f'{pm2}월' if pm2 else '', 'lc': f'{cm2b}월' if cm2b else '',
-        }
-
-    # ── 주차연속가동 (3~4주 동일 가동) ──
-    weekly_consec = None
-    if '주차연속가동대상' in cols:
-        weekly_consec = {
-            'target_col': '주차연속가동대상',
-            'perf_3w': '주차연속가동_3주실적' if '주차연속가동_3주실적' in cols else None,
-            'perf_4w': '주차연속가동_4주실적' if '주차연속가동_4주실적' in cols else None,
-            'tier_3w': '주차연속가동_3주구간' if '주차연속가동_3주구간' in cols else None,
-            'tier_4w': '주차연속가동_4주구간' if '주차연속가동_4주구간' in cols else None,
-            'target': '주차연속가동_실적목표' if '주차연속가동_실적목표' in cols else None,
-            'shortfall': '주차연속가동_실적부족액' if '주차연속가동_실적부족액' in cols else None,
-            'prize': '추가13회예정금_주차연속가동' if '추가13회예정금_주차연속가동' in cols else None,
-        }
-
-    return {'weeks': weeks, 'cumul': cumul,
-            'bridge': bridge, 'consec': consec,
-            'weekly_consec': weekly_consec}
-
-
-# ═══════════════════════════════════════════════════════
-# 4. 에이전트 시상 계산
+# 2. 데이터 로딩
 # ═══════════════════════════════════════════════════════
-def calculate_agent_performance(target_code, df, ps):
-    """설계사 코드로 시상 결과 리스트 반환. Returns (results, total)"""
-    code_col = '대리점설계사조직코드'
-    if code_col not in df.columns:
-        return [], 0
-    match = df[get_clean_series(df, code_col) == safe_str(target_code)]
-    if match.empty:
-        return [], 0
-    row = match.iloc[0]
-    results = []
-
-    # ── 주차별 시상 ──
-    for w, info in ps['weeks'].items():
-        perf = safe_float(row.get(info['perf'], 0)) if info['perf'] else 0
-        details = []
-        has_eligible = False
-        for it in info['items']:
-            elig = safe_float(row.get(it['elig'], 0))
-            if elig == 0: continue
-            has_eligible = True
-            amt = safe_float(row.get(it['prize'], 0))
-            if amt > 0:
-                details.append({'label': it['label'], 'amount': amt})
-        prize = sum(d['amount'] for d in details)
-        if details or perf > 0 or has_eligible:
-            results.append({
-                'name': f'{w}주차 시상', 'desc': '', 'category': 'weekly',
-                'type': '구간', 'val': perf, 'prize': prize,
-                'prize_details': details
-            })
-
-    # ── 주차연속가동 (3~4주 동일 가동) ──
-    if ps.get('weekly_consec'):
-        wc = ps['weekly_consec']
-        tgt_val = safe_float(row.get(wc['target_col'], 0))
-        if tgt_val != 0:  # 대상자만
-            perf_3w = safe_float(row.get(wc['perf_3w'], 0)) if wc.get('perf_3w') else 0
-            perf_4w = safe_float(row.get(wc['perf_4w'], 0)) if wc.get('perf_4w') else 0
-            tier_3w = safe_float(row.get(wc['tier_3w'], 0)) if wc.get('tier_3w') else 0
-            tier_4w = safe_float(row.get(wc['tier_4w'], 0)) if wc.get('tier_4w') else 0
-            target_amt = safe_float(row.get(wc['target'], 0)) if wc.get('target') else 0
-            shortfall = safe_float(row.get(wc['shortfall'], 0)) if wc.get('shortfall') else 0
-            prize_amt = safe_float(row.get(wc['prize'], 0)) if wc.get('prize') else 0
-            has_prize = wc.get('prize') is not None
-            desc = ''
-            if perf_3w > 0 or perf_4w > 0 or prize_amt > 0:
-                results.append({
-                    'name': '주차연속가동 (3~4주)',
-                    'desc': desc,
-                    'category': 'weekly', 'type': '주차연속가동',
-                    'perf_3w': perf_3w, 'perf_4w': perf_4w,
-                    'tier_3w': tier_3w, 'tier_4w': tier_4w,
-                    'target': target_amt, 'shortfall': shortfall,
-                    'prize': prize_amt, 'has_prize': has_prize,
-                })
-
-    # ── 연속가동 (브릿지보다 먼저 표시) ──
-    if ps.get('consec'):
-        c = ps['consec']
-        cp = safe_float(row.get(c['prize'], 0))
-        vp = safe_float(row.get(c['prev'], 0)) if c['prev'] else 0
-        vc = safe_float(row.get(c['curr'], 0)) if c['curr'] else 0
-        sf = safe_float(row.get(c.get('shortfall', ''), 0)) if c.get('shortfall') else 0
-        tgt = safe_float(row.get(c.get('target', ''), 0)) if c.get('target') else 0
-        if vp > 0 or vc > 0 or cp > 0:
-            results.append({
-                'name': f"연속가동 시상 ({c['lp']}~{c['lc']})",
-                'desc': '', 'category': 'weekly', 'type': '연속가동 브릿지',
-                'val_prev': vp, 'val_curr': vc,
-                'prize': cp, 'shortfall': sf, 'target': tgt,
-                'label_prev': c['lp'], 'label_curr': c['lc'],
-            })
-
-    # ── 브릿지 ──
-    if ps.get('bridge'):
-        b = ps['bridge']
-        bp = safe_float(row.get(b['prize'], 0))
-        vp = safe_float(row.get(b['prev'], 0)) if b['prev'] else 0
-        vc = safe_float(row.get(b['curr'], 0)) if b['curr'] else 0
-        sf = safe_float(row.get(b.get('shortfall', ''), 0)) if b.get('shortfall') else 0
-        tgt = safe_float(row.get(b.get('target', ''), 0)) if b.get('target') else 0
-        if vp > 0 or vc > 0 or bp > 0:
-            results.append({
-                'name': f"브릿지 시상 ({b['lp']}~{b['lc']})",
-                'desc': '', 'category': 'weekly', 'type': '브릿지_확정',
-                'val_prev': vp, 'val_curr': vc,
-                'prize': bp, 'shortfall': sf, 'target': tgt,
-                'label_prev': b['lp'], 'label_curr': b['lc'],
-            })
-
-    total = sum(r['prize'] for r in results)
-    return results, total
+@st.cache_resource(show_spinner=False)
+def get_snapshot_cache(max_entries, max_mb):
+    # 프로세스 전역 스냅샷 캐시: SUM/BRIDGE 내용 해시 키 · LRU · 메모리 상한
+    # (병합 데이터, 시상 구조, 일괄 계산, 매니저/검색 인덱스를 함께 보관)
+    cache = SnapshotCache(max_entries=max_entries, max_bytes=int(max_mb * 2 ** 20))
+    # 프로세스의 첫 실행 시점에 최신 데이터 준비를 바로 시작
+    s = load_settings()
+    prewarm_latest(cache, json.dumps(s.get('prize_labels', {}), ensure_ascii=False), DATA_DIR,
+                   tiers_json(s))
+    return cache
+
+@st.cache_resource(show_spinner=False)
+def get_history_store(signature):
+    # 날짜 파티션이 추가·갱신되면(signature 변경) 다시 읽음
+    return HistoryStore(HISTORY_DIR)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_week_gain(snap_key, signature, date, _lb):
+    # 팀 순위 '주간 증가' — 스냅샷 · 이력이 바뀔 때만 전 설계사 한 번에 계산 (행별 증가액, 기준 날짜)
+    return get_history_store(signature).gain_since(_lb['codes'], _lb['total'], date)
+
+
+def agent_label(df, batch, code):
+    # (소속, 이름) — 설계사 대표 행 기준
+    return tuple(_clean_excel_text(safe_str(agent_value(df, batch['idx'], code, c, "")))
+                 for c in ('대리점지사명', '대리점설계사명'))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_team_messages(snap_key, labels_json, mgr_code, data_date, footer, _snap, _mgr_index):
+    # 매니저 소속 설계사 전원의 카톡 문구 — 일괄 계산 결과에서 바로 조립 (소속 · 이름 순, 결과 없는 설계사 제외)
+    batch, nt = _snap['batch'], _snap.get('next_tier')
+    recs = []
+    for r in manager_rows(_mgr_index, batch, mgr_code).tolist():
+        results, total = batch_results_at(batch, r)
+        if not results: continue
+        code = _snap['leaderboard']['codes'][r]
+        agency, name = agent_label(_snap['df'], batch, code)
+        msg = share_text(f"[{agency}] {name}", results, total, data_date,
+                         next_tiers_at(nt, r) if nt is not None else None, footer)
+        recs.append((code, agency, name, total, msg))
+    out = pd.DataFrame(recs, columns=['코드', '소속', '이름', '시상합계', '메시지'])
+    return out.sort_values(['소속', '이름', '코드'], kind='stable', ignore_index=True)
 
 
 # ═══════════════════════════════════════════════════════
-# 5. 카카오톡 복사 컴포넌트
+# 3. 카카오톡 복사 컴포넌트
 # ═══════════════════════════════════════════════════════
 def copy_btn_component(text):
     escaped = json.dumps(text, ensure_ascii=False)
@@ -383,37 +157,83 @@ def copy_btn_component(text):
 
 
 # ═══════════════════════════════════════════════════════
-# 6. UI 카드 렌더링
+# 4. UI 카드 렌더링
 # ═══════════════════════════════════════════════════════
-def render_ui_cards(user_name, results, total_prize, data_date, show_share=False):
-    if not results: return
-
-    date_html = f"<div class='date-badge'>📅 기준일: {data_date}</div>" if data_date else ""
-
+def man_won(v):
+    # 원 → "N만" (만 단위가 아니면 소수 표기: 12.5만)
+    return f"{v / 10000:,g}만"
+
+def next_tier_html(nt):
+    # 다음 구간까지 남은 금액 (build_next_tiers 결과) — 주차 시상의 추가 시상금은 구간별 대표 시상금 기준 추정치라 '예상' 표시
+    if not nt: return ""
+    est = "예상 " if nt.get('estimate') else ""
+    gain = f" → 달성 시 {est}+{nt['unlock']:,.0f}원" if nt['unlock'] else ""
+    return (f"<div class='shortfall-row'><span class='shortfall-text'>🎯 {nt['threshold']:,.0f}원까지 "
+            f"{nt['shortfall']:,.0f}원 남음{gain}</span></div>")
+
+def next_tier_share(nt):
+    if not nt: return ""
+    est = "예상 " if nt.get('estimate') else ""
+    gain = f" (달성 시 {est}+{nt['unlock']:,.0f}원)" if nt['unlock'] else ""
+    return f"- 🎯 {nt['threshold']:,.0f}원까지 {nt['shortfall']:,.0f}원 남음{gain}\n"
+
+def share_text(user_name, results, total_prize, data_date, next_tiers=None, footer=""):
+    # 카카오톡 공유 문구 (상세 화면 · 팀 일괄 생성 공용) — footer: settings 의 clip_footer
+    next_tiers = next_tiers or {}
     share = f"🎯 [{user_name} 팀장님 실적 현황]\n"
     if data_date: share += f"📅 기준일: {data_date}\n"
     share += f"💰 시책 합산 시상금: {total_prize:,.0f}원\n────────────────\n"
+    share += "📌 [진행 중인 시책]\n"
+    for r in results:
+        if r['type'] in ('구간', '브릿지_확정', '연속가동 브릿지'):
+            share += f"🔹 {r['name']}: {r['prize']:,.0f}원\n"
+        elif r['type'] == '주차연속가동':
+            tier_txt = f"{r['tier_3w']:,.0f}원 구간" if r.get('tier_3w', 0) > 0 else "미달성"
+            if r.get('has_prize') and r['prize'] > 0:
+                share += f"🔹 {r['name']}: {r['prize']:,.0f}원 (3주 실적 {r['perf_3w']:,.0f}원)\n"
+            else:
+                share += f"🔹 {r['name']}: 3주 실적 {r['perf_3w']:,.0f}원 ({tier_txt})\n"
+    for r in results:
+        nt = next_tiers.get(r['name'])
+        if r['type'] == '구간':
+            share += f"\n[{r['name']}]\n- 실적: {r['val']:,.0f}원\n- 시상금: {r['prize']:,.0f}원\n"
+            for d in r.get('prize_details', []): share += f"  · {d['label']}: {d['amount']:,.0f}원\n"
+        elif r['type'] in ('브릿지_확정', '연속가동 브릿지'):
+            lp, lc = r.get('label_prev', '전월'), r.get('label_curr', '당월')
+            share += f"\n[{r['name']}]\n- {lp}: {r['val_prev']:,.0f}원 / {lc}: {r['val_curr']:,.0f}원\n- 시상금: {r['prize']:,.0f}원\n"
+        elif r['type'] == '주차연속가동':
+            tier3_txt = f"{r['tier_3w']:,.0f}원 구간" if r.get('tier_3w', 0) > 0 else "미달성"
+            share += f"\n[{r['name']}]\n- 3주 실적: {r['perf_3w']:,.0f}원 ({tier3_txt})\n"
+            if r.get('perf_4w', 0) > 0:
+                share += f"- 4주 실적: {r['perf_4w']:,.0f}원\n"
+            share += f"- 시상금: {r['prize']:,.0f}원\n" if r.get('has_prize') else "- 시상금: 추후 확정\n"
+        else:
+            continue
+        share += next_tier_share(nt)
+    if footer: share += f"\n{footer}"
+    return share
+
+def render_ui_cards(user_name, results, total_prize, data_date, show_share=False, next_tiers=None, footer=""):
+    if not results: return
+    next_tiers = next_tiers or {}
+
+    date_html = f"<div class='date-badge'>📅 기준일: {data_date}</div>" if data_date else ""
 
     # ── 시책 요약 카드 ──
     if results:
         sh = f"<div class='summary-card'><div class='summary-label'>{user_name} 팀장님의 시책 현황</div>{date_html}<div class='summary-total'>{total_prize:,.0f}원</div><div class='summary-divider'></div>"
-        share += "📌 [진행 중인 시책]\n"
         for r in results:
             if r['type'] == '구간':
                 sh += f"<div class='data-row' style='padding:6px 0;'><span class='summary-item-name'>{r['name']}</span><span class='summary-item-val'>{r['prize']:,.0f}원</span></div>"
-                share += f"🔹 {r['name']}: {r['prize']:,.0f}원\n"
             elif r['type'] in ('브릿지_확정', '연속가동 브릿지'):
                 sh += f"<div class='data-row' style='padding:6px 0;'><span class='summary-item-name'>{r['name']}</span><span class='summary-item-val'>{r['prize']:,.0f}원</span></div>"
-                share += f"🔹 {r['name']}: {r['prize']:,.0f}원\n"
             elif r['type'] == '주차연속가동':
                 tier_txt = f"{r['tier_3w']:,.0f}원 구간" if r.get('tier_3w', 0) > 0 else "미달성"
                 if r.get('has_prize') and r['prize'] > 0:
                     sh += f"<div class='data-row' style='padding:6px 0;align-items:flex-start;'><span class='summary-item-name'>{r['name']}<br><span style='font-size:0.95rem;color:rgba(255,255,255,0.7);'>(3주: {r['perf_3w']:,.0f} / {tier_txt})</span></span><span class='summary-item-val'>{r['prize']:,.0f}원</span></div>"
-                    share += f"🔹 {r['name']}: {r['prize']:,.0f}원 (3주 실적 {r['perf_3w']:,.0f}원)\n"
                 else:
                     sub = "시상금 추후" if not r.get('has_prize') else "0원"
                     sh += f"<div class='data-row' style='padding:6px 0;align-items:flex-start;'><span class='summary-item-name'>{r['name']}<br><span style='font-size:0.95rem;color:rgba(255,255,255,0.7);'>(3주: {r['perf_3w']:,.0f} / {tier_txt})</span></span><span class='summary-item-val' style='font-size:1.0rem;color:rgba(255,255,255,0.85);'>{sub}</span></div>"
-                    share += f"🔹 {r['name']}: 3주 실적 {r['perf_3w']:,.0f}원 ({tier_txt})\n"
         sh += "</div>"
         st.markdown(sh, unsafe_allow_html=True)
 
@@ -428,13 +248,13 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
                     for d in details:
                         pdh += f"<div class='data-row'><span class='data-label'>{d['label']}</span><span class='data-value' style='color:rgb(128,0,0);'>{d['amount']:,.0f}원</span></div>"
                     pdh += "<div class='toss-divider'></div>"
-                ch = f"<div class='toss-card'><div class='toss-title'>{r['name']}</div><div class='toss-desc'>{desc_html}</div><div class='data-row'><span class='data-label'>주차 누계 실적</span><span class='data-value'>{r['val']:,.0f}원</span></div><div class='toss-divider'></div>{pdh}<div class='prize-row'><span class='prize-label'>확보한 시상금</span><span class='prize-value'>{r['prize']:,.0f}원</span></div></div>"
-                share += f"\n[{r['name']}]\n- 실적: {r['val']:,.0f}원\n- 시상금: {r['prize']:,.0f}원\n"
-                for d in details: share += f"  · {d['label']}: {d['amount']:,.0f}원\n"
+                nt = next_tiers.get(r['name'])
+                ch = f"<div class='toss-card'><div class='toss-title'>{r['name']}</div><div class='toss-desc'>{desc_html}</div><div class='data-row'><span class='data-label'>주차 누계 실적</span><span class='data-value'>{r['val']:,.0f}원</span></div><div class='toss-divider'></div>{pdh}<div class='prize-row'><span class='prize-label'>확보한 시상금</span><span class='prize-value'>{r['prize']:,.0f}원</span></div>{next_tier_html(nt)}</div>"
 
             elif r['type'] in ('브릿지_확정', '연속가동 브릿지'):
                 lp, lc = r.get('label_prev', '전월'), r.get('label_curr', '당월')
                 icon = "🌉" if "브릿지" in r['type'] else "🔗"
+                nt = next_tiers.get(r['name'])
                 ch = (
                     f"<div class='toss-card'>"
                     f"<div class='toss-title'>{icon} {r['name']}</div>"
@@ -443,9 +263,9 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
                     f"<div class='data-row'><span class='data-label'>{lc} 실적</span><span class='data-value'>{r['val_curr']:,.0f}원</span></div>"
                     f"<div class='toss-divider'></div>"
                     f"<div class='prize-row'><span class='prize-label'>시상금</span><span class='prize-value'>{r['prize']:,.0f}원</span></div>"
+                    f"{next_tier_html(nt)}"
                     f"</div>"
                 )
-                share += f"\n[{r['name']}]\n- {lp}: {r['val_prev']:,.0f}원 / {lc}: {r['val_curr']:,.0f}원\n- 시상금: {r['prize']:,.0f}원\n"
 
             elif r['type'] == '주차연속가동':
                 tier3_txt = f"{r['tier_3w']:,.0f}원 구간" if r.get('tier_3w', 0) > 0 else "미달성"
@@ -473,15 +293,9 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
                     f"{w4_html}"
                     f"<div class='toss-divider'></div>"
                     f"{prize_html}"
+                    f"{next_tier_html(next_tiers.get(r['name']))}"
                     f"</div>"
                 )
-                share += f"\n[{r['name']}]\n- 3주 실적: {r['perf_3w']:,.0f}원 ({tier3_txt})\n"
-                if r.get('perf_4w', 0) > 0:
-                    share += f"- 4주 실적: {r['perf_4w']:,.0f}원\n"
-                if r.get('has_prize'):
-                    share += f"- 시상금: {r['prize']:,.0f}원\n"
-                else:
-                    share += "- 시상금: 추후 확정\n"
 
             else:
                 continue
@@ -490,11 +304,11 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
 
     if show_share:
         st.markdown("<h4 class='main-title' style='margin-top:10px;'>💬 카카오톡 바로 공유하기</h4>", unsafe_allow_html=True)
-        copy_btn_component(share)
+        copy_btn_component(share_text(user_name, results, total_prize, data_date, next_tiers, footer))
 
 
 # ═══════════════════════════════════════════════════════
-# 7. CSS
+# 5. CSS
 # ═══════════════════════════════════════════════════════
 st.markdown("""
 <style>
@@ -567,7 +381,7 @@ st.markdown("""
 
 
 # ═══════════════════════════════════════════════════════
-# 8. 메인 앱
+# 6. 메인 앱
 # ═══════════════════════════════════════════════════════
 settings = load_settings()
 sp, bp, data_date = find_latest_files()
@@ -583,13 +397,27 @@ if not sp:
     """)
     st.stop()
 
-sp_mtime = os.path.getmtime(sp) if sp else 0
-bp_mtime = os.path.getmtime(bp) if bp and os.path.exists(bp) else 0
-df_merged = load_and_merge(sp, bp, cache_ver=f"{sp_mtime}_{bp_mtime}")
-ps = detect_prize_structure(
-    tuple(df_merged.columns.tolist()),
-    json.dumps(settings.get('prize_labels', DEFAULT_SETTINGS['prize_labels']), ensure_ascii=False)
-)
+labels_json = json.dumps(settings.get('prize_labels', DEFAULT_SETTINGS['prize_labels']), ensure_ascii=False)
+tier_json = tiers_json(settings)
+cache_cfg = {**DEFAULT_SETTINGS['snapshot_cache'], **settings.get('snapshot_cache', {})}
+snapshot_cache = get_snapshot_cache(cache_cfg['max_entries'], cache_cfg['max_mb'])
+snap = snapshot_cache.peek(sp, bp, labels_json, tier_json)
+if snap is None:
+    # 최신 스냅샷은 백그라운드에서 준비, 그동안은 직전 스냅샷으로 응답
+    prev = snapshot_cache.current()
+    prewarm_latest(snapshot_cache, labels_json, DATA_DIR, tier_json)
+    if prev is not None:
+        snap = prev
+        st.info(f"🔄 최신 데이터({os.path.basename(sp)})를 준비하고 있습니다. 잠시 이전 데이터를 표시합니다.")
+        err = snapshot_cache.errors.get(snapshot_key(sp, bp))
+        if err: st.warning(f"⚠️ 최신 데이터 로딩 실패: {err}")
+    else:
+        with st.spinner("데이터를 로딩하고 있습니다..."):
+            snap = snapshot_cache.get(sp, bp, labels_json, tier_json)
+sp, bp = snap['sum_path'], snap['bridge_path']
+data_date = data_base_date(sp)
+df_merged, ps = snap['df'], snap['ps']
+prize_batch, mgr_index, search_index = snap['batch'], snap['mgr_index'], snap['search_index']
 
 mode = st.radio(
     "화면 선택",
@@ -610,24 +438,8 @@ if mode == "📊 내 실적 조회":
     branch_code = st.text_input("지점별 코드", placeholder="예: 1지점은 1, 11지점은 11")
 
     codes_found = set()
-    nc, bc = '대리점설계사명', '지점조직명'
-    cc = '대리점설계사조직코드'
-
-    if user_name and branch_code and nc in df_merged.columns and cc in df_merged.columns:
-        sn = df_merged[nc].fillna('').astype(str).str.strip()
-        nm = (sn == user_name.strip())
-        if branch_code.strip() == "0000":
-            match = df_merged[nm]
-        else:
-            code_num = branch_code.replace("지점", "").strip()
-            if code_num and bc in df_merged.columns:
-                sb = df_merged[bc].fillna('').astype(str)
-                match = df_merged[nm & sb.str.contains(rf"(?<!\d){code_num}\s*지점", regex=True)]
-            else:
-                match = pd.DataFrame()
-        if not match.empty and cc in df_merged.columns:
-            for ac in get_clean_series(df_merged, cc)[match.index]:
-                if ac: codes_found.add(ac)
+    if user_name and branch_code:
+        codes_found = search_agent_codes(search_index, df_merged, user_name, branch_code)
 
     sel_code = None
     if len(codes_found) > 1:
@@ -641,16 +453,15 @@ if mode == "📊 내 실적 조회":
             st.error("일치하는 정보가 없습니다.")
         else:
             fc = sel_code if sel_code else list(codes_found)[0]
-            cr, tp = calculate_agent_performance(fc, df_merged, ps)
+            cr, tp = calculate_agent_performance(fc, df_merged, ps, batch=prize_batch)
             if cr:
                 dn = user_name
-                ac_col = '대리점지사명'
-                if ac_col in df_merged.columns:
-                    m = df_merged[get_clean_series(df_merged, cc) == safe_str(fc)]
-                    if not m.empty:
-                        av = _clean_excel_text(str(m[ac_col].values[0]).strip())
-                        if av and av != 'nan': dn = f"{av} {user_name}"
-                render_ui_cards(dn, cr, tp, data_date, show_share=False)
+                av = agent_value(df_merged, prize_batch['idx'], fc, '대리점지사명')
+                if av is not None:
+                    av = _clean_excel_text(str(av).strip())
+                    if av and av != 'nan': dn = f"{av} {user_name}"
+                render_ui_cards(dn, cr, tp, data_date, show_share=False,
+                                next_tiers=agent_next_tiers(snap.get('next_tier'), prize_batch, fc))
             else:
                 st.error("해당 조건의 실적 데이터가 없습니다.")
 
@@ -660,12 +471,6 @@ if mode == "📊 내 실적 조회":
 elif mode == "👥 매니저 관리":
     st.markdown('<div class="title-band">매니저 소속 실적 관리</div>', unsafe_allow_html=True)
 
-    mc_col = '지원매니저코드'
-    mn_col = '지원매니저명'
-    ac_col = '대리점설계사조직코드'
-    an_col = '대리점설계사명'
-    ag_col = '대리점지사명'
-
     if 'mgr_logged_in' not in st.session_state:
         st.session_state.mgr_logged_in = False
 
@@ -676,7 +481,7 @@ elif mode == "👥 매니저 관리":
                 st.warning("코드를 입력해주세요.")
             else:
                 sic = safe_str(mgr_input)
-                if mc_col in df_merged.columns and sic in get_clean_series(df_merged, mc_col).unique():
+                if sic in mgr_index['agents']:
                     st.session_state.mgr_logged_in = True
                     st.session_state.mgr_code = sic
                     st.session_state.mgr_step = 'main'
@@ -691,34 +496,88 @@ elif mode == "👥 매니저 관리":
 
         slc = st.session_state.mgr_code
 
-        # 매니저 이름
-        mgr_name = ""
-        if mn_col in df_merged.columns and mc_col in df_merged.columns:
-            mdf = df_merged[get_clean_series(df_merged, mc_col) == slc]
-            if not mdf.empty and mn_col in mdf.columns:
-                mgr_name = _clean_excel_text(safe_str(mdf[mn_col].values[0]))
-
-        # 소속 설계사 코드 목록
-        my_agents = set()
-        if mc_col in df_merged.columns and ac_col in df_merged.columns:
-            mask = get_clean_series(df_merged, mc_col) == slc
-            for ac in get_clean_series(df_merged, ac_col)[mask]:
-                if ac: my_agents.add(ac)
+        # 매니저 이름 · 소속 설계사 코드 목록 (스냅샷당 한 번 만든 인덱스에서 조회)
+        mgr_name = mgr_index['name'].get(slc, "")
+        my_agents = mgr_index['agents'].get(slc, set())
 
         step = st.session_state.get('mgr_step', 'main')
 
         if step == 'main':
             st.markdown("<h3 class='main-title'>어떤 실적을 확인하시겠습니까?</h3>", unsafe_allow_html=True)
-            c1, c2 = st.columns(2)
-            with c1:
-                if st.button("📁 구간실적 관리", use_container_width=True):
-                    st.session_state.mgr_step = 'tiers'
-                    st.session_state.mgr_category = '구간'
-                    st.rerun()
-            with c2:
-                if st.button("📁 브릿지실적 관리", use_container_width=True):
-                    st.session_state.mgr_step = 'tiers'
-                    st.session_state.mgr_category = '브릿지'
+            # 설정된 카테고리 중 이 데이터에 해당 시상이 있는 것만 (두 개씩 한 줄)
+            cats = [c for c in mgr_index.get('tiers', TIER_CATEGORIES) if category_values(prize_batch, c)]
+            for i in range(0, len(cats), 2):
+                for col, c in zip(st.columns(2), cats[i:i + 2]):
+                    with col:
+                        if st.button(f"📁 {c}실적 관리", use_container_width=True, key=f"cat_{c}"):
+                            st.session_state.mgr_step = 'tiers'
+                            st.session_state.mgr_category = c
+                            st.rerun()
+            if st.button("🏆 팀 순위", use_container_width=True):
+                st.session_state.mgr_step = 'rank'
+                st.rerun()
+            if st.button("💬 팀 전체 카톡 메시지", use_container_width=True):
+                st.session_state.mgr_step = 'share'
+                st.rerun()
+
+        elif step == 'share':
+            if st.button("⬅️ 뒤로가기"):
+                st.session_state.mgr_step = 'main'
+                st.rerun()
+            msgs = get_team_messages(snap['key'], labels_json, slc, data_date, settings.get('clip_footer', ""),
+                                     snap, mgr_index)
+            st.markdown(f"<h3 class='main-title'>💬 팀 전체 카톡 메시지 ({len(msgs)}명)</h3>", unsafe_allow_html=True)
+            if msgs.empty:
+                st.info("시상 결과가 있는 소속 설계사가 없습니다.")
+            else:
+                skipped = len(my_agents) - len(msgs)
+                if skipped > 0: st.caption(f"시상 결과가 없는 {skipped}명은 제외했습니다.")
+                bundle = "\n\n══════════════\n\n".join(msgs['메시지'])
+                copy_btn_component(bundle)
+                d1, d2 = st.columns(2)
+                with d1:
+                    st.download_button("⬇️ 텍스트(.txt)", bundle.encode('utf-8'), use_container_width=True,
+                                       file_name=f"카톡_{slc}_{file_date(sp)}.txt", mime="text/plain")
+                with d2:
+                    st.download_button("⬇️ 엑셀용 CSV", msgs.to_csv(index=False).encode('utf-8-sig'),
+                                       use_container_width=True,
+                                       file_name=f"카톡_{slc}_{file_date(sp)}.csv", mime="text/csv")
+                st.text_area("전체 메시지", bundle, height=400)
+
+        elif step == 'rank':
+            if st.button("⬅️ 뒤로가기"):
+                st.session_state.mgr_step = 'main'
+                st.rerun()
+            st.markdown(f"<h3 class='main-title'>🏆 팀 순위 (소속: 총 {len(my_agents)}명)</h3>", unsafe_allow_html=True)
+            by = st.radio("순위 기준", list(RANK_KEYS), format_func=lambda k: RANK_KEYS[k][0],
+                          horizontal=True, key='mgr_rank_by')
+            k = st.selectbox("표시 인원", [10, 20, 50], key='mgr_rank_k')
+            gain = None
+            if by == 'gain':
+                hist_sig = history_signature(HISTORY_DIR)
+                gain, base = get_week_gain(snap['key'], hist_sig, file_date(sp), snap['leaderboard']) \
+                    if hist_sig else (None, None)
+                if gain is None:
+                    st.info("비교할 이전 날짜 이력 데이터가 없습니다. (⚙️ 시스템 관리자 → 📈 이력 데이터)")
+                else:
+                    st.caption(f"기준: {base[4:6]}/{base[6:]} 대비 시상 합계 증가")
+            ranked = manager_leaderboard(snap['leaderboard'], mgr_index, prize_batch, slc, by, k, gain)
+            if not ranked and not (by == 'gain' and gain is None):
+                st.info("해당하는 소속 설계사가 없습니다.")
+            for i, (code, _, v, prog) in enumerate(ranked, 1):
+                agency, name = agent_label(df_merged, prize_batch, code)
+                if by == 'prize':
+                    txt = f"시상 {v:,.0f}원"
+                elif by == 'shortfall':
+                    txt = f"{prog} {v:,.0f}원 남음"
+                else:
+                    txt = f"{v:+,.0f}원"
+                if st.button(f"{i}. [{agency}] {name or '이름없음'} 설계사님 ({txt})", use_container_width=True,
+                             key=f"rk_{code}"):
+                    st.session_state.mgr_selected_code = code
+                    st.session_state.mgr_selected_name = f"[{agency}] {name}"
+                    st.session_state.mgr_back = 'rank'
+                    st.session_state.mgr_step = 'detail'
                     st.rerun()
 
         elif step == 'tiers':
@@ -726,31 +585,16 @@ elif mode == "👥 매니저 관리":
                 st.session_state.mgr_step = 'main'
                 st.rerun()
             cat = st.session_state.mgr_category
-            ranges = {500000: (300000, float('inf')), 300000: (200000, 300000),
-                      200000: (100000, 200000), 100000: (0, 100000)}
-            counts = {k: 0 for k in ranges}
-
-            for ac in my_agents:
-                cr, _ = calculate_agent_performance(ac, df_merged, ps)
-                matched_tiers = set()
-                for res in cr:
-                    if cat == "구간" and "구간" not in res['type']: continue
-                    if cat == "브릿지" and "브릿지" not in res['type']: continue
-                    val = res.get('val', res.get('val_prev', res.get('val_curr', 0.0))) or 0
-                    for t, (mn, mx) in ranges.items():
-                        if mn <= val < mx:
-                            matched_tiers.add(t)
-                            break
-                for t in matched_tiers:
-                    counts[t] += 1
+            ranges = manager_tier_ranges(mgr_index, cat)
+            counts = manager_tier_counts(mgr_index, cat, slc)
 
             st.markdown(f"<h3 class='main-title'>📁 {cat}실적 근접자 조회 (소속: 총 {len(my_agents)}명)</h3>", unsafe_allow_html=True)
             for t, (mn, mx) in ranges.items():
                 ct = counts[t]
-                if t == 500000:
-                    lbl = f"📁 50만 구간 근접 및 달성 (30만 이상) - 총 {ct}명"
+                if mx == float('inf'):
+                    lbl = f"📁 {man_won(t)} 구간 근접 및 달성 ({man_won(mn)} 이상) - 총 {ct}명"
                 else:
-                    lbl = f"📁 {int(t//10000)}만 구간 근접자 ({int(mn//10000)}만~{int(mx//10000)}만) - 총 {ct}명"
+                    lbl = f"📁 {man_won(t)} 구간 근접자 ({man_won(mn)}~{man_won(mx)}) - 총 {ct}명"
                 if st.button(lbl, use_container_width=True, key=f"t_{t}"):
                     st.session_state.mgr_step = 'list'
                     st.session_state.mgr_target = t
@@ -764,59 +608,51 @@ elif mode == "👥 매니저 관리":
                 st.rerun()
             cat = st.session_state.mgr_category
             target = st.session_state.mgr_target
-            min_v = st.session_state.mgr_min_v
-            max_v = st.session_state.mgr_max_v
 
-            if target == 500000:
-                st.markdown("<h3 class='main-title'>👥 50만 구간 근접 및 달성자 명단</h3>", unsafe_allow_html=True)
+            if st.session_state.get('mgr_max_v') == float('inf'):
+                st.markdown(f"<h3 class='main-title'>👥 {man_won(target)} 구간 근접 및 달성자 명단</h3>", unsafe_allow_html=True)
             else:
-                st.markdown(f"<h3 class='main-title'>👥 {int(target//10000)}만 구간 근접자 명단</h3>", unsafe_allow_html=True)
+                st.markdown(f"<h3 class='main-title'>👥 {man_won(target)} 구간 근접자 명단</h3>", unsafe_allow_html=True)
             st.info("💡 이름을 클릭하면 상세 실적을 확인하고 카톡으로 전송할 수 있습니다.")
 
-            near = []
-            for code in my_agents:
-                cr, _ = calculate_agent_performance(code, df_merged, ps)
-                # 이름/소속 가져오기
-                aname = "이름없음"
-                agency = ""
-                if an_col in df_merged.columns and ac_col in df_merged.columns:
-                    m = df_merged[get_clean_series(df_merged, ac_col) == code]
-                    if not m.empty:
-                        aname = _clean_excel_text(safe_str(m[an_col].values[0]))
-                        if ag_col in m.columns:
-                            agency = _clean_excel_text(safe_str(m[ag_col].values[0]))
-
-                for res in cr:
-                    if cat == "구간" and "구간" not in res['type']: continue
-                    if cat == "브릿지" and "브릿지" not in res['type']: continue
-                    val = res.get('val', res.get('val_prev', res.get('val_curr', 0.0))) or 0
-                    if min_v <= val < max_v:
-                        near.append((code, aname, agency, val))
-                        break
-
+            near = manager_tier_members(mgr_index, cat, slc, target)
             if not near:
                 st.info("해당 구간에 소속 설계사가 없습니다.")
             else:
-                near.sort(key=lambda x: (x[2], x[1]))
                 for code, name, agency, val in near:
-                    if st.button(f"👤 [{agency}] {name} 설계사님 (현재 {val:,.0f}원)", use_container_width=True, key=f"btn_{code}"):
+                    left = f" · {target - val:,.0f}원 남음" if val < target else ""
+                    if st.button(f"👤 [{agency}] {name} 설계사님 (현재 {val:,.0f}원{left})", use_container_width=True, key=f"btn_{code}"):
                         st.session_state.mgr_selected_code = code
                         st.session_state.mgr_selected_name = f"[{agency}] {name}"
+                        st.session_state.mgr_back = 'list'
                         st.session_state.mgr_step = 'detail'
                         st.rerun()
 
         elif step == 'detail':
             if st.button("⬅️ 명단으로 돌아가기"):
-                st.session_state.mgr_step = 'list'
+                st.session_state.mgr_step = st.session_state.get('mgr_back', 'list')
                 st.rerun()
             code = st.session_state.mgr_selected_code
             name = st.session_state.mgr_selected_name
             st.markdown("<div class='detail-box'>", unsafe_allow_html=True)
             st.markdown(f"<h4 class='agent-title'>👤 {name} 설계사님</h4>", unsafe_allow_html=True)
-            cr, tp = calculate_agent_performance(code, df_merged, ps)
-            render_ui_cards(name, cr, tp, data_date, show_share=True)
+            cr, tp = calculate_agent_performance(code, df_merged, ps, batch=prize_batch)
+            render_ui_cards(name, cr, tp, data_date, show_share=True,
+                            next_tiers=agent_next_tiers(snap.get('next_tier'), prize_batch, code),
+                            footer=settings.get('clip_footer', ""))
             st.markdown("</div>", unsafe_allow_html=True)
 
+            hist_sig = history_signature(HISTORY_DIR)
+            trend = get_history_store(hist_sig).agent_trend(code) if len(hist_sig) > 1 else None
+            if trend is not None and len(trend) > 1:
+                st.markdown("<h4 class='main-title'>📈 날짜별 추이</h4>", unsafe_allow_html=True)
+                trend[DATE_COL] = trend[DATE_COL].str[4:6] + "/" + trend[DATE_COL].str[6:]
+                perf_cols = [c for c in trend.columns if c.startswith('실적_')]
+                st.line_chart(trend.set_index(DATE_COL)[[TOTAL_COL] + perf_cols])
+                st.dataframe(trend, hide_index=True, use_container_width=True,
+                             column_config={c: st.column_config.NumberColumn(format="localized")
+                                            for c in trend.columns if c != DATE_COL})
+
 # ──────────────────────────────────────────
 # ⚙️ 시스템 관리자
 # ──────────────────────────────────────────
@@ -828,10 +664,64 @@ elif mode == "⚙️ 시스템 관리자":
         st.stop()
     st.success("✅ 인증 성공")
 
-    if st.button("🔄 데이터 캐시 초기화 (파일 교체 후 사용)", type="primary"):
-        st.cache_data.clear()
+    st.header("🗂️ 스냅샷 캐시")
+    st.caption(f"파일 내용 해시 기준 · 최대 {snapshot_cache.max_entries}개 / "
+               f"{snapshot_cache.max_bytes / 2 ** 20:,.0f}MB · 현재 {snapshot_cache.total_bytes() / 2 ** 20:,.1f}MB")
+    for e in snapshot_cache.entries():
+        cur = " (현재)" if e['key'] == snap['key'] else ""
+        b = e['build'] or {}
+        build = (f"증분 {b['agents']:,}명 재계산 (기준 `{b['base']}`)" if b.get('mode') == '증분' else "전체 계산") \
+            + f" {b.get('sec', 0):.2f}s"
+        c1, c2 = st.columns([4, 1])
+        with c1:
+            st.markdown(f"- `{e['key']}`{cur} · {e['sum']} + {e['bridge']} · {e['rows']:,}행 · "
+                        f"{e['mb']:,.1f}MB · 로딩 {e['load_sec']:.2f}s · {build} · 조회 {e['hits']:,}회 · "
+                        f"마지막 사용 {datetime.fromtimestamp(e['last_used']).strftime('%m/%d %H:%M:%S')}")
+        with c2:
+            if st.button("무효화", key=f"inv_{e['key']}", use_container_width=True):
+                snapshot_cache.invalidate(e['key'])
+                st.rerun()
+    if st.button("⚙️ settings.json 다시 읽기"):
+        load_settings.clear()
         st.rerun()
 
+    st.header("🧠 메모리")
+    rss = process_rss()
+    st.markdown(f"- **프로세스 상주 메모리**: {rss / 2 ** 20:,.0f}MB" if rss else "- **프로세스 상주 메모리**: 알 수 없음")
+    st.markdown(f"- **스냅샷 캐시 합계**: {snapshot_cache.total_bytes() / 2 ** 20:,.1f}MB ({len(snapshot_cache.entries())}개)")
+    mem = snap.get('memory')
+    if mem:
+        st.markdown(f"- **병합 데이터 (현재)**: {mem['before'] / 2 ** 20:,.1f}MB → {mem['after'] / 2 ** 20:,.1f}MB "
+                    f"(미사용 컬럼 {len(mem['dropped'])}개 제거 · 정수 다운캐스트 · 텍스트 category)")
+        st.markdown(f"- **시상 배열 · 인덱스**: {(snap['nbytes'] - mem['after']) / 2 ** 20:,.1f}MB")
+        with st.expander("컬럼별 메모리", expanded=False):
+            st.dataframe(mem['columns'], use_container_width=True, hide_index=True)
+            if mem['dropped']: st.caption("제거된 컬럼: " + ", ".join(map(str, mem['dropped'])))
+
+    st.header("🏢 조직별 집계")
+    rollups = snap.get('rollups') or {}
+    if rollups:
+        lv = st.selectbox("집계 단위", list(rollups), key='rollup_level')
+        tbl = rollups[lv]
+        st.caption(f"{len(tbl):,}개 {lv} · 설계사 {tbl['설계사수'].sum():,}명 · 시상합계 {tbl['시상합계'].sum():,.0f}원 "
+                   "(시상별 시상금 · 대상/달성 인원 · 매니저 폴더 기준 구간별 인원)")
+        st.dataframe(tbl, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="localized")
+                                    for c in tbl.columns if tbl[c].dtype.kind in 'if'})
+        st.download_button("⬇️ CSV 다운로드", tbl.to_csv(index=False).encode('utf-8-sig'),
+                           file_name=f"rollup_{lv}_{file_date(sp)}.csv", mime="text/csv")
+    else:
+        st.caption("집계할 조직 컬럼이 없습니다.")
+
+    st.header("📈 이력 데이터")
+    hist_sig = history_signature(HISTORY_DIR)
+    if hist_sig:
+        hs = get_history_store(hist_sig)
+        st.markdown(f"- **날짜**: {len(hs.dates)}개 ({hs.dates[0]} ~ {hs.dates[-1]}) · "
+                    f"{len(hs.df):,}행 · 설계사 {len(hs.pos):,}명 · {hs.nbytes() / 2 ** 20:,.1f}MB")
+    else:
+        st.caption(f"`{HISTORY_DIR}/` 가 비어 있습니다. `python ingest.py --history` 로 생성하세요.")
+
     st.header("📁 로드된 데이터")
     st.markdown(f"- **SUM 파일**: `{os.path.basename(sp)}`")
     st.markdown(f"- **BRIDGE 파일**: `{os.path.basename(bp) if bp else '없음'}`")
@@ -881,7 +771,15 @@ elif mode == "⚙️ 시스템 관리자":
         "상품": "상품 추가",
         "상품추가": "상품 추가2",
         "유퍼간편": "유퍼스트"
+      },
+      "snapshot_cache": {"max_entries": 3, "max_mb": 600},
+      "tier_boundaries": {
+        "구간": [100000, 200000, 300000, 500000],
+        "브릿지": [100000, 200000, 300000, 500000],
+        "연속가동": [100000, 200000, 300000, 500000],
+        "주차연속가동": [100000, 200000, 300000, 500000]
       }
     }
     ```
+    `tier_boundaries` 는 매니저 화면 구간 폴더 경계(원)입니다. 저장 후 ⚙️ settings.json 다시 읽기 를 누르면 폴더가 다시 계산됩니다.
     """)
@@ -0,0 +1,669 @@
+"""
+prize_core.py — 시상 데이터 공통 처리 (Streamlit 비의존)
+=============================================================
+• 엑셀 텍스트 정제 / 코드 정규화 유틸리티
+• PRIZE_SUM_OUT · PRIZE_6_BRIDGE_OUT 읽기 및 _key 병합
+• 병합 결과 스냅샷(parquet / Arrow IPC) 저장·로드 — ingest.py 와 prize.py 가 공유
+  (Arrow IPC 는 메모리 매핑으로 열어 여러 워커 프로세스가 OS 페이지 캐시를 공유)
+• ReadOnlyFrame: 세션 간 공유되는 병합 데이터의 변경 방지
+• 델타 스냅샷: 직전 스냅샷 대비 바뀐 행·컬럼만 저장하고 로딩 때 합성
+"""
+
+import os
+import re
+import json
+import glob
+import itertools
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+
+DATA_DIR = "data"
+CODE_COL = '대리점설계사조직코드'
+MGR_COL = '지원매니저코드'
+
+NAME_COL, BRANCH_COL = '대리점설계사명', '지점조직명'
+
+# 조회에 쓰이는 정규화 코드 컬럼 — 로딩 시 _ck_<col> 로 한 번만 만들어 캐시 데이터에 포함
+KEY_COLS = (CODE_COL, MGR_COL)
+
+# 시상 컬럼 외에 화면에서 쓰는 컬럼 (compact_frame 이 남기는 것)
+UI_COLS = (CODE_COL, MGR_COL, '지원매니저명', NAME_COL, '대리점지사명', BRANCH_COL)
+
+# detect_prize_structure 가 볼 수 있는 컬럼 이름 패턴 — 엑셀을 읽을 때 이 컬럼들만 읽음
+PRIZE_COL_RE = re.compile(r'^(추가13회예정금|실적_\d+주차$|브릿지|연속가동|주차연속가동)')
+
+# 스냅샷 parquet 스키마 메타데이터 키 (병합 완료 여부 표시)
+SNAPSHOT_META_KEY = b'prize_snapshot'
+# 델타 스냅샷 메타데이터 키 (직전 스냅샷 대비 변경분만 저장)
+DELTA_META_KEY = b'prize_delta'
+
+# 같은 날짜에 여러 형식이 있으면 앞쪽 우선 (arrow: 메모리 매핑, parquet: 압축)
+DATA_EXTS = ('.arrow', '.parquet', '.xlsx')
+
+
+# ═══════════════════════════════════════════════════════
+# 0. 유틸리티
+# ═══════════════════════════════════════════════════════
+def _clean_excel_text(s):
+    if not s or not isinstance(s, str): return s
+    return re.sub(r'_x([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), s)
+
+def safe_str(val):
+    if pd.isna(val) or val is None: return ""
+    try:
+        if isinstance(val, (int, float)) and float(val).is_integer(): val = int(float(val))
+    except: pass
+    s = str(val)
+    s = re.sub(r'_[xX]([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), s)
+    s = re.sub(r'\s+', '', s)
+    if s.endswith('.0'): s = s[:-2]
+    return s.upper()
+
+def safe_float(val):
+    if pd.isna(val) or val is None: return 0.0
+    s = str(val).replace(',', '').strip()
+    try: return float(s)
+    except: return 0.0
+
+# ── 컬럼 단위(벡터) 정규화 — safe_str / _clean_excel_text 와 결과 동일 ──
+# ASCII 범위에서 파이썬 re 의 \s 와 같은 문자 집합 (RE2 의 \s 는 \v, \x1c-\x1f 를 빠뜨림)
+_ASCII_WS = r'[\t\n\x0b\x0c\r\x1c-\x1f ]+'
+_ESC_RE2 = r'_[xX][0-9A-Fa-f]{4}_'
+# ASCII + 한글(음절·자모)만으로 된 값 — 대소문자·공백 규칙이 ASCII 와 같아 커널로 처리 가능
+_FAST_TEXT_RE2 = r'^[\x00-\x7f\x{1100}-\x{11FF}\x{3131}-\x{318E}\x{AC00}-\x{D7A3}]*$'
+
+def clean_excel_series(s):
+    """s.apply(lambda v: _clean_excel_text(str(v)) if pd.notna(v) else v) 의 벡터 버전"""
+    nn = s.notna()
+    if not nn.any():
+        return s
+    if s.dtype == 'object' and pd.api.types.infer_dtype(s, skipna=True) != 'string':
+        s = s.copy()
+        s[nn] = s[nn].astype(str)
+    esc = s.str.contains('_x', regex=False, na=False)
+    if esc.any():
+        # 이스케이프가 있는 행만, 고유값 단위로 정규식 처리 (구분선 컬럼은 전 행이 같은 값)
+        s = s.copy()
+        sub = s[esc]
+        s[esc] = sub.map({u: _clean_excel_text(u) for u in pd.unique(sub)})
+    # apply() 와 같은 dtype 추론 (object → str 등)
+    return s.infer_objects() if s.dtype == 'object' else s
+
+def safe_str_series(s):
+    """s.apply(safe_str) 의 벡터 버전 — ASCII·한글 무이스케이프 값은 pyarrow 커널, 나머지만 safe_str"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    n = len(s)
+    out = np.full(n, "", dtype=object)
+    if n == 0:
+        return s.apply(safe_str)
+    vals = s.to_numpy(dtype=object)
+    slow = np.zeros(n, dtype=bool)
+
+    if pd.api.types.is_bool_dtype(s):
+        slow[:] = True
+    elif pd.api.types.is_integer_dtype(s) and not s.isna().any():
+        out[:] = pc.cast(pa.array(s.to_numpy(dtype=np.int64)), pa.string()).to_numpy(zero_copy_only=False)
+    elif pd.api.types.is_numeric_dtype(s):
+        f = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        fin = np.isfinite(f)
+        whole = fin & (np.floor(f) == f) & (np.abs(f) < 2.0 ** 63)
+        if whole.any():
+            out[whole] = pc.cast(pa.array(f[whole].astype(np.int64)), pa.string()).to_numpy(zero_copy_only=False)
+        slow = ~whole & ~np.isnan(f)
+    else:
+        is_str = np.fromiter((type(v) is str for v in vals), dtype=bool, count=n)
+        nn = s.notna().to_numpy()
+        slow = nn & ~is_str
+        if is_str.any():
+            arr = pa.array(vals[is_str], type=pa.string())
+            fast = pc.and_(pc.match_substring_regex(arr, _FAST_TEXT_RE2),
+                           pc.invert(pc.match_substring_regex(arr, _ESC_RE2))).to_numpy(zero_copy_only=False)
+            r = pc.replace_substring_regex(arr, _ASCII_WS, '')
+            r = pc.replace_substring_regex(r, r'\.0$', '')
+            r = pc.ascii_upper(r).to_numpy(zero_copy_only=False)
+            pos = np.flatnonzero(is_str)
+            out[pos[fast]] = r[fast]
+            slow[pos[~fast]] = True
+    if slow.any():
+        out[slow] = [safe_str(v) for v in vals[slow]]
+    return pd.Series(out, index=s.index).infer_objects()
+
+def get_clean_series(df, col_name):
+    # KEY_COLS 는 load_merged 에서 미리 만들어 두므로 여기서는 조회만 함
+    ck = f"_ck_{col_name}"
+    if ck not in df.columns:
+        if isinstance(df, ReadOnlyFrame):
+            return safe_str_series(df[col_name])  # 공유 데이터에는 컬럼을 추가하지 않음
+        df[ck] = safe_str_series(df[col_name])
+    return df[ck]
+
+def file_date(path):
+    """파일명에서 YYYYMMDD 추출 (없으면 '00000000')"""
+    m = re.search(r'(\d{8})', os.path.basename(path or ''))
+    return m.group(1) if m else '00000000'
+
+
+# ── 읽기 전용 DataFrame (세션 간 공유 스냅샷) ──
+class ReadOnlyFrameError(TypeError):
+    pass
+
+class _ReadOnlyIndexer:
+    """loc/iloc/at/iat 조회는 그대로, 대입은 차단"""
+    def __init__(self, ix):
+        self._ix = ix
+    def __getitem__(self, key):
+        return self._ix[key]
+    def __setitem__(self, key, value):
+        raise ReadOnlyFrameError("공유 스냅샷은 읽기 전용입니다 — 사본(.copy())을 만들어 수정하세요")
+
+class ReadOnlyFrame(pd.DataFrame):
+    """컬럼 추가·삭제, 값 대입, inplace 연산을 막은 DataFrame.
+    슬라이스·연산 결과는 일반 DataFrame (copy-on-write 로 원본에 영향 없음)"""
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _readonly(self, *args, **kwargs):
+        raise ReadOnlyFrameError("공유 스냅샷은 읽기 전용입니다 — 사본(.copy())을 만들어 수정하세요")
+
+    __setitem__ = __delitem__ = insert = pop = isetitem = update = _readonly
+
+    def __setattr__(self, name, value):
+        # df.컬럼 = 값 형태의 대입 차단 (pandas 내부 속성은 허용)
+        if not name.startswith('_') and '_mgr' in self.__dict__ and name in self.columns:
+            self._readonly()
+        super().__setattr__(name, value)
+
+    loc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.loc.fget(self)))
+    iloc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iloc.fget(self)))
+    at = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.at.fget(self)))
+    iat = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iat.fget(self)))
+
+def _no_inplace(name):
+    base = getattr(pd.DataFrame, name)
+    def method(self, *args, **kwargs):
+        if kwargs.get('inplace'): self._readonly()
+        return base(self, *args, **kwargs)
+    method.__name__ = name
+    return method
+
+for _m in ('fillna', 'replace', 'drop', 'rename', 'set_index', 'reset_index', 'sort_values',
+           'sort_index', 'where', 'mask', 'clip', 'interpolate', 'ffill', 'bfill',
+           'dropna', 'drop_duplicates', 'query', 'eval', 'set_axis'):
+    setattr(ReadOnlyFrame, _m, _no_inplace(_m))
+
+def freeze_frame(df):
+    """df 를 복사 없이 ReadOnlyFrame 으로 감쌈 (이미 읽기 전용이면 그대로)"""
+    return df if isinstance(df, ReadOnlyFrame) else ReadOnlyFrame(df)
+
+
+# ═══════════════════════════════════════════════════════
+# 1. 읽기 · 병합
+# ═══════════════════════════════════════════════════════
+def _is_arrow(path):
+    return bool(path) and path.lower().endswith(('.arrow', '.feather'))
+
+def is_snapshot(path):
+    """ingest.py 가 만든 병합 스냅샷(parquet / Arrow IPC)인지 확인"""
+    if not path or not path.lower().endswith(('.parquet', '.arrow', '.feather')):
+        return False
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if _is_arrow(path):
+            with pa.memory_map(path, 'r') as src:
+                meta = pa.ipc.open_file(src).schema.metadata or {}
+        else:
+            meta = pq.read_schema(path).metadata or {}
+    except Exception:
+        return False
+    return SNAPSHOT_META_KEY in meta
+
+def read_prize_file(path, usecols=None):
+    """parquet 우선, xlsx는 calamine -> openpyxl 폴백.
+    usecols(헤더 이름 목록 → 읽을 이름 목록) 를 주면 해당 컬럼만 읽음"""
+    if path and path.lower().endswith('.parquet'):
+        df = pd.read_parquet(path)
+    elif _is_arrow(path):
+        df = read_snapshot(path)
+    elif usecols is not None:
+        try:
+            df = read_xlsx_columns(path, usecols)
+        except Exception:
+            _uc = lambda c: bool(usecols([_clean_excel_text(c) if isinstance(c, str) else c]))
+            df = pd.read_excel(path, engine='openpyxl', usecols=_uc)
+    else:
+        try:
+            df = pd.read_excel(path, engine='calamine')
+        except Exception:
+            df = pd.read_excel(path, engine='openpyxl')
+    df.columns = [_clean_excel_text(str(c)) if isinstance(c, str) else c for c in df.columns]
+    if usecols is not None and not path.lower().endswith('.xlsx'):
+        df = df[usecols(df.columns.tolist())]
+    for col in df.columns:
+        if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
+            df[col] = clean_excel_series(df[col])
+    return df
+
+def _convert_cell(v):
+    # pandas calamine 리더와 같은 셀 변환 (정수 float → int, date → datetime)
+    if isinstance(v, float):
+        i = int(v)
+        return i if i == v else v
+    if isinstance(v, date) and not isinstance(v, datetime):
+        return datetime(v.year, v.month, v.day)
+    return v
+
+def _convert_column(col):
+    # 컬럼의 값 타입을 먼저 보고 변환이 필요한 셀만 처리 (정수 float 은 numpy 로 한 번에)
+    types = set(map(type, col))
+    if types <= {str, int, bool, datetime}:
+        return col
+    if not types <= {float, str, int, bool, datetime}:
+        return [_convert_cell(v) for v in col]
+    col = list(col)
+    pos = [i for i, v in enumerate(col) if type(v) is float]
+    a = np.array([col[i] for i in pos], dtype=np.float64)
+    whole = np.isfinite(a) & (np.floor(a) == a) & (np.abs(a) < 2.0 ** 63)
+    ints = np.where(whole, a, 0).astype(np.int64).tolist()
+    for i, w, iv in zip(pos, whole.tolist(), ints):
+        if w: col[i] = iv
+    return col
+
+def read_xlsx_columns(path, select, chunk_rows=5000, progress=None):
+    """헤더 행만 먼저 읽어 select(헤더 이름 목록) 가 고른 컬럼만 행 단위로 스트리밍.
+    결과는 pd.read_excel(engine='calamine') 의 해당 컬럼과 같음.
+    path 는 경로 또는 파일 객체, progress(비율) 는 chunk_rows 행마다 호출"""
+    from python_calamine import CalamineWorkbook
+    from pandas.io.parsers import TextParser
+    sheet = CalamineWorkbook.from_object(path).get_sheet_by_index(0)
+    if tuple(sheet.start or (0, 0)) != (0, 0):
+        raise ValueError("A1 에서 시작하지 않는 시트")  # 빈 영역 처리는 pandas 에 맡김
+    rows = sheet.iter_rows()
+    header = next(rows, None)
+    if not header:
+        return pd.DataFrame()
+    names = [_clean_excel_text(h) if isinstance(h, str) else h for h in header]
+    keep = set(select(names))
+    idx = [i for i, n in enumerate(names) if n in keep]
+    if not idx:
+        return pd.DataFrame(index=range(sum(1 for _ in rows)))
+    # chunk_rows 행씩 필요한 셀만 떼어 컬럼 단위로 변환·누적 (나머지 셀은 바로 버림)
+    acc = [[] for _ in idx]
+    done, total = 1, max(sheet.height, 1)
+    while True:
+        chunk = [[r[i] for i in idx] for r in itertools.islice(rows, chunk_rows)]
+        if not chunk: break
+        for a, c in zip(acc, zip(*chunk)):
+            a.extend(_convert_column(c))
+        done += len(chunk)
+        if progress: progress(min(done / total, 1.0))
+    data = [[header[i] for i in idx]]
+    data.extend(map(list, zip(*acc)))
+    del acc
+    return TextParser(data, header=0, skip_blank_lines=False).read()
+
+def merge_prize_frames(df_sum, df_br=None):
+    """SUM ⟷ BRIDGE 를 정규화 코드(_key)로 left 병합"""
+    df_sum['_key'] = safe_str_series(df_sum[CODE_COL])
+    if df_br is None:
+        return df_sum.copy()
+    df_br['_key'] = safe_str_series(df_br[CODE_COL])
+    br_only = [c for c in df_br.columns if c not in df_sum.columns or c == '_key']
+    return pd.merge(df_sum, df_br[br_only], on='_key', how='left')
+
+def add_clean_keys(df, cols=KEY_COLS):
+    """get_clean_series() 가 찾는 _ck_<col> 컬럼을 미리 생성 (이미 있으면 건너뜀)"""
+    for col in cols:
+        ck = f"_ck_{col}"
+        if col in df.columns and ck not in df.columns:
+            df[ck] = df['_key'] if col == CODE_COL and '_key' in df.columns else safe_str_series(df[col])
+    return df
+
+def dated_files(data_dir=DATA_DIR, pattern_base="PRIZE_SUM_OUT_*"):
+    """날짜 → 대표 파일 {YYYYMMDD: 경로} (날짜 오름차순) — 같은 날짜면 arrow > parquet > xlsx"""
+    files = [f for ext in DATA_EXTS for f in glob.glob(os.path.join(data_dir, pattern_base + ext))]
+    by_date = {}
+    for f in files:
+        by_date.setdefault(file_date(f), []).append(f)
+    # 형식 우선순위 (arrow 스냅샷 → parquet → xlsx, 같은 형식이면 전체 스냅샷 → 델타)
+    return {d: min(fs, key=lambda f: (DATA_EXTS.index(os.path.splitext(f)[1].lower()), is_delta_name(f)))
+            for d, fs in sorted(by_date.items())}
+
+def find_latest_files(data_dir=DATA_DIR):
+    """최신 날짜의 (SUM, BRIDGE, 기준일) — 같은 날짜면 arrow > parquet > xlsx"""
+    if not os.path.exists(data_dir):
+        return None, None, None
+    def _latest(pattern_base):
+        files = dated_files(data_dir, pattern_base)
+        return files[max(files)] if files else None
+    sp = _latest("PRIZE_SUM_OUT_*")
+    bp = _latest("PRIZE_6_BRIDGE_OUT_*")
+    return sp, bp, data_base_date(sp)
+
+def data_base_date(sum_path):
+    """파일 날짜 전날을 기준일로 ('YYYY.MM.DD', 날짜 없으면 None)"""
+    d = file_date(sum_path) if sum_path else '00000000'
+    if d == '00000000':
+        return None
+    return (datetime.strptime(d, '%Y%m%d') - timedelta(days=1)).strftime('%Y.%m.%d')
+
+def load_merged(sum_path, bridge_path):
+    """병합 스냅샷이면 그대로(델타는 기준 스냅샷에 적용), 아니면 SUM/BRIDGE 를 읽어 병합"""
+    if is_delta_name(sum_path):
+        delta = read_delta(sum_path)
+        base = load_merged(os.path.join(os.path.dirname(sum_path), delta['base']), None)
+        return add_clean_keys(apply_delta(base, delta))
+    if is_snapshot(sum_path):
+        return add_clean_keys(read_snapshot(sum_path))
+    df_sum = read_prize_file(sum_path, usecols=read_columns)
+    df_br = read_prize_file(bridge_path, usecols=read_columns) if bridge_path and os.path.exists(bridge_path) else None
+    return add_clean_keys(merge_prize_frames(df_sum, df_br))
+
+
+# ═══════════════════════════════════════════════════════
+# 2. 시상 구조 자동 감지
+# ═══════════════════════════════════════════════════════
+def detect_prize_structure(cols_tuple, labels_json):
+    cols = set(cols_tuple)
+    labels = json.loads(labels_json)
+    wp = re.compile(r'^추가13회예정금_(\d+)주대상$')
+    sp = re.compile(r'^추가13회예정금_(\d+)주대상_(.+)$')
+    mp = re.compile(r'^추가13회예정금_(\d+)_(\d+)주대상$')  # 연속주차 (예: 1_2주)
+    smap = {'상품': '상품', '상품추가': '상품추가', '유퍼': '유퍼간편'}
+
+    detected = {}
+    for c in sorted(cols):
+        # 기본: 추가13회예정금_{N}주대상
+        m = wp.match(c)
+        if m:
+            w = int(m.group(1))
+            pc = f'추가13회예정금_{w}주'
+            if pc in cols:
+                detected.setdefault(w, []).append({
+                    'label': labels.get('base', '인보험 기본'),
+                    'elig': c, 'prize': pc})
+        # 서브: 추가13회예정금_{N}주대상_상품 등
+        m2 = sp.match(c)
+        if m2:
+            w, sfx = int(m2.group(1)), m2.group(2)
+            ps = smap.get(sfx, sfx)
+            pc = f'추가13회예정금_{w}주_{ps}'
+            if pc in cols:
+                detected.setdefault(w, []).append({
+                    'label': labels.get(ps, labels.get(sfx, sfx)),
+                    'elig': c, 'prize': pc})
+        # 연속주차: 추가13회예정금_{A}_{B}주대상 → B주차 하위항목으로 편입
+        m3 = mp.match(c)
+        if m3:
+            a, b = int(m3.group(1)), int(m3.group(2))
+            pc = f'추가13회예정금_{a}_{b}주'
+            if pc in cols:
+                detected.setdefault(b, []).append({
+                    'label': f"{labels.get('base', '인보험 기본')} ({a}주)",
+                    'elig': c, 'prize': pc})
+
+    weeks = {}
+    for w in sorted(detected.keys()):
+        pf = f'실적_{w}주차'
+        weeks[w] = {'perf': pf if pf in cols else None, 'items': detected[w]}
+
+    cumul = None
+    if '추가13회예정금_월대상' in cols and '추가13회예정금계' in cols:
+        cumul = {'elig': '추가13회예정금_월대상', 'prize': '추가13회예정금계'}
+
+    bridge = None
+    if '브릿지시상금' in cols:
+        bm = sorted(set(int(m.group(1)) for c in cols for m in [re.match(r'^브릿지실적_(\d+)월$', c)] if m))
+        pm, cm = (bm[0] if len(bm) >= 1 else None), (bm[1] if len(bm) >= 2 else None)
+        bridge = {
+            'prev': f'브릿지실적_{pm}월' if pm else None,
+            'curr': f'브릿지실적_{cm}월' if cm else None,
+            'prize': '브릿지시상금',
+            'shortfall': f'브릿지부족금액_{cm}월' if cm and f'브릿지부족금액_{cm}월' in cols else None,
+            'target': f'브릿지실적목표_{cm}월' if cm and f'브릿지실적목표_{cm}월' in cols else None,
+            'lp': f'{pm}월' if pm else '', 'lc': f'{cm}월' if cm else '',
+        }
+
+    consec = None
+    if '연속가동시상금' in cols:
+        cm2 = sorted(set(int(m.group(1)) for c in cols for m in [re.match(r'^연속가동실적_(\d+)월$', c)] if m))
+        pm2, cm2b = (cm2[0] if len(cm2) >= 1 else None), (cm2[1] if len(cm2) >= 2 else None)
+        consec = {
+            'prev': f'연속가동실적_{pm2}월' if pm2 else None,
+            'curr': f'연속가동실적_{cm2b}월' if cm2b else None,
+            'prize': '연속가동시상금',
+            'shortfall': f'연속가동부족금액_{cm2b}월' if cm2b and f'연속가동부족금액_{cm2b}월' in cols else None,
+            'target': f'연속가동실적목표_{cm2b}월' if cm2b and f'연속가동실적목표_{cm2b}월' in cols else None,
+            'lp': f'{pm2}월' if pm2 else '', 'lc': f'{cm2b}월' if cm2b else '',
+        }
+
+    # ── 주차연속가동 (3~4주 동일 가동) ──
+    weekly_consec = None
+    if '주차연속가동대상' in cols:
+        weekly_consec = {
+            'target_col': '주차연속가동대상',
+            'perf_3w': '주차연속가동_3주실적' if '주차연속가동_3주실적' in cols else None,
+            'perf_4w': '주차연속가동_4주실적' if '주차연속가동_4주실적' in cols else None,
+            'tier_3w': '주차연속가동_3주구간' if '주차연속가동_3주구간' in cols else None,
+            'tier_4w': '주차연속가동_4주구간' if '주차연속가동_4주구간' in cols else None,
+            'target': '주차연속가동_실적목표' if '주차연속가동_실적목표' in cols else None,
+            'shortfall': '주차연속가동_실적부족액' if '주차연속가동_실적부족액' in cols else None,
+            'prize': '추가13회예정금_주차연속가동' if '추가13회예정금_주차연속가동' in cols else None,
+        }
+
+    return {'weeks': weeks, 'cumul': cumul,
+            'bridge': bridge, 'consec': consec,
+            'weekly_consec': weekly_consec}
+
+def prize_columns(ps):
+    """ps(detect_prize_structure 결과)가 참조하는 컬럼 목록 (순서 유지, 중복 제거)"""
+    cols = []
+    for info in ps['weeks'].values():
+        if info['perf']: cols.append(info['perf'])
+        for it in info['items']:
+            cols += [it['elig'], it['prize']]
+    for key in ('cumul', 'bridge', 'consec'):
+        sec = ps.get(key) or {}
+        for k in ('elig', 'prize', 'prev', 'curr', 'shortfall', 'target'):
+            if sec.get(k): cols.append(sec[k])
+    wc = ps.get('weekly_consec') or {}
+    for k in ('target_col', 'perf_3w', 'perf_4w', 'tier_3w', 'tier_4w', 'target', 'shortfall', 'prize'):
+        if wc.get(k): cols.append(wc[k])
+    return list(dict.fromkeys(cols))
+
+
+def used_columns(cols):
+    """detect_prize_structure · 화면이 실제로 참조하는 컬럼 (cols 순서 유지)"""
+    cols = list(cols)
+    ps = detect_prize_structure(tuple(cols), '{}')
+    used = set(prize_columns(ps)) | set(UI_COLS)
+    return [c for c in cols if c in used or str(c).startswith('_ck_')]
+
+def read_columns(cols):
+    """원본 파일에서 읽을 컬럼 — 화면 컬럼 + 시상 이름 패턴 (SUM/BRIDGE 각각 판단해도 빠짐없음)"""
+    return [c for c in cols if c in UI_COLS or (isinstance(c, str) and PRIZE_COL_RE.match(c))]
+
+
+# ═══════════════════════════════════════════════════════
+# 3. 스냅샷 (parquet / Arrow IPC)
+# ═══════════════════════════════════════════════════════
+def snapshot_path(date, data_dir=DATA_DIR, fmt='parquet'):
+    # find_latest_files() 의 arrow > parquet 우선 규칙에 그대로 걸리는 이름
+    return os.path.join(data_dir, f"PRIZE_SUM_OUT_{date}.{fmt}")
+
+def _arrow_table(df, meta_key, info):
+    import pyarrow as pa
+    out = df.reset_index(drop=True)
+    for col in out.columns:
+        # 혼합 object 컬럼은 문자열로 통일 (parquet 타입 충돌 방지)
+        if out[col].dtype == 'object':
+            out[col] = out[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[meta_key] = json.dumps(info, ensure_ascii=False).encode('utf-8')
+    return table.replace_schema_metadata(meta)
+
+def write_snapshot(df, path, sources=None, compact=False):
+    """병합 결과 저장 (임시파일 → rename 으로 원자적 교체)
+    .parquet: zstd 압축 / .arrow: 무압축 Arrow IPC — 메모리 매핑으로 복사 없이 열림"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = _arrow_table(df, SNAPSHOT_META_KEY, {
+        'version': 1, 'sources': [os.path.basename(s) for s in (sources or []) if s], 'compact': compact})
+    tmp = path + ".tmp"
+    if _is_arrow(path):
+        # 압축하면 매핑한 페이지를 그대로 쓸 수 없으므로 무압축 · 단일 배치
+        table = table.combine_chunks()
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+    return path
+
+def read_snapshot(path):
+    """스냅샷 로드 — Arrow IPC 는 메모리 매핑, 널 없는 숫자 컬럼은 매핑된 버퍼를 그대로 사용"""
+    if not _is_arrow(path):
+        return pd.read_parquet(path)
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def list_source_dates(data_dir=DATA_DIR):
+    """data/ 의 PRIZE_SUM_OUT_*.xlsx 날짜 목록 (오름차순)"""
+    files = glob.glob(os.path.join(data_dir, "PRIZE_SUM_OUT_*.xlsx"))
+    return sorted({file_date(f) for f in files} - {'00000000'})
+
+def source_pair(date, data_dir=DATA_DIR):
+    """해당 날짜의 SUM xlsx 와, 같은 날짜 이하 중 가장 최근 BRIDGE xlsx"""
+    sp = os.path.join(data_dir, f"PRIZE_SUM_OUT_{date}.xlsx")
+    if not os.path.exists(sp):
+        return None, None
+    brs = [f for f in glob.glob(os.path.join(data_dir, "PRIZE_6_BRIDGE_OUT_*.xlsx"))
+           if file_date(f) <= date]
+    bp = max(brs, key=file_date) if brs else None
+    return sp, bp
+
+
+# ═══════════════════════════════════════════════════════
+# 4. 델타 스냅샷 (직전 스냅샷 대비 변경분)
+# ═══════════════════════════════════════════════════════
+def delta_path(date, data_dir=DATA_DIR):
+    # .parquet 로 끝나므로 find_latest_files() 에 그대로 걸림 (같은 날짜 전체 스냅샷보다는 후순위)
+    return os.path.join(data_dir, f"PRIZE_SUM_OUT_{date}.delta.parquet")
+
+def is_delta_name(path):
+    return bool(path) and path.lower().endswith('.delta.parquet')
+
+def diff_frames(old, new, key='_key'):
+    """old → new 변경분 (키가 유일하지 않으면 None)
+    patch 는 바뀐 행 · 새 행만 담고, 기존 행의 안 바뀐 컬럼 칸은 비워 둠 (parquet 에서 거의 0 바이트)"""
+    if key not in old.columns or key not in new.columns or not old[key].is_unique or not new[key].is_unique:
+        return None
+    o, n = old.set_index(key), new.set_index(key)
+    src = o.index.get_indexer(n.index)          # 새 행 → 기존 행 위치 (새로 생긴 행은 -1)
+    kept = src >= 0
+    common_cols = [c for c in n.columns if c in o.columns]
+    added_cols = [c for c in n.columns if c not in o.columns]
+    oo, nn = o.iloc[src[kept]][common_cols], n.loc[kept, common_cols]
+    neq = ~(oo.eq(nn) | (oo.isna() & nn.isna()))
+    # 값이 같아도 타입이 바뀐 컬럼은 변경으로 취급
+    neq[[c for c in common_cols if oo[c].dtype != nn[c].dtype]] = True
+    changed = np.zeros(len(n), dtype=bool)
+    changed[kept] = neq.any(axis=1).to_numpy()
+    # 기존 행에 덮어쓸 컬럼: 값이 바뀐 컬럼 + 새 컬럼 (새 컬럼은 기존 행 전부에 값이 필요)
+    update_cols = [c for c in common_cols if neq[c].any()] + added_cols
+    if added_cols:
+        changed[kept] = True
+    rows = changed | ~kept
+    patch = new.loc[rows].reset_index(drop=True)
+    skip = [c for c in n.columns if c not in update_cols]
+    if skip:
+        existing = changed[rows]
+        for c in skip:
+            patch[c] = patch[c].mask(existing)
+    survives = o.index.isin(n.index)
+    default = np.r_[np.flatnonzero(survives), np.full(int((~kept).sum()), -1)]
+    return {
+        'key': key, 'patch': patch,
+        'update_cols': update_cols,
+        'removed': o.index[~survives].tolist(),
+        'columns': new.columns.tolist(),
+        'dtypes': {c: str(new[c].dtype) for c in new.columns},
+        # 행 순서가 "기존 순서 + 새 행" 과 다를 때만 행별 출처 위치 저장
+        'order': None if np.array_equal(default, src) else src,
+        'stats': {'rows': len(n), 'cols': len(n.columns), 'patch_rows': int(rows.sum()),
+                  'update_cols': len(update_cols), 'added': int((~kept).sum()),
+                  'removed': int((~survives).sum()), 'changed': int(changed.sum())},
+    }
+
+def apply_delta(base, delta):
+    """diff_frames 결과를 base 에 적용한 새 DataFrame (원본은 그대로)"""
+    key = delta['key']
+    b = base.set_index(key)
+    p = delta['patch'].set_index(key)
+    in_base = p.index.isin(b.index)
+    upd = pd.DataFrame(b.loc[p.index[in_base]])
+    for c in delta['update_cols']:
+        upd[c] = p.loc[in_base, c]
+    kept = b[~b.index.isin(delta['removed'])]
+    merged = pd.concat([kept[~kept.index.isin(p.index)], upd, p[~in_base]])
+    src = delta['order']
+    if src is None:
+        order = kept.index.append(p.index[~in_base])
+    else:
+        order = np.empty(len(src), dtype=object)
+        order[src >= 0] = b.index.to_numpy()[src[src >= 0]]
+        order[src < 0] = p.index[~in_base].to_numpy()
+    out = merged.loc[order].reset_index()[delta['columns']]
+    for c, dt in delta['dtypes'].items():
+        if str(out[c].dtype) != dt:
+            out[c] = out[c].astype(dt)
+    return out.reset_index(drop=True)
+
+def _pack_ints(a):
+    import zlib
+    import base64
+    return base64.b64encode(zlib.compress(np.diff(np.asarray(a, dtype=np.int64), prepend=0).tobytes())).decode()
+
+def _unpack_ints(s):
+    import zlib
+    import base64
+    return np.cumsum(np.frombuffer(zlib.decompress(base64.b64decode(s)), dtype=np.int64))
+
+def write_delta(delta, path, base_path, sources=None):
+    """변경분 parquet 저장 — 기준 스냅샷 이름·삭제 키·행 순서는 스키마 메타데이터에"""
+    import pyarrow.parquet as pq
+    order = delta['order']
+    table = _arrow_table(delta['patch'], DELTA_META_KEY, {
+        'version': 1, 'base': os.path.basename(base_path), 'key': delta['key'],
+        'update_cols': delta['update_cols'], 'removed': delta['removed'],
+        'columns': delta['columns'], 'dtypes': delta['dtypes'],
+        'order': None if order is None else _pack_ints(order), 'stats': delta['stats'],
+        'sources': [os.path.basename(s) for s in (sources or []) if s]})
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+    return path
+
+def read_delta(path):
+    import pyarrow.parquet as pq
+    table = pq.read_table(path)
+    info = json.loads(table.schema.metadata[DELTA_META_KEY])
+    if info['order'] is not None:
+        info['order'] = _unpack_ints(info['order'])
+    info['patch'] = table.to_pandas()
+    return info
+
+def delta_chain(path):
+    """델타 → 기준 스냅샷으로 거슬러 올라간 경로 목록 (전체 스냅샷이 마지막)"""
+    chain = [path]
+    while is_delta_name(chain[-1]):
+        import pyarrow.parquet as pq
+        info = json.loads(pq.read_schema(chain[-1]).metadata[DELTA_META_KEY])
+        chain.append(os.path.join(os.path.dirname(chain[-1]), info['base']))
+    return chain
@@ -0,0 +1,891 @@
+"""
+prize_engine.py — 에이전트 시상 계산 엔진 (Streamlit 비의존)
+=============================================================
+• 설계사 코드 → 행 위치 해시 인덱스 + 시상 컬럼만 담은 압축 레코드
+• calculate_agent_performance: 인덱스가 있으면 O(1) 조회
+• build_prize_batch: 전 설계사 시상 결과를 NumPy 배열로 한 번에 계산
+• build_manager_index: 매니저 → 소속 설계사 · 구간별 인원/명단 (스냅샷당 1회)
+• build_search_index: (이름, 지점번호) → 설계사 코드 (내 실적 조회)
+• compact_frame: 안 쓰는 컬럼 제거 · 텍스트 category · 정수 다운캐스트 (상주 메모리 축소)
+• update_*: 직전 스냅샷 대비 바뀐 설계사 · 매니저만 다시 계산 (갱신 비용 ∝ 변경량)
+• build_next_tiers: 전 설계사 × 시상별 다음 구간 기준 · 부족금액 · 달성 시 추가 시상금 (스냅샷당 1회)
+• manager_leaderboard: 매니저 팀 top-K (시상 합계 · 다음 구간 근접 · 주간 증가) — argpartition 부분 정렬
+• build_rollups: 지점 · 대리점지사 · 매니저 단위 시상금 · 대상/달성 인원 · 구간별 인원 (스냅샷당 1회)
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+from prize_core import (
+    CODE_COL, MGR_COL, NAME_COL, BRANCH_COL, UI_COLS, safe_str, safe_float,
+    safe_str_series, clean_excel_series, get_clean_series, prize_columns, used_columns,
+)
+
+# 구간 경계 [이상] — 10만 · 20만 · 30만 · 50만 (주차 실적 구간 · 매니저 폴더 기본값)
+TIER_BOUNDS = (100000, 200000, 300000, 500000)
+# 매니저 화면 구간 폴더 카테고리 — settings.json "tier_boundaries" 로 카테고리별 경계 변경
+TIER_CATEGORIES = ('구간', '브릿지', '연속가동', '주차연속가동')
+
+def tier_ranges(bounds=TIER_BOUNDS):
+    """경계 [b1 < … < bk] → {목표: (하한, 상한)} 큰 목표부터 [하한 이상 상한 미만].
+    목표 bi 폴더는 b(i-1) ~ bi, 맨 위 폴더는 b(k-1) 이상 전부 (근접 및 달성)"""
+    b = sorted(bounds)
+    lows = [0] + b[:-1]
+    out = {b[-1]: (lows[-1], float('inf'))}
+    for t, mn in zip(b[-2::-1], lows[-2::-1]):
+        out[t] = (mn, t)
+    return out
+
+TIER_RANGES = tier_ranges(TIER_BOUNDS)
+
+def tier_config(raw=None):
+    """settings 의 {카테고리: [경계, ...]} → {카테고리: 정렬된 경계 tuple} (TIER_CATEGORIES 순서).
+    빠졌거나 잘못된 카테고리는 기본 경계"""
+    raw = raw if isinstance(raw, dict) else {}
+    out = {}
+    for cat in TIER_CATEGORIES:
+        try:
+            b = tuple(sorted({float(v) for v in raw.get(cat, ()) if float(v) > 0}))
+        except (TypeError, ValueError):
+            b = ()
+        out[cat] = tuple(int(v) if v.is_integer() else v for v in b) or TIER_BOUNDS
+    return out
+
+# 지점조직명 안의 "N지점" 번호 (앞이 숫자가 아닌 숫자열 전체)
+BRANCH_NUM_RE = re.compile(r'(?<!\d)(\d+)\s*지점')
+# 고유값 비율이 이보다 낮은 텍스트 컬럼은 category(사전 인코딩)로 보관
+CATEGORY_RATIO = 0.5
+# 다시 계산할 행이 이 비율을 넘으면 증분 대신 전체 계산 (증분이 오히려 느려지는 지점)
+INCREMENTAL_RATIO = 0.25
+
+
+# ═══════════════════════════════════════════════════════
+# 0. 인덱스
+# ═══════════════════════════════════════════════════════
+def float_column(s):
+    """s.map(safe_float) 의 벡터 버전 — 숫자형은 그대로, 그 외는 고유값 단위로 safe_float"""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return np.nan_to_num(s.to_numpy(dtype=np.float64, na_value=np.nan), nan=0.0, posinf=np.inf, neginf=-np.inf)
+    codes, uniq = pd.factorize(s, use_na_sentinel=True)
+    lut = np.array([safe_float(u) for u in uniq] + [0.0], dtype=np.float64)
+    return lut[codes]
+
+def build_agent_index(df, ps):
+    """설계사 코드 → 첫 행 위치 dict 와 시상 컬럼 float 행렬 (행 순서 = df 순서)"""
+    keys = get_clean_series(df, CODE_COL).tolist() if CODE_COL in df.columns else []
+    n = len(keys)
+    # 역순으로 넣어 첫 번째 행이 남도록 (기존 match.iloc[0] 과 동일)
+    pos = dict(zip(reversed(keys), range(n - 1, -1, -1)))
+    cols = [c for c in prize_columns(ps) if c in df.columns]
+    values = np.column_stack([float_column(df[c]) for c in cols]) if cols else np.zeros((n, 0))
+    return {'pos': pos, 'cols': cols, 'values': values}
+
+def agent_value(df, idx, target_code, col, default=None):
+    """설계사 대표 행(첫 행)의 컬럼 값 하나 — 공유 데이터를 복사·수정하지 않는 조회"""
+    i = idx['pos'].get(safe_str(target_code))
+    if i is None or col not in df.columns:
+        return default
+    return df[col].iat[i]
+
+def agent_record(idx, target_code):
+    """코드 한 명의 시상 컬럼 값 dict (없으면 None)"""
+    i = idx['pos'].get(safe_str(target_code))
+    if i is None:
+        return None
+    return dict(zip(idx['cols'], idx['values'][i].tolist()))
+
+
+# ═══════════════════════════════════════════════════════
+# 1. 에이전트 시상 계산
+# ═══════════════════════════════════════════════════════
+def calculate_agent_performance(target_code, df, ps, idx=None, batch=None):
+    """설계사 코드로 시상 결과 리스트 반환. Returns (results, total)
+    batch(build_prize_batch 결과)가 있으면 배열 슬라이스, idx 만 있으면 O(1) 조회, 없으면 전체 스캔"""
+    code_col = CODE_COL
+    if code_col not in df.columns:
+        return [], 0
+    if batch is not None:
+        return batch_agent_results(batch, target_code)
+    # 인덱스 레코드는 이미 safe_float 변환된 값 (두 번 변환하면 'nan' 문자열 값이 달라짐)
+    num = float if idx is not None else safe_float
+    if idx is not None:
+        row = agent_record(idx, target_code)
+        if row is None:
+            return [], 0
+    else:
+        match = df[get_clean_series(df, code_col) == safe_str(target_code)]
+        if match.empty:
+            return [], 0
+        row = match.iloc[0]
+    results = []
+
+    # ── 주차별 시상 ──
+    for w, info in ps['weeks'].items():
+        perf = num(row.get(info['perf'], 0)) if info['perf'] else 0
+        details = []
+        has_eligible = False
+        for it in info['items']:
+            elig = num(row.get(it['elig'], 0))
+            if elig == 0: continue
+            has_eligible = True
+            amt = num(row.get(it['prize'], 0))
+            if amt > 0:
+                details.append({'label': it['label'], 'amount': amt})
+        prize = sum(d['amount'] for d in details)
+        if details or perf > 0 or has_eligible:
+            results.append({
+                'name': f'{w}주차 시상', 'desc': '', 'category': 'weekly',
+                'type': '구간', 'val': perf, 'prize': prize,
+                'prize_details': details
+            })
+
+    # ── 주차연속가동 (3~4주 동일 가동) ──
+    if ps.get('weekly_consec'):
+        wc = ps['weekly_consec']
+        tgt_val = num(row.get(wc['target_col'], 0))
+        if tgt_val != 0:  # 대상자만
+            perf_3w = num(row.get(wc['perf_3w'], 0)) if wc.get('perf_3w') else 0
+            perf_4w = num(row.get(wc['perf_4w'], 0)) if wc.get('perf_4w') else 0
+            tier_3w = num(row.get(wc['tier_3w'], 0)) if wc.get('tier_3w') else 0
+            tier_4w = num(row.get(wc['tier_4w'], 0)) if wc.get('tier_4w') else 0
+            target_amt = num(row.get(wc['target'], 0)) if wc.get('target') else 0
+            shortfall = num(row.get(wc['shortfall'], 0)) if wc.get('shortfall') else 0
+            prize_amt = num(row.get(wc['prize'], 0)) if wc.get('prize') else 0
+            has_prize = wc.get('prize') is not None
+            desc = ''
+            if perf_3w > 0 or perf_4w > 0 or prize_amt > 0:
+                results.append({
+                    'name': '주차연속가동 (3~4주)',
+                    'desc': desc,
+                    'category': 'weekly', 'type': '주차연속가동',
+                    'perf_3w': perf_3w, 'perf_4w': perf_4w,
+                    'tier_3w': tier_3w, 'tier_4w': tier_4w,
+                    'target': target_amt, 'shortfall': shortfall,
+                    'prize': prize_amt, 'has_prize': has_prize,
+                })
+
+    # ── 연속가동 (브릿지보다 먼저 표시) ──
+    if ps.get('consec'):
+        c = ps['consec']
+        cp = num(row.get(c['prize'], 0))
+        vp = num(row.get(c['prev'], 0)) if c['prev'] else 0
+        vc = num(row.get(c['curr'], 0)) if c['curr'] else 0
+        sf = num(row.get(c.get('shortfall', ''), 0)) if c.get('shortfall') else 0
+        tgt = num(row.get(c.get('target', ''), 0)) if c.get('target') else 0
+        if vp > 0 or vc > 0 or cp > 0:
+            results.append({
+                'name': f"연속가동 시상 ({c['lp']}~{c['lc']})",
+                'desc': '', 'category': 'weekly', 'type': '연속가동 브릿지',
+                'val_prev': vp, 'val_curr': vc,
+                'prize': cp, 'shortfall': sf, 'target': tgt,
+                'label_prev': c['lp'], 'label_curr': c['lc'],
+            })
+
+    # ── 브릿지 ──
+    if ps.get('bridge'):
+        b = ps['bridge']
+        bp = num(row.get(b['prize'], 0))
+        vp = num(row.get(b['prev'], 0)) if b['prev'] else 0
+        vc = num(row.get(b['curr'], 0)) if b['curr'] else 0
+        sf = num(row.get(b.get('shortfall', ''), 0)) if b.get('shortfall') else 0
+        tgt = num(row.get(b.get('target', ''), 0)) if b.get('target') else 0
+        if vp > 0 or vc > 0 or bp > 0:
+            results.append({
+                'name': f"브릿지 시상 ({b['lp']}~{b['lc']})",
+                'desc': '', 'category': 'weekly', 'type': '브릿지_확정',
+                'val_prev': vp, 'val_curr': vc,
+                'prize': bp, 'shortfall': sf, 'target': tgt,
+                'label_prev': b['lp'], 'label_curr': b['lc'],
+            })
+
+    total = sum(r['prize'] for r in results)
+    return results, total
+
+
+# ═══════════════════════════════════════════════════════
+# 2. 일괄 계산 (전 설계사 한 번에)
+# ═══════════════════════════════════════════════════════
+def build_prize_batch(df, ps, idx=None):
+    """calculate_agent_performance 의 판정·합계를 전 행에 대해 벡터 연산으로 계산.
+    배열은 행 위치 기준이며, 'show' 는 해당 결과가 리스트에 포함되는지 여부"""
+    if idx is None:
+        idx = build_agent_index(df, ps)
+    vals, cp = idx['values'], {c: j for j, c in enumerate(idx['cols'])}
+    n = vals.shape[0]
+    zero = np.zeros(n)
+
+    def col(c):
+        return vals[:, cp[c]] if c and c in cp else zero
+
+    total = np.zeros(n)
+    weeks = {}
+    for w, info in ps['weeks'].items():
+        perf = col(info['perf'])
+        has_elig = np.zeros(n, dtype=bool)
+        any_paid = np.zeros(n, dtype=bool)
+        prize = np.zeros(n)
+        paid, amts = [], []
+        for it in info['items']:
+            elig = col(it['elig']) != 0
+            amt = col(it['prize'])
+            pay = elig & (amt > 0)
+            has_elig |= elig
+            any_paid |= pay
+            prize = prize + np.where(pay, amt, 0.0)
+            paid.append(pay)
+            amts.append(amt)
+        show = any_paid | (perf > 0) | has_elig
+        total = total + np.where(show, prize, 0.0)
+        weeks[w] = {'perf': perf, 'paid': paid, 'amount': amts, 'prize': prize, 'show': show}
+
+    weekly_consec = None
+    if ps.get('weekly_consec'):
+        wc = ps['weekly_consec']
+        arr = {k: col(wc.get(k)) for k in ('perf_3w', 'perf_4w', 'tier_3w', 'tier_4w', 'target', 'shortfall', 'prize')}
+        show = (col(wc['target_col']) != 0) & ((arr['perf_3w'] > 0) | (arr['perf_4w'] > 0) | (arr['prize'] > 0))
+        total = total + np.where(show, arr['prize'], 0.0)
+        weekly_consec = dict(arr, show=show)
+
+    def _monthly(sec):
+        if not sec:
+            return None
+        arr = {'prize': col(sec['prize']), 'prev': col(sec['prev']), 'curr': col(sec['curr']),
+               'shortfall': col(sec.get('shortfall')), 'target': col(sec.get('target'))}
+        arr['show'] = (arr['prev'] > 0) | (arr['curr'] > 0) | (arr['prize'] > 0)
+        return arr
+
+    consec = _monthly(ps.get('consec'))
+    bridge = _monthly(ps.get('bridge'))
+    for sec in (consec, bridge):
+        if sec is not None:
+            total = total + np.where(sec['show'], sec['prize'], 0.0)
+
+    return {'idx': idx, 'ps': ps, 'n': n, 'weeks': weeks, 'weekly_consec': weekly_consec,
+            'consec': consec, 'bridge': bridge, 'total': total}
+
+def batch_agent_results(batch, target_code):
+    """build_prize_batch 결과에서 설계사 한 명의 (results, total) 를 조립
+    — calculate_agent_performance 반환값과 동일"""
+    i = batch['idx']['pos'].get(safe_str(target_code))
+    if i is None:
+        return [], 0
+    return batch_results_at(batch, i)
+
+def batch_results_at(batch, i):
+    """행 위치 i 의 (results, total)"""
+    ps = batch['ps']
+    results = []
+
+    for w, info in ps['weeks'].items():
+        wk = batch['weeks'][w]
+        if not wk['show'][i]: continue
+        details = [{'label': it['label'], 'amount': float(wk['amount'][k][i])}
+                   for k, it in enumerate(info['items']) if wk['paid'][k][i]]
+        results.append({
+            'name': f'{w}주차 시상', 'desc': '', 'category': 'weekly',
+            'type': '구간', 'val': float(wk['perf'][i]) if info['perf'] else 0,
+            'prize': sum(d['amount'] for d in details),
+            'prize_details': details
+        })
+
+    wcb = batch['weekly_consec']
+    if wcb is not None and wcb['show'][i]:
+        wc = ps['weekly_consec']
+        g = lambda k: float(wcb[k][i]) if wc.get(k) else 0
+        results.append({
+            'name': '주차연속가동 (3~4주)',
+            'desc': '',
+            'category': 'weekly', 'type': '주차연속가동',
+            'perf_3w': g('perf_3w'), 'perf_4w': g('perf_4w'),
+            'tier_3w': g('tier_3w'), 'tier_4w': g('tier_4w'),
+            'target': g('target'), 'shortfall': g('shortfall'),
+            'prize': g('prize'), 'has_prize': wc.get('prize') is not None,
+        })
+
+    for key, name, typ in (('consec', '연속가동 시상', '연속가동 브릿지'), ('bridge', '브릿지 시상', '브릿지_확정')):
+        sb = batch[key]
+        if sb is None or not sb['show'][i]: continue
+        sec = ps[key]
+        g = lambda k: float(sb[k][i]) if sec.get(k) else 0
+        results.append({
+            'name': f"{name} ({sec['lp']}~{sec['lc']})",
+            'desc': '', 'category': 'weekly', 'type': typ,
+            'val_prev': g('prev'), 'val_curr': g('curr'),
+            'prize': float(sb['prize'][i]), 'shortfall': g('shortfall'), 'target': g('target'),
+            'label_prev': sec['lp'], 'label_curr': sec['lc'],
+        })
+
+    total = sum(r['prize'] for r in results)
+    return results, total
+
+
+# ═══════════════════════════════════════════════════════
+# 3. 매니저 인덱스 (소속 설계사 · 구간 폴더)
+# ═══════════════════════════════════════════════════════
+def category_values(batch, cat):
+    """카테고리에 해당하는 결과들의 (표시여부, 구간 판정값) 배열 — 결과 리스트 순서대로.
+    '구간' → 주차별 실적, '브릿지' → 연속가동·브릿지 전월 실적,
+    '연속가동' → 연속가동 당월 실적, '주차연속가동' → 3주 · 4주 실적"""
+    if cat == '구간':
+        return [(wk['show'], wk['perf']) for wk in batch['weeks'].values()]
+    if cat == '브릿지':
+        return [(sec['show'], sec['prev']) for sec in (batch['consec'], batch['bridge']) if sec is not None]
+    if cat == '연속가동':
+        return [(batch['consec']['show'], batch['consec']['curr'])] if batch['consec'] is not None else []
+    if cat == '주차연속가동':
+        wc = batch['weekly_consec']
+        return [(wc['show'], wc['perf_3w']), (wc['show'], wc['perf_4w'])] if wc is not None else []
+    return []
+
+def tier_hits(batch, cat, bounds=TIER_BOUNDS):
+    """카테고리 판정값 전체를 구간 경계로 한 번에 분류(searchsorted) — 구간마다 결과 순서상 첫 값만.
+    Returns (행 위치, 목표, 판정값) 배열, 행 · 목표 순 정렬"""
+    srcs = category_values(batch, cat)
+    b = np.asarray(sorted(bounds), dtype=np.float64)
+    if not srcs or batch['n'] == 0:
+        return np.zeros(0, dtype=np.int64), b[:0], np.zeros(0)
+    show = np.stack([sh for sh, _ in srcs])
+    val = np.stack([v for _, v in srcs])
+    tier = np.searchsorted(b[:-1], val, side='right')
+    s, r = np.nonzero(show & (val >= 0) & np.isfinite(val))
+    # (결과, 행) 순서로 나오므로 (행, 구간) 첫 등장 = 결과 순서상 첫 값
+    _, first = np.unique(r * len(b) + tier[s, r], return_index=True)
+    s, r = s[first], r[first]
+    return r, b[tier[s, r]], val[s, r]
+
+def _display_text(df, col, default):
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    s = df[col]
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # 사전 인코딩 컬럼은 고유값만 정리한 뒤 코드로 펼침 (결측 코드 -1 → "")
+        cats = clean_excel_series(safe_str_series(pd.Series(s.cat.categories.astype(object)))).to_numpy(dtype=object)
+        return np.append(cats, "")[s.cat.codes.to_numpy()]
+    return clean_excel_series(safe_str_series(s)).to_numpy(dtype=object)
+
+def _split_sorted(keys, items):
+    """정렬된 keys 기준으로 (key, items 구간) 을 순서대로 생성"""
+    if len(keys) == 0:
+        return
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    for s0, e0 in zip(starts.tolist(), ends.tolist()):
+        yield keys[s0], items[s0:e0]
+
+def build_manager_index(df, batch, tiers=None):
+    """매니저 코드 → 소속 설계사 코드, 매니저명, 카테고리·구간별 인원수와 명단.
+    tiers: {카테고리: 경계} (tier_config) — 카테고리마다 분류 한 번, 정렬은 전 카테고리 합쳐 한 번"""
+    tiers = tier_config(tiers) if tiers is None else tiers
+    if MGR_COL not in df.columns or CODE_COL not in df.columns:
+        return {'agents': {}, 'name': {}, 'counts': {}, 'members': {}, 'tiers': tiers}
+    mgr = get_clean_series(df, MGR_COL)
+    code = get_clean_series(df, CODE_COL)
+    mgr_name = _display_text(df, '지원매니저명', "")
+    pos = batch['idx']['pos']
+
+    # 매니저별 첫 행의 이름, 소속 설계사 집합
+    first_row = mgr.reset_index(drop=True).drop_duplicates()
+    names = {m: mgr_name[i] for i, m in first_row.items()}
+    pairs = pd.DataFrame({'m': mgr.to_numpy(), 'a': code.to_numpy()})
+    pairs = pairs[pairs['a'] != ""].drop_duplicates()
+    # 설계사 대표 행(첫 행) 기준 이름/소속 — (매니저, 소속, 이름, 코드) 순 정렬은 여기서 한 번
+    prow = pairs['a'].map(pos).to_numpy()
+    pairs = pairs.assign(name=_display_text(df, '대리점설계사명', "이름없음")[prow],
+                         agency=_display_text(df, '대리점지사명', "")[prow], row=prow)
+    pairs = pairs.sort_values(['m', 'agency', 'name', 'a'], kind='stable', ignore_index=True)
+    pm = pairs['m'].to_numpy()
+    agents = {m: set() for m in names}
+    for m, grp in _split_sorted(pm, pairs['a'].tolist()):
+        agents[m] = set(grp)
+
+    # 설계사 행 → 매니저 쌍 (한 설계사가 여러 매니저에 속할 수 있음): 행 순으로 정렬해 구간 대응
+    by_row = np.argsort(pairs['row'].to_numpy(), kind='stable')
+    rows_sorted = pairs['row'].to_numpy()[by_row]
+    parts = [(np.zeros(0, dtype=np.int64),) * 2 + (np.zeros(0),) * 2]
+    for ci, cat in enumerate(tiers):
+        r, tgt, val = tier_hits(batch, cat, tiers[cat])
+        lo = np.searchsorted(rows_sorted, r, side='left')
+        cnt = np.searchsorted(rows_sorted, r, side='right') - lo
+        hit = np.repeat(np.arange(len(r)), cnt)
+        off = np.arange(len(hit)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        parts.append((np.full(len(hit), ci), by_row[np.repeat(lo, cnt) + off], tgt[hit], val[hit]))
+    cat_i, p, tgt, val = (np.concatenate(x) for x in zip(*parts))
+    # 쌍 번호가 이미 (매니저, 소속, 이름, 코드) 순 — 정수 키 정렬 한 번으로 폴더별 명단 순서 완성
+    order = np.lexsort((p, -tgt, cat_i))
+    cat_i, p, tgt, val = cat_i[order], p[order], tgt[order], val[order]
+    recs = list(zip(pairs['a'].to_numpy()[p].tolist(), pairs['name'].to_numpy()[p].tolist(),
+                    pairs['agency'].to_numpy()[p].tolist(), val.tolist()))
+    cats = list(tiers)
+    counts, members = {cat: {} for cat in cats}, {cat: {} for cat in cats}
+    m_arr, t_arr = pm[p], tgt.tolist()
+    if len(p):
+        brk = np.r_[True, (cat_i[1:] != cat_i[:-1]) | (m_arr[1:] != m_arr[:-1]) | (tgt[1:] != tgt[:-1])]
+        starts = np.flatnonzero(brk)
+        for s0, e0 in zip(starts.tolist(), np.r_[starts[1:], len(p)].tolist()):
+            cat, m, t = cats[cat_i[s0]], m_arr[s0], t_arr[s0]
+            t = int(t) if float(t).is_integer() else t
+            counts[cat].setdefault(m, {})[t] = e0 - s0
+            members[cat].setdefault(m, {})[t] = recs[s0:e0]
+    return {'agents': agents, 'name': names, 'counts': counts, 'members': members, 'tiers': tiers}
+
+def manager_tier_ranges(mi, cat):
+    """카테고리의 {목표: (하한, 상한)} — 인덱스를 만든 경계 기준"""
+    return tier_ranges(mi.get('tiers', {}).get(cat, TIER_BOUNDS))
+
+def manager_tier_counts(mi, cat, mgr_code):
+    """{목표: 인원} — 해당 없는 구간은 0"""
+    got = mi['counts'].get(cat, {}).get(mgr_code, {})
+    return {t: got.get(t, 0) for t in manager_tier_ranges(mi, cat)}
+
+def manager_tier_members(mi, cat, mgr_code, target):
+    """[(코드, 이름, 소속, 판정값), ...] — 소속·이름 순"""
+    return mi['members'].get(cat, {}).get(mgr_code, {}).get(target, [])
+
+
+# ═══════════════════════════════════════════════════════
+# 4. 이름 · 지점 검색 인덱스 (내 실적 조회)
+# ═══════════════════════════════════════════════════════
+def text_series(s):
+    """s.fillna('').astype(str) — category 컬럼도 같은 결과"""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype(object)
+    return s.fillna('').astype(str)
+
+def _search_entries(df):
+    """행마다 (공백 제거 이름, 코드, 지점번호 집합) — 지점번호 파싱은 고유 지점조직명당 한 번"""
+    names = text_series(df[NAME_COL]).str.strip().tolist()
+    codes = get_clean_series(df, CODE_COL).tolist()
+    if BRANCH_COL not in df.columns:
+        return [(n, c, ()) for n, c in zip(names, codes)]
+    bcode, buniq = pd.factorize(text_series(df[BRANCH_COL]))
+    bnums = [set(BRANCH_NUM_RE.findall(u)) for u in buniq]
+    return [(n, c, bnums[b]) for n, c, b in zip(names, codes, bcode)]
+
+def build_search_index(df):
+    """공백 제거 이름 → 코드, (이름, 지점번호) → 코드"""
+    if NAME_COL not in df.columns or CODE_COL not in df.columns:
+        return None
+    by_name, by_branch = {}, {}
+    for n, c, nums in _search_entries(df):
+        if not c: continue
+        by_name.setdefault(n, set()).add(c)
+        for num in nums:
+            by_branch.setdefault((n, num), set()).add(c)
+    return {'by_name': by_name, 'by_branch': by_branch, 'has_branch': BRANCH_COL in df.columns}
+
+def search_agent_codes(si, df, user_name, branch_code):
+    """이름 + 지점별 코드로 설계사 코드 집합 조회 ('0000' 은 지점 무관)"""
+    if si is None:
+        return set()
+    name = user_name.strip()
+    if branch_code.strip() == "0000":
+        return set(si['by_name'].get(name, ()))
+    code_num = branch_code.replace("지점", "").strip()
+    if not code_num or not si['has_branch']:
+        return set()
+    if re.fullmatch(r'\d+', code_num):
+        return set(si['by_branch'].get((name, code_num), ()))
+    # 숫자가 아닌 입력은 기존 정규식 검색 그대로
+    nm = text_series(df[NAME_COL]).str.strip() == name
+    sb = text_series(df[BRANCH_COL])
+    match = nm & sb.str.contains(rf"(?<!\d){code_num}\s*지점", regex=True)
+    return {ac for ac in get_clean_series(df, CODE_COL)[match] if ac}
+
+
+# ═══════════════════════════════════════════════════════
+# 5. 압축 표현 (상주 메모리)
+# ═══════════════════════════════════════════════════════
+def _compact_series(s):
+    """정수 값만 있는 숫자 컬럼은 가장 작은 정수형으로, 중복 많은 텍스트는 category 로"""
+    if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        if not isinstance(s.dtype, np.dtype) or s.dtype.kind != 'i' or s.dtype.itemsize == 1 or not len(s):
+            return s
+        v = s.to_numpy()
+        lo, hi = v.min(), v.max()
+        small = next(t for t in (np.int8, np.int16, np.int32, np.int64)
+                     if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max)
+        # 이미 가장 작은 정수형이면 원본 그대로 (메모리 매핑 스냅샷의 버퍼 유지)
+        return s.astype(small) if np.dtype(small).itemsize < s.dtype.itemsize else s
+    if pd.api.types.is_float_dtype(s):
+        f = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        nan = np.isnan(f)
+        v = f[~nan]
+        if not v.size or not np.isfinite(v).all() or (np.floor(v) != v).any():
+            return s
+        if (np.abs(v) >= 2.0 ** 63).any():
+            return s
+        if nan.any():
+            # 빈 칸이 있으면 nullable 정수 (원 단위 금액은 int32 로 충분한 경우가 대부분)
+            return s.astype('Int32' if np.abs(v).max() < 2 ** 31 else 'Int64')
+        return _compact_series(s.astype(np.int64))
+    if s.dtype == 'object' or pd.api.types.is_string_dtype(s):
+        if len(s) and s.nunique(dropna=True) < len(s) * CATEGORY_RATIO:
+            return s.astype('category')
+    return s
+
+def compact_frame(df):
+    """병합 데이터 압축 — 조회·계산 결과는 그대로, 메모리만 줄임. Returns (df, report)
+    • 시상 구조 · 화면이 참조하지 않는 컬럼 제거 (_key 는 _ck_ 설계사코드와 같아 제거)
+    • 정수 금액/대상 컬럼 다운캐스트, 코드·이름 등 중복 많은 텍스트는 category"""
+    before = df.memory_usage(index=False, deep=True)
+    keep = used_columns(df.columns)
+    src = {c: df[c] for c in keep}
+    cols = {c: _compact_series(v) for c, v in src.items()}
+    if len(keep) == len(df.columns) and all(cols[c] is src[c] for c in keep):
+        out = df  # 이미 압축된 스냅샷 — 복사하지 않음
+    else:
+        out = pd.DataFrame(cols, index=df.index, copy=False)
+    after = out.memory_usage(index=False, deep=True)
+    report = {
+        'before': int(before.sum()), 'after': int(after.sum()),
+        'dropped': [c for c in df.columns if c not in out.columns],
+        'columns': [{'컬럼': c, '원래 타입': str(df[c].dtype), '타입': str(out[c].dtype),
+                     '원래 KB': round(before[c] / 1024, 1), 'KB': round(after[c] / 1024, 1)}
+                    for c in keep],
+    }
+    return out, report
+
+
+# ═══════════════════════════════════════════════════════
+# 6. 증분 갱신 (직전 스냅샷 대비 바뀐 설계사만 재계산)
+# ═══════════════════════════════════════════════════════
+def _same_text(df, prev_df, col, rows, prev_rows):
+    """df[col][rows] 와 prev_df[col][prev_rows] 가 화면 텍스트로 같은지 (행별 bool)"""
+    if col in (CODE_COL, MGR_COL):
+        return get_clean_series(df, col).to_numpy(dtype=object)[rows] == \
+            get_clean_series(prev_df, col).to_numpy(dtype=object)[prev_rows]
+    s, p = df[col], prev_df[col]
+    if isinstance(s.dtype, pd.CategoricalDtype) and isinstance(p.dtype, pd.CategoricalDtype):
+        # 둘 다 category 면 문자열 대신 코드 비교 (직전 코드를 새 카테고리 번호로 변환, 없는 값은 -2)
+        lut = s.cat.categories.get_indexer(p.cat.categories)
+        lut = np.append(np.where(lut < 0, -2, lut), -1)
+        return s.cat.codes.to_numpy()[rows] == lut[p.cat.codes.to_numpy()[prev_rows]]
+    return text_series(s).to_numpy(dtype=object)[rows] == text_series(p).to_numpy(dtype=object)[prev_rows]
+
+def diff_agents(prev_df, prev_idx, df, idx):
+    """직전 데이터 대비 설계사 변경 내역 (코드가 유일하지 않으면 None)
+    src: 새 행 → 직전 행 위치 (새 설계사는 -1) / changed: 다시 계산할 새 행 / removed: 빠진 직전 행 위치"""
+    n, pn = len(df), len(prev_df)
+    if len(idx['pos']) != n or len(prev_idx['pos']) != pn or '' in idx['pos'] or '' in prev_idx['pos']:
+        return None
+    if idx['cols'] != prev_idx['cols'] or not pn:
+        return None
+    codes = get_clean_series(df, CODE_COL).tolist()
+    src = np.fromiter((prev_idx['pos'].get(c, -1) for c in codes), dtype=np.int64, count=n)
+    kept = src >= 0
+    ks = src[kept]
+    # 앞으로 옮겨진 행도 변경으로 취급 — 안 바뀐 행끼리의 순서가 유지되어야 매니저 대표 행(첫 행)이 그대로
+    same = ks > np.maximum.accumulate(np.r_[-1, ks[:-1]])
+    same &= (idx['values'][kept] == prev_idx['values'][ks]).all(axis=1)
+    for col in UI_COLS[1:]:
+        if (col in df.columns) != (col in prev_df.columns):
+            return None
+        if col in df.columns:
+            same &= _same_text(df, prev_df, col, kept, ks)
+    changed = ~kept
+    changed[kept] = ~same
+    return {'src': src, 'changed': changed, 'removed': np.setdiff1d(np.arange(pn), ks)}
+
+def _map_arrays(f, *trees):
+    # 일괄 계산 결과(dict / list / 배열 중첩)의 배열마다 f 적용
+    a = trees[0]
+    if isinstance(a, dict):
+        return {k: _map_arrays(f, *(t[k] for t in trees)) for k in a}
+    if isinstance(a, list):
+        return [_map_arrays(f, *xs) for xs in zip(*trees)]
+    return f(*trees) if isinstance(a, np.ndarray) else a
+
+_BATCH_PARTS = ('weeks', 'weekly_consec', 'consec', 'bridge', 'total')
+
+def _take_batch(batch, rows, codes):
+    """rows 행만 담은 일괄 계산 결과 (codes: 해당 행의 설계사 코드)"""
+    idx = batch['idx']
+    out = {k: _map_arrays(lambda a: a[rows], batch[k]) for k in _BATCH_PARTS}
+    out['idx'] = {'pos': {c: i for i, c in enumerate(codes)}, 'cols': idx['cols'], 'values': idx['values'][rows]}
+    return dict(out, ps=batch['ps'], n=len(rows))
+
+def update_prize_batch(prev_batch, idx, diff):
+    """바뀐 행만 build_prize_batch, 나머지는 직전 결과에서 옮겨옴 — build_prize_batch(df, ps, idx) 와 같은 결과"""
+    changed, src = diff['changed'], diff['src']
+    rows, keep = np.flatnonzero(changed), np.flatnonzero(~changed)
+    sub = build_prize_batch(None, prev_batch['ps'],
+                            idx={'pos': {}, 'cols': idx['cols'], 'values': idx['values'][rows]})
+
+    def _merge(a, b):
+        out = np.empty(len(src), dtype=a.dtype)
+        out[keep] = a[src[keep]]
+        out[rows] = b
+        return out
+
+    out = {k: _map_arrays(_merge, prev_batch[k], sub[k]) for k in _BATCH_PARTS}
+    return dict(out, idx=idx, ps=prev_batch['ps'], n=len(src))
+
+def update_manager_index(prev_mi, prev_df, df, batch, diff, tiers=None):
+    """바뀐·빠진 설계사의 (직전·현재) 매니저만 다시 계산해 직전 인덱스에 덮어씀 (직전 인덱스는 그대로)"""
+    tiers = prev_mi.get('tiers') if tiers is None else tiers
+    if MGR_COL not in df.columns or CODE_COL not in df.columns:
+        return build_manager_index(df, batch, tiers)
+    changed, src = diff['changed'], diff['src']
+    mgr = get_clean_series(df, MGR_COL).to_numpy(dtype=object)
+    prev_mgr = get_clean_series(prev_df, MGR_COL).to_numpy(dtype=object)
+    old_rows = np.r_[diff['removed'], src[changed & (src >= 0)]].astype(np.int64)
+    touched = set(mgr[changed].tolist()) | set(prev_mgr[old_rows].tolist())
+    if not touched:
+        return prev_mi
+    rows = np.flatnonzero(pd.Index(mgr).isin(list(touched)))
+    if len(rows) > len(df) * INCREMENTAL_RATIO:
+        return build_manager_index(df, batch, tiers)
+    sub_df = df.take(rows)
+    sub = build_manager_index(sub_df, _take_batch(batch, rows, get_clean_series(sub_df, CODE_COL).tolist()), tiers)
+
+    def _patch(prev, new):
+        out = {m: v for m, v in prev.items() if m not in touched}
+        out.update(new)
+        return out
+
+    return {'agents': _patch(prev_mi['agents'], sub['agents']), 'name': _patch(prev_mi['name'], sub['name']),
+            'counts': {cat: _patch(prev_mi['counts'].get(cat, {}), sub['counts'][cat]) for cat in tiers},
+            'members': {cat: _patch(prev_mi['members'].get(cat, {}), sub['members'][cat]) for cat in tiers},
+            'tiers': tiers}
+
+def update_search_index(prev_si, prev_df, df, diff):
+    """바뀐·빠진 행의 직전 항목을 빼고 바뀐·새 행 항목을 더함 (수정하는 집합만 복사)"""
+    if prev_si is None or NAME_COL not in df.columns or CODE_COL not in df.columns:
+        return build_search_index(df)
+    changed, src = diff['changed'], diff['src']
+    old_rows = np.r_[diff['removed'], src[changed & (src >= 0)]].astype(np.int64)
+    by_name, by_branch = dict(prev_si['by_name']), dict(prev_si['by_branch'])
+    own = set()
+
+    def _bucket(d, k):
+        if (id(d), k) not in own:
+            own.add((id(d), k))
+            d[k] = set(d.get(k, ()))
+        return d[k]
+
+    for n, c, nums in _search_entries(prev_df.take(old_rows)):
+        if not c: continue
+        _bucket(by_name, n).discard(c)
+        for num in nums:
+            _bucket(by_branch, (n, num)).discard(c)
+    for n, c, nums in _search_entries(df.take(np.flatnonzero(changed))):
+        if not c: continue
+        _bucket(by_name, n).add(c)
+        for num in nums:
+            _bucket(by_branch, (n, num)).add(c)
+    for d in (by_name, by_branch):
+        for k in [k for i, k in own if i == id(d) and not d[k]]:
+            del d[k]
+    return {'by_name': by_name, 'by_branch': by_branch, 'has_branch': prev_si['has_branch']}
+
+
+# ═══════════════════════════════════════════════════════
+# 7. 다음 구간 · 부족금액
+# ═══════════════════════════════════════════════════════
+def tier_prize_table(tier, paid, amount, n_tiers):
+    """구간 번호별 대표 시상금 (해당 구간 지급자의 최빈값, 지급자가 없으면 NaN · 0구간은 0)"""
+    table = np.full(n_tiers + 1, np.nan)
+    table[0] = 0.0
+    t, a = tier[paid], amount[paid]
+    for k in range(1, n_tiers + 1):
+        v = a[t == k]
+        if v.size:
+            vals, cnt = np.unique(v, return_counts=True)
+            table[k] = vals[cnt.argmax()]
+    return table
+
+def _base_item(ps, w):
+    # 실적 구간을 따르는 기본 항목 (추가13회예정금_{w}주) — 없으면 첫 항목
+    items = ps['weeks'][w]['items']
+    return next((k for k, it in enumerate(items) if it['elig'] == f'추가13회예정금_{w}주대상'), 0 if items else None)
+
+def build_next_tiers(batch, bounds=TIER_BOUNDS):
+    """전 설계사 × 시상별 (다음 구간 기준, 부족금액, 달성 시 추가 시상금) — 열 = programs 순서.
+    • 주차: 실적을 bounds 에 searchsorted (그 주차 결과가 없는 설계사는 NaN). 추가 시상금은 기본 항목의 구간별 대표 시상금 차이를
+      본인 현재 배율(현재 시상금 / 대표 시상금)로 환산한 추정치(programs 의 'estimate'), 기본 항목 대상이 아니면 0
+    • 주차연속가동 · 연속가동 · 브릿지: 목표 컬럼 기준, 부족금액 컬럼이 있으면 그대로, 추가 시상금은 미달성 시 시상금
+    이미 최고 구간이거나 기준이 없으면 NaN"""
+    ps, n = batch['ps'], batch['n']
+    vals, cp = batch['idx']['values'], {c: j for j, c in enumerate(batch['idx']['cols'])}
+    b = np.asarray(bounds, dtype=np.float64)
+    programs, thr, short, unlock = [], [], [], []
+
+    for w, wk in batch['weeks'].items():
+        if not ps['weeks'][w]['perf']:
+            continue
+        perf = wk['perf']
+        tier = np.searchsorted(b, perf, side='right')
+        top = tier >= len(b)
+        nxt = np.where(top, np.nan, b[np.minimum(tier, len(b) - 1)])
+        gain = np.zeros(n)
+        k = _base_item(ps, w)
+        if k is not None:
+            it = ps['weeks'][w]['items'][k]
+            elig = vals[:, cp[it['elig']]] != 0 if it['elig'] in cp else np.zeros(n, dtype=bool)
+            paid, amt = wk['paid'][k], wk['amount'][k]
+            table = tier_prize_table(tier, paid, amt, len(b))
+            cur = np.where(paid, amt, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where((cur > 0) & (table[tier] > 0), cur / table[tier], 1.0)
+                gain = np.where(elig, ratio * table[np.minimum(tier + 1, len(b))] - cur, 0.0)
+        # 그 주차 결과가 없는 설계사(무실적 · 대상 아님)는 다른 시상처럼 기준 없음(NaN)
+        show = wk['show']
+        programs.append({'key': ('week', w), 'name': f'{w}주차 시상', 'estimate': True})
+        thr.append(np.where(show, nxt, np.nan))
+        short.append(np.where(show, nxt - perf, np.nan))
+        unlock.append(np.where(show & ~top, gain, np.nan))
+
+    def _target(key, name, sec, arr, perf_key):
+        if sec is None or not sec.get('target'):
+            return
+        target = arr['target']
+        sf = arr['shortfall'] if sec.get('shortfall') else np.maximum(target - arr[perf_key], 0.0)
+        reached = (target <= 0) | (sf <= 0)
+        programs.append({'key': (key,), 'name': name, 'estimate': False})
+        thr.append(np.where(target > 0, target, np.nan))
+        short.append(np.where(reached, np.nan, sf))
+        unlock.append(np.where(reached, np.nan, arr['prize']))
+
+    wc = ps.get('weekly_consec')
+    _target('weekly_consec', '주차연속가동 (3~4주)', wc, batch['weekly_consec'], 'perf_4w')
+    for key, name in (('consec', '연속가동 시상'), ('bridge', '브릿지 시상')):
+        sec = ps.get(key)
+        if sec:
+            _target(key, f"{name} ({sec['lp']}~{sec['lc']})", sec, batch[key], 'curr')
+
+    stack = lambda xs: np.column_stack(xs) if xs else np.zeros((n, 0))
+    return {'programs': programs, 'bounds': tuple(bounds),
+            'threshold': stack(thr), 'shortfall': stack(short), 'unlock': stack(unlock)}
+
+def next_tiers_at(nt, i):
+    """행 위치 i 의 {결과 이름: {'threshold', 'shortfall', 'unlock', 'estimate'}} — 남은 구간이 있는 시상만
+    (estimate: unlock 이 실제 시상금 컬럼이 아닌 추정치인지)"""
+    out = {}
+    for j, p in enumerate(nt['programs']):
+        sf = nt['shortfall'][i, j]
+        if np.isnan(sf) or sf <= 0:
+            continue
+        u = nt['unlock'][i, j]
+        out[p['name']] = {'threshold': float(nt['threshold'][i, j]), 'shortfall': float(sf),
+                          'unlock': None if np.isnan(u) else float(u), 'estimate': p['estimate']}
+    return out
+
+def agent_next_tiers(nt, batch, target_code):
+    i = batch['idx']['pos'].get(safe_str(target_code))
+    return {} if nt is None or i is None else next_tiers_at(nt, i)
+
+
+# ═══════════════════════════════════════════════════════
+# 8. 매니저 팀 순위 (top-K)
+# ═══════════════════════════════════════════════════════
+# 순위 기준 → (이름, 오름차순 여부)
+RANK_KEYS = {'prize': ('시상 합계', False), 'shortfall': ('다음 구간 근접', True), 'gain': ('주간 증가', False)}
+
+def build_leaderboard(batch, nt):
+    """스냅샷당 1회: 행별 설계사 코드 · 시상 합계 · 가장 가까운 다음 구간 부족금액과 그 시상 번호
+    (남은 구간 없으면 inf · -1)"""
+    n = batch['n']
+    codes = np.full(n, None, dtype=object)
+    pos = batch['idx']['pos']
+    codes[np.fromiter(pos.values(), dtype=np.int64, count=len(pos))] = list(pos)
+    masked = np.where(nt['shortfall'] > 0, nt['shortfall'], np.inf)
+    j = masked.argmin(axis=1) if masked.shape[1] else np.zeros(n, dtype=np.int64)
+    near = masked[np.arange(n), j] if masked.shape[1] else np.full(n, np.inf)
+    return {'codes': codes, 'total': batch['total'], 'shortfall': near,
+            'program': np.where(np.isinf(near), -1, j), 'programs': nt['programs']}
+
+def top_k(score, k, ascending=False):
+    """score 상위 k 개 위치 — argpartition 으로 k 개만 고른 뒤 그 안에서만 정렬 (동점은 위치 순)"""
+    n = len(score)
+    key = score if ascending else -score
+    if 0 < k < n:
+        cand = np.argpartition(key, k - 1)[:k]
+    else:
+        cand = np.arange(n)
+    return cand[np.lexsort((cand, key[cand]))][:max(k, 0)]
+
+def manager_rows(mi, batch, mgr_code):
+    """매니저 소속 설계사의 행 위치 (오름차순)"""
+    pos = batch['idx']['pos']
+    rows = np.fromiter((pos[c] for c in mi['agents'].get(mgr_code, ()) if c in pos), dtype=np.int64)
+    rows.sort()
+    return rows
+
+def manager_leaderboard(lb, mi, batch, mgr_code, by='prize', k=10, gain=None):
+    """매니저 팀 top-K [(코드, 행, 값, 시상 이름), ...].
+    by: 'prize' 시상 합계 ↓ · 'shortfall' 가장 가까운 다음 구간 부족금액 ↑ (남은 구간 없으면 제외)
+        · 'gain' 주간 증가 ↓ (gain: 행별 증가액 배열, NaN 은 제외)"""
+    rows = manager_rows(mi, batch, mgr_code)
+    if by == 'prize':
+        score = lb['total'][rows]
+    elif by == 'shortfall':
+        score = lb['shortfall'][rows]
+    elif by == 'gain':
+        score = gain[rows] if gain is not None else np.full(len(rows), np.nan)
+    else:
+        raise ValueError(f"알 수 없는 순위 기준: {by}")
+    ok = np.isfinite(score)
+    rows, score = rows[ok], score[ok]
+    out = []
+    for i in top_k(score, k, RANK_KEYS[by][1]).tolist():
+        r = int(rows[i])
+        j = int(lb['program'][r]) if by == 'shortfall' else -1
+        out.append((lb['codes'][r], r, float(score[i]), lb['programs'][j]['name'] if j >= 0 else None))
+    return out
+
+
+# ═══════════════════════════════════════════════════════
+# 9. 조직 집계 (지점 · 대리점지사 · 매니저)
+# ═══════════════════════════════════════════════════════
+ROLLUP_LEVELS = (BRANCH_COL, '대리점지사명', MGR_COL)
+
+def _program_arrays(batch):
+    """시상별 (이름, 대상 여부, 시상금) — 결과 리스트 순서"""
+    out = [(f'{w}주차', wk['show'], wk['prize']) for w, wk in batch['weeks'].items()]
+    for key, name in (('weekly_consec', '주차연속가동'), ('consec', '연속가동'), ('bridge', '브릿지')):
+        sec = batch[key]
+        if sec is not None:
+            out.append((name, sec['show'], sec['prize']))
+    return out
+
+def _won_label(t):
+    return f"{t / 10000:,g}만"
+
+def build_rollups(df, batch, tiers=None, levels=ROLLUP_LEVELS):
+    """조직 단위별 집계표 {단위 컬럼: DataFrame} — 스냅샷당 1회 (설계사 대표 행 기준 groupby 한 번씩).
+    열: 설계사수 · 시상합계 · 시상별 시상금/대상/달성 인원 · 카테고리 구간별 인원 (매니저 폴더와 같은 기준)"""
+    tiers = tier_config(tiers) if tiers is None else tiers
+    rows = np.fromiter(batch['idx']['pos'].values(), dtype=np.int64, count=len(batch['idx']['pos']))
+    rows.sort()
+    cols = {'설계사수': np.ones(len(rows), dtype=np.int64), '시상합계': batch['total'][rows]}
+    for name, show, prize in _program_arrays(batch):
+        paid = np.where(show, prize, 0.0)[rows]
+        cols[f'{name} 시상금'] = paid
+        cols[f'{name} 대상'] = show[rows].astype(np.int64)
+        cols[f'{name} 달성'] = (paid > 0).astype(np.int64)
+    at = np.full(batch['n'], -1, dtype=np.int64)
+    at[rows] = np.arange(len(rows))
+    for cat, bounds in tiers.items():
+        if not category_values(batch, cat):
+            continue
+        r, tgt, _ = tier_hits(batch, cat, bounds)
+        for t in sorted(bounds, reverse=True):
+            c = np.zeros(len(rows), dtype=np.int64)
+            np.add.at(c, at[r[tgt == t]], 1)
+            cols[f'{cat} {_won_label(t)}'] = c
+    base = pd.DataFrame(cols)
+
+    out = {}
+    for lv in levels:
+        if lv not in df.columns:
+            continue
+        key = (get_clean_series(df, lv).to_numpy(dtype=object) if lv == MGR_COL else _display_text(df, lv, ""))[rows]
+        g = base.groupby(key, sort=True).sum()
+        if lv == MGR_COL:
+            names = pd.Series(_display_text(df, '지원매니저명', "")[rows]).groupby(key, sort=True).first()
+            g.insert(0, '지원매니저명', names.to_numpy())
+        out[lv] = g.rename_axis(lv).reset_index()
+    return out
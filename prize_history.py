@@ -0,0 +1,165 @@
+"""
+prize_history.py — 날짜별 시상 이력 (Streamlit 비의존)
+=============================================================
+• data/ 의 모든 날짜 PRIZE_SUM_OUT 를 설계사 1명 = 1행 요약(주차 실적 · 시상금 · 합계)으로 변환해
+  data/history/date=YYYYMMDD/part-0.parquet 날짜 파티션 데이터셋으로 저장 (ingest.py --history)
+• HistoryStore: 전 파티션을 한 번 읽어 (코드, 날짜) 순으로 정렬하고 코드 → 행 구간 인덱스를 만들어
+  "이 설계사의 날짜별 실적_N주차 · 시상 합계" 를 엑셀 재로딩 없이 바로 조회
+• gain_since: 한 주 전 이력 대비 설계사별 시상 합계 증가 (매니저 팀 순위 '주간 증가')
+"""
+
+import os
+import re
+import glob
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from prize_core import (
+    DATA_DIR, CODE_COL, MGR_COL, NAME_COL, load_merged, detect_prize_structure, dated_files,
+    get_clean_series, safe_str, safe_str_series, clean_excel_series,
+)
+from prize_engine import build_prize_batch
+
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+DATE_COL = '날짜'
+TOTAL_COL = '시상합계'
+PART_RE = re.compile(r'date=(\d{8})$')
+
+
+# ═══════════════════════════════════════════════════════
+# 0. 날짜별 요약 행
+# ═══════════════════════════════════════════════════════
+def history_rows(df, ps, batch=None):
+    """설계사별 한 행: 코드 · 이름 · 매니저 · 소속, 주차별 실적/시상금, 월 시상금, 시상 합계"""
+    if batch is None:
+        batch = build_prize_batch(df, ps)
+    rows = np.fromiter(batch['idx']['pos'].values(), dtype=np.int64)
+    rows.sort()
+    out = {CODE_COL: get_clean_series(df, CODE_COL).to_numpy(dtype=object)[rows]}
+    for col in (NAME_COL, '대리점지사명'):
+        if col in df.columns:
+            out[col] = clean_excel_series(safe_str_series(df[col])).to_numpy(dtype=object)[rows]
+    if MGR_COL in df.columns:
+        out[MGR_COL] = get_clean_series(df, MGR_COL).to_numpy(dtype=object)[rows]
+    for w, wk in batch['weeks'].items():
+        if ps['weeks'][w]['perf']:
+            out[f'실적_{w}주차'] = wk['perf'][rows]
+        out[f'시상_{w}주차'] = np.where(wk['show'], wk['prize'], 0.0)[rows]
+    for key, col in (('weekly_consec', '주차연속가동시상'), ('consec', '연속가동시상'), ('bridge', '브릿지시상')):
+        sec = batch[key]
+        if sec is not None:
+            out[col] = np.where(sec['show'], sec['prize'], 0.0)[rows]
+    out[TOTAL_COL] = batch['total'][rows]
+    return pd.DataFrame(out)
+
+def _partition_path(date, hist_dir):
+    return os.path.join(hist_dir, f"date={date}", "part-0.parquet")
+
+def history_dates(hist_dir=HISTORY_DIR):
+    """저장된 파티션 날짜 (오름차순)"""
+    dirs = glob.glob(os.path.join(hist_dir, "date=*"))
+    return sorted(m.group(1) for d in dirs for m in [PART_RE.search(d)]
+                  if m and os.path.exists(_partition_path(m.group(1), hist_dir)))
+
+def history_signature(hist_dir=HISTORY_DIR):
+    """캐시 키 — 파티션 (날짜, mtime) 목록"""
+    return tuple((d, os.stat(_partition_path(d, hist_dir)).st_mtime_ns) for d in history_dates(hist_dir))
+
+def write_history(date, rows, hist_dir=HISTORY_DIR):
+    """날짜 파티션 하나 저장 (임시파일 → rename)"""
+    path = _partition_path(date, hist_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    rows.to_parquet(tmp, index=False, compression='zstd')
+    os.replace(tmp, path)
+    return path
+
+def build_history(data_dir=DATA_DIR, hist_dir=None, labels_json='{}', force=False, log=print):
+    """data/ 의 날짜마다 요약 파티션 생성 — 원본보다 새 파티션은 건너뜀. Returns 새로 만든 날짜 목록"""
+    hist_dir = hist_dir or os.path.join(data_dir, "history")
+    sums = dated_files(data_dir, "PRIZE_SUM_OUT_*")
+    bridges = dated_files(data_dir, "PRIZE_6_BRIDGE_OUT_*")
+    done = []
+    for date, sp in sums.items():
+        if date == '00000000':
+            continue
+        brs = [d for d in bridges if d <= date]
+        bp = bridges[brs[-1]] if brs else None
+        out = _partition_path(date, hist_dir)
+        if not force and os.path.exists(out) and \
+                all(os.path.getmtime(s) <= os.path.getmtime(out) for s in (sp, bp) if s):
+            continue
+        df = load_merged(sp, bp)
+        ps = detect_prize_structure(tuple(df.columns.tolist()), labels_json)
+        rows = history_rows(df, ps)
+        write_history(date, rows, hist_dir)
+        if log:
+            log(f"✅ {date}: {len(rows):,}명 × {len(rows.columns)}열 → {os.path.relpath(out, data_dir)}")
+        done.append(date)
+    return done
+
+
+# ═══════════════════════════════════════════════════════
+# 1. 조회
+# ═══════════════════════════════════════════════════════
+class HistoryStore:
+    """전 날짜 이력을 (코드, 날짜) 순으로 들고 있는 읽기 전용 저장소 — agent() 는 dict 조회 + 구간 슬라이스"""
+
+    def __init__(self, hist_dir=HISTORY_DIR):
+        self.hist_dir = hist_dir
+        self.dates = history_dates(hist_dir)
+        parts = [pd.read_parquet(_partition_path(d, hist_dir)).assign(**{DATE_COL: d}) for d in self.dates]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame({CODE_COL: [], DATE_COL: []})
+        df = df.sort_values([CODE_COL, DATE_COL], kind='stable', ignore_index=True)
+        # 주차 컬럼은 숫자 순 (실적_10주차 가 실적_2주차 앞에 오지 않도록)
+        lead = [c for c in (DATE_COL, CODE_COL, NAME_COL, '대리점지사명', MGR_COL) if c in df.columns]
+        wk = sorted((c for c in df.columns if re.fullmatch(r'(실적|시상)_\d+주차', c)),
+                    key=lambda c: (c.startswith('시상'), int(re.search(r'\d+', c).group())))
+        self.df = df[lead + wk + [c for c in df.columns if c not in lead and c not in wk]]
+        codes = self.df[CODE_COL].to_numpy(dtype=object)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(codes)]
+        self.pos = {codes[s]: (s, e) for s, e in zip(starts.tolist(), ends.tolist())}
+
+    def agent(self, code):
+        """설계사 한 명의 날짜별 행 (해당 날짜에 없던 주차 컬럼은 빼고) — 없으면 빈 DataFrame"""
+        s, e = self.pos.get(safe_str(code), (0, 0))
+        return self.df.iloc[s:e].dropna(axis=1, how='all').reset_index(drop=True)
+
+    def agent_trend(self, code):
+        """날짜 · 시상 합계 · 직전 날짜 대비 증감 · 주차별 실적 (매니저 화면 추이 표)"""
+        h = self.agent(code)
+        if h.empty:
+            return h
+        cols = [DATE_COL, TOTAL_COL] + [c for c in h.columns if c.startswith('실적_')]
+        out = h[cols].copy()
+        out.insert(2, '증감', out[TOTAL_COL].diff().fillna(0.0))
+        return out
+
+    def base_date(self, date, days=7):
+        """date 보다 days 일 이상 앞선 마지막 이력 날짜 — 없으면 date 이전 가장 이른 날짜, 그것도 없으면 None"""
+        cut = (datetime.strptime(date, '%Y%m%d') - timedelta(days=days)).strftime('%Y%m%d')
+        before = [d for d in self.dates if d < date]
+        older = [d for d in before if d <= cut]
+        return older[-1] if older else (before[0] if before else None)
+
+    def totals_on(self, date):
+        """날짜 하나의 코드 → 시상 합계 Series"""
+        day = self.df[self.df[DATE_COL] == date]
+        return pd.Series(day[TOTAL_COL].to_numpy(), index=day[CODE_COL].to_numpy())
+
+    def gain_since(self, codes, totals, date, days=7):
+        """행별 (현재 시상 합계 − 기준 날짜 시상 합계) 와 기준 날짜 — 기준 날짜에 없던 설계사는 0 에서 시작.
+        codes · totals: 현재 스냅샷 행 순서 배열 (코드가 없는 행은 NaN)"""
+        base = self.base_date(date, days)
+        if base is None:
+            return None, None
+        prev = self.totals_on(base)
+        at = prev.index.get_indexer(codes)
+        gain = totals - np.where(at >= 0, prev.to_numpy()[at], 0.0)
+        return np.where(pd.isna(codes), np.nan, gain), base
+
+    def nbytes(self):
+        return int(self.df.memory_usage(index=True, deep=True).sum())
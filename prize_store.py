@@ -0,0 +1,293 @@
+"""
+prize_store.py — 스냅샷 캐시 (Streamlit 비의존)
+=============================================================
+• SUM/BRIDGE 파일 "내용" 해시를 키로 병합 데이터 + 시상 구조 + 인덱스를 보관
+  (git checkout 으로 mtime 이 바뀌어도 내용이 같으면 재파싱 없음)
+• 상주 스냅샷 개수 상한 · 메모리 상한 · LRU 제거 · 스냅샷 단위 무효화
+• 같은 스냅샷을 여러 세션이 동시에 요청하면 로딩은 한 번만 수행
+• prewarm: 새 스냅샷을 백그라운드 스레드에서 준비, 완료 전까지는 직전 스냅샷으로 응답
+• 병합 데이터는 compact_frame 으로 압축해 보관 (관리자 화면 메모리 리포트)
+• 보관하는 병합 데이터는 ReadOnlyFrame — 모든 세션이 사본 없이 같은 객체를 공유
+• 새 날짜 스냅샷은 직전 스냅샷의 파생 데이터를 재사용해 바뀐 설계사 · 매니저만 다시 계산
+• 조직(지점 · 대리점지사 · 매니저) 집계표도 스냅샷과 함께 한 번 만들어 둠 (관리자 화면)
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from prize_core import (
+    DATA_DIR, load_merged, detect_prize_structure, find_latest_files, freeze_frame, is_delta_name, delta_chain,
+)
+from prize_engine import (
+    build_agent_index, build_prize_batch, build_manager_index, build_search_index, compact_frame,
+    INCREMENTAL_RATIO, diff_agents, update_prize_batch, update_manager_index, update_search_index,
+    build_next_tiers, tier_config, build_leaderboard, build_rollups,
+)
+
+
+# ═══════════════════════════════════════════════════════
+# 0. 내용 해시
+# ═══════════════════════════════════════════════════════
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+def file_digest(path):
+    """파일 내용 sha256 — (경로, 크기, mtime) 가 같으면 다시 읽지 않음"""
+    if not path or not os.path.exists(path):
+        return ""
+    st_ = os.stat(path)
+    memo_key = (os.path.abspath(path), st_.st_size, st_.st_mtime_ns)
+    with _digest_lock:
+        hit = _digest_memo.get(memo_key)
+    if hit:
+        return hit
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    dg = h.hexdigest()
+    with _digest_lock:
+        _digest_memo[memo_key] = dg
+    return dg
+
+def snapshot_key(sum_path, bridge_path):
+    """SUM/BRIDGE 쌍의 내용 해시 (앞 16자리) — 델타 스냅샷은 기준 스냅샷까지 포함"""
+    sums = delta_chain(sum_path) if is_delta_name(sum_path) else [sum_path]
+    h = hashlib.sha256(f"{'+'.join(file_digest(p) for p in sums)}|{file_digest(bridge_path)}".encode())
+    return h.hexdigest()[:16]
+
+
+# ═══════════════════════════════════════════════════════
+# 1. 스냅샷 구성
+# ═══════════════════════════════════════════════════════
+def build_views(df, labels_json, tiers_json='{}'):
+    """병합 데이터에서 파생되는 시상 구조 · 일괄 계산 · 다음 구간 · 인덱스 (tiers_json: 매니저 구간 경계)"""
+    ps = detect_prize_structure(tuple(df.columns.tolist()), labels_json)
+    batch = build_prize_batch(df, ps)
+    tiers = tier_config(json.loads(tiers_json))
+    # 카드 · 카톡 · 순위의 다음 구간도 매니저 폴더와 같은 '구간' 경계로
+    nt = build_next_tiers(batch, tiers['구간'])
+    return {'ps': ps, 'batch': batch, 'next_tier': nt, 'leaderboard': build_leaderboard(batch, nt),
+            'rollups': build_rollups(df, batch, tiers),
+            'mgr_index': build_manager_index(df, batch, tiers),
+            'search_index': build_search_index(df)}
+
+def update_views(prev, df, labels_json, tiers_json='{}'):
+    """직전 스냅샷(prev)의 파생 데이터에서 바뀐 설계사 · 매니저만 다시 계산 — build_views 와 같은 결과.
+    시상 구조 · 라벨 · 구간 경계가 다르거나 설계사 대응이 불가능하면 전체 계산. 'build' 에 갱신 방식 기록"""
+    t0 = time.perf_counter()
+    ps = detect_prize_structure(tuple(df.columns.tolist()), labels_json)
+    diff = None
+    if prev is not None and prev.get('batch') is not None and _same_config(prev, labels_json, tiers_json) \
+            and prev['ps'] == ps:
+        idx = build_agent_index(df, ps)
+        diff = diff_agents(prev['df'], prev['batch']['idx'], df, idx)
+    if diff is not None and diff['changed'].sum() > len(df) * INCREMENTAL_RATIO:
+        diff = None  # 대부분 바뀌었으면 전체 계산이 더 빠름
+    if diff is None:
+        views = build_views(df, labels_json, tiers_json)
+        views['build'] = {'mode': '전체', 'sec': time.perf_counter() - t0}
+        return views
+    batch = update_prize_batch(prev['batch'], idx, diff)
+    # 다음 구간은 구간별 대표 시상금이 전체 분포에서 나오므로, 조직 집계는 groupby 몇 번이라 매번 전체 계산
+    tiers = tier_config(json.loads(tiers_json))
+    nt = build_next_tiers(batch, tiers['구간'])
+    views = {'ps': ps, 'batch': batch, 'next_tier': nt, 'leaderboard': build_leaderboard(batch, nt),
+             'rollups': build_rollups(df, batch, tiers),
+             'mgr_index': update_manager_index(prev['mgr_index'], prev['df'], df, batch, diff, tiers),
+             'search_index': update_search_index(prev['search_index'], prev['df'], df, diff)}
+    views['build'] = {'mode': '증분', 'base': prev['key'], 'agents': int(diff['changed'].sum()),
+                      'removed': len(diff['removed']), 'sec': time.perf_counter() - t0}
+    return views
+
+def _same_config(snap, labels_json, tiers_json):
+    """파생 데이터가 이 라벨 · 구간 경계로 만들어졌는지"""
+    return snap['labels_json'] == labels_json and snap.get('tiers_json', '{}') == tiers_json
+
+def snapshot_nbytes(snap):
+    """DataFrame(deep) + 시상 배열 메모리 추정치"""
+    n = int(snap['df'].memory_usage(index=True, deep=True).sum())
+    batch = snap.get('batch')
+    if batch is not None:
+        n += batch['idx']['values'].nbytes + batch['total'].nbytes
+    nt = snap.get('next_tier')
+    if nt is not None:
+        n += nt['threshold'].nbytes + nt['shortfall'].nbytes + nt['unlock'].nbytes
+    lb = snap.get('leaderboard')
+    if lb is not None:
+        n += lb['codes'].nbytes + lb['shortfall'].nbytes + lb['program'].nbytes
+    n += sum(int(r.memory_usage(index=True, deep=True).sum()) for r in snap.get('rollups', {}).values())
+    return n
+
+def process_rss():
+    """현재 프로세스 상주 메모리(바이트) — /proc 이 없으면 최대치(ru_maxrss), 알 수 없으면 None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    except Exception:
+        return None
+
+
+# ═══════════════════════════════════════════════════════
+# 2. 캐시
+# ═══════════════════════════════════════════════════════
+class SnapshotCache:
+    """내용 해시 키 LRU 캐시. get() 이 돌려주는 스냅샷은 세션 간 공유되므로 읽기 전용으로 사용
+    (snap['df'] 는 ReadOnlyFrame — 수정 시 ReadOnlyFrameError)"""
+
+    def __init__(self, max_entries=3, max_bytes=600 * 2 ** 20, loader=load_merged, compact=True):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes)
+        self.loader = loader
+        self.compact = compact
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._current = None    # 마지막으로 게시(publish)된 스냅샷 키
+        self._warming = {}      # 키 → 백그라운드 스레드
+        self.errors = {}        # 키 → 백그라운드 로딩 실패 메시지
+
+    def get(self, sum_path, bridge_path, labels_json, tiers_json='{}'):
+        key = snapshot_key(sum_path, bridge_path)
+        with self._lock:
+            snap = self._entries.get(key)
+            if snap is not None:
+                self._entries.move_to_end(key)
+            klock = self._key_locks.setdefault(key, threading.Lock())
+        if snap is not None and _same_config(snap, labels_json, tiers_json):
+            snap['hits'] += 1
+            snap['last_used'] = time.time()
+            return snap
+
+        # 같은 스냅샷 동시 요청은 한 번만 로딩 (thundering herd 방지)
+        with klock:
+            with self._lock:
+                snap = self._entries.get(key)
+            if snap is None:
+                t0 = time.perf_counter()
+                df = self.loader(sum_path, bridge_path)
+                memory = None
+                if self.compact:
+                    df, memory = compact_frame(df)
+                # 세션 간 공유 객체 — 이후 어떤 코드도 수정하지 못하도록 고정
+                df = freeze_frame(df)
+                snap = {'key': key, 'df': df, 'labels_json': None, 'memory': memory,
+                        'sum_path': sum_path, 'bridge_path': bridge_path,
+                        'loaded_at': time.time(), 'load_sec': time.perf_counter() - t0, 'hits': 0}
+            if not _same_config(snap, labels_json, tiers_json):
+                # 라벨 · 구간 경계만 바뀐 경우 병합 데이터는 재사용, 파생 데이터만 새 dict 로 교체.
+                # 새 데이터면 직전 게시 스냅샷 대비 증분 계산
+                with self._lock:
+                    prev = self._entries.get(self._current) if self._current else None
+                if snap['labels_json'] is not None or (prev is not None and prev['key'] == key):
+                    prev = None
+                snap = dict(snap, labels_json=labels_json, tiers_json=tiers_json,
+                            **update_views(prev, snap['df'], labels_json, tiers_json))
+                snap['nbytes'] = snapshot_nbytes(snap)
+            snap['last_used'] = time.time()
+            # 파생 데이터까지 다 만든 뒤 한 번에 게시
+            with self._lock:
+                self._entries[key] = snap
+                self._entries.move_to_end(key)
+                self._current = key
+                self._evict(keep=key)
+            self.errors.pop(key, None)
+        return snap
+
+    def peek(self, sum_path, bridge_path, labels_json, tiers_json='{}'):
+        """로딩 없이, 이미 준비된 스냅샷만 반환 (없으면 None)"""
+        with self._lock:
+            snap = self._entries.get(snapshot_key(sum_path, bridge_path))
+        if snap is None or not _same_config(snap, labels_json, tiers_json):
+            return None
+        return self.get(sum_path, bridge_path, labels_json, tiers_json)
+
+    def current(self):
+        """마지막으로 게시된 스냅샷 (새 스냅샷 준비 중에 대신 응답할 데이터)"""
+        with self._lock:
+            return self._entries.get(self._current) if self._current else None
+
+    def prewarm(self, sum_path, bridge_path, labels_json, tiers_json='{}'):
+        """백그라운드 스레드에서 스냅샷 준비 — 이미 준비됐거나 진행 중이면 아무것도 안 함"""
+        if not sum_path:
+            return None
+        key = snapshot_key(sum_path, bridge_path)
+        with self._lock:
+            snap = self._entries.get(key)
+            if snap is not None and _same_config(snap, labels_json, tiers_json):
+                return None
+            th = self._warming.get(key)
+            if th is not None and th.is_alive():
+                return th
+
+            def _run():
+                try:
+                    self.get(sum_path, bridge_path, labels_json, tiers_json)
+                except Exception as e:
+                    self.errors[key] = f"{type(e).__name__}: {e}"
+                finally:
+                    with self._lock:
+                        self._warming.pop(key, None)
+
+            th = threading.Thread(target=_run, name=f"prewarm-{key}", daemon=True)
+            self._warming[key] = th
+        th.start()
+        return th
+
+    def is_warming(self, sum_path, bridge_path):
+        with self._lock:
+            th = self._warming.get(snapshot_key(sum_path, bridge_path))
+        return th is not None and th.is_alive()
+
+    def _evict(self, keep):
+        # 개수/메모리 상한을 넘으면 가장 오래 안 쓴 것부터 제거 (방금 쓴 스냅샷은 유지)
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.total_bytes() > self.max_bytes):
+            old = next(k for k in self._entries if k != keep)
+            self._entries.pop(old)
+            self._key_locks.pop(old, None)
+
+    def total_bytes(self):
+        return sum(s.get('nbytes', 0) for s in self._entries.values())
+
+    def invalidate(self, key):
+        """스냅샷 하나만 제거 — 다음 요청 때 다시 로딩"""
+        with self._lock:
+            if self._current == key:
+                self._current = None
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current = None
+
+    def entries(self):
+        """관리자 화면용 상주 스냅샷 목록 (최근 사용 순)"""
+        with self._lock:
+            snaps = list(self._entries.values())[::-1]
+        return [{'key': s['key'],
+                 'sum': os.path.basename(s['sum_path'] or ''),
+                 'bridge': os.path.basename(s['bridge_path'] or '') or '없음',
+                 'rows': len(s['df']), 'mb': s.get('nbytes', 0) / 2 ** 20,
+                 'load_sec': s['load_sec'], 'hits': s['hits'], 'build': s.get('build'),
+                 'loaded_at': s['loaded_at'], 'last_used': s['last_used']} for s in snaps]
+
+
+def prewarm_latest(cache, labels_json, data_dir=DATA_DIR, tiers_json='{}'):
+    """data/ 의 최신 SUM/BRIDGE 를 백그라운드로 준비 (프로세스 시작 · 데이터 push 직후)"""
+    sp, bp, _ = find_latest_files(data_dir)
+    return cache.prewarm(sp, bp, labels_json, tiers_json)